@@ -1,13 +1,119 @@
 from flask import Flask, request, jsonify, render_template
 from flask_cors import CORS
-import csv
 from datetime import datetime
 import os
+import hashlib
+import threading
+
+from config.settings import use_history_ledger, ledger_file_name
+from modules.storage.ledger import get_ledger, iter_rows, update_date_applied, has_search_index, rebuild_search_index, search
+from modules.storage.id_index import JobIdIndex, get_index_path, is_index_current
+from modules.storage.updates import append_update, count_updates, compact_updates, get_updates_path, iter_history
+from modules.storage.stats import load_stats, summarize_stats
+from modules.storage.partitions import list_partitions, iter_job_ids
 
 app = Flask(__name__)
 CORS(app)
 
 PATH = 'all excels/'
+JOB_FIELDS = ['Job ID', 'Title', 'Company', 'HR Name', 'HR Link', 'Job Link', 'External Job link', 'Date Applied']
+
+
+SORT_KEYS = {'job_id': 'Job_ID', 'title': 'Title', 'company': 'Company', 'date_applied': 'Date_Applied', 'external_job_link': 'External_Job_link'}
+MAX_LIMIT = 1000
+MAX_SEARCH_RESULTS = 100
+COMPACT_UPDATES_AFTER = 50
+
+
+def uses_ledger() -> bool:
+    return use_history_ledger and os.path.exists(ledger_file_name)
+
+
+def read_applied_rows(date_from: str = '', date_to: str = ''):
+    '''
+    Yields applied job rows with `JOB_FIELDS`, from the history ledger if enabled and present, else from the CSV file
+    and its monthly partitions. From CSVs, only partitions of months between `date_from` and `date_to` are read.
+    '''
+    if uses_ledger():
+        yield from iter_rows("applied_jobs", JOB_FIELDS, get_ledger())
+        return
+    csvPath = PATH + 'all_applied_applications_history.csv'
+    if not os.path.exists(csvPath) and not list_partitions(csvPath):
+        raise FileNotFoundError(csvPath)
+    yield from iter_history(csvPath, 'Date Applied', date_from, date_to)
+
+
+def history_signature() -> tuple:
+    '''
+    Returns (path, modified time, size) of every file the applied jobs are read from. Changes whenever the history changes.
+    '''
+    csvPath = PATH + 'all_applied_applications_history.csv'
+    paths = [ledger_file_name, ledger_file_name + '-wal'] if uses_ledger() else [csvPath, get_updates_path(csvPath)] + [path for _, path in list_partitions(csvPath)]
+    signature = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            signature.append((path, stat.st_mtime_ns, stat.st_size))
+        except FileNotFoundError:
+            signature.append((path, 0, 0))
+    return tuple(signature)
+
+
+jobs_cache = {'signature': None, 'windows': {}}
+jobs_cache_lock = threading.Lock()
+
+
+def get_cached_jobs(date_from: str = '', date_to: str = '') -> tuple[tuple, list[dict], dict]:
+    '''
+    Returns (signature, jobs, views) where jobs are parsed once and reused until the history files change.
+    * Reading from CSVs, jobs are cached per month window of `date_from` and `date_to`, so recent-window queries
+      only parse recent partitions. Rows outside the window may be included, `query_jobs()` filters them.
+    '''
+    signature = history_signature()
+    window = ('', '') if uses_ledger() else (date_from[:7], date_to[:7])
+    with jobs_cache_lock:
+        if jobs_cache['signature'] != signature:
+            jobs_cache['windows'] = {}
+            jobs_cache['signature'] = signature
+        if window not in jobs_cache['windows']:
+            if len(jobs_cache['windows']) > 16: jobs_cache['windows'] = {}
+            jobs = [{
+                'Job_ID': row['Job ID'],
+                'Title': row['Title'],
+                'Company': row['Company'],
+                'HR_Name': row['HR Name'],
+                'HR_Link': row['HR Link'],
+                'Job_Link': row['Job Link'],
+                'External_Job_link': row['External Job link'],
+                'Date_Applied': row['Date Applied']
+            } for row in read_applied_rows(*window)]
+            jobs_cache['windows'][window] = (jobs, {})
+        jobs, views = jobs_cache['windows'][window]
+        return signature, jobs, views
+
+
+def query_jobs(jobs: list[dict], views: dict, company: str, title: str, date_from: str, date_to: str, sort: str, order: str) -> list[dict]:
+    '''
+    Returns `jobs` filtered by company/title substring and Date Applied range, sorted by `sort` key in `order`.
+    * Results are memoized per query until the history files change
+    '''
+    key = (company, title, date_from, date_to, sort, order)
+    if key in views: return views[key]
+    result = jobs
+    if company: result = [job for job in result if company in (job['Company'] or '').lower()]
+    if title: result = [job for job in result if title in (job['Title'] or '').lower()]
+    if date_from or date_to:
+        result = [job for job in result if job['Date_Applied'] and job['Date_Applied'][:1].isdigit()
+                  and (not date_from or job['Date_Applied'][:len(date_from)] >= date_from)
+                  and (not date_to or job['Date_Applied'][:len(date_to)] <= date_to)]
+    if sort:
+        result = sorted(result, key=lambda job: (job[SORT_KEYS[sort]] or '').lower(), reverse=(order == 'desc'))
+    elif order == 'desc':
+        result = result[::-1]
+    if len(views) > 64: views.clear()
+    views[key] = result
+    return result
+
 ##> ------ Karthik Sarode : karthik.sarode23@gmail.com - UI for excel files ------
 @app.route('/')
 def home():
@@ -21,37 +127,102 @@ def get_applied_jobs():
     
     Returns a JSON response containing a list of jobs, each with details such as 
     Job ID, Title, Company, HR Name, HR Link, Job Link, External Job link, and Date Applied.
+
+    Optional query parameters:
+        company, title: Case-insensitive substring filters.
+        date_from, date_to: Date Applied range, prefix of 'YYYY-MM-DD HH:MM:SS' (Eg: 2024-12 or 2024-12-31).
+        sort: One of job_id, title, company, date_applied, external_job_link. order: asc (default) or desc.
+        limit, cursor: Page size (max 1000) and the `next_cursor` of the previous page. If `limit` is
+            given, returns {"jobs": [...], "total": int, "next_cursor": str | null} instead of a list.
+
+    Parsed history is cached until the history files change, and responses carry an ETag so
+    unchanged results return 304 for a matching If-None-Match.
     
     If the CSV file is not found, returns a 404 error with a relevant message.
     If any other exception occurs, returns a 500 error with the exception message.
     '''
 
     try:
-        jobs = []
-        with open(PATH + 'all_applied_applications_history.csv', 'r', encoding='utf-8') as file:
-            reader = csv.DictReader(file)
-            for row in reader:
-                jobs.append({
-                    'Job_ID': row['Job ID'],
-                    'Title': row['Title'],
-                    'Company': row['Company'],
-                    'HR_Name': row['HR Name'],
-                    'HR_Link': row['HR Link'],
-                    'Job_Link': row['Job Link'],
-                    'External_Job_link': row['External Job link'],
-                    'Date_Applied': row['Date Applied']
-                })
-        return jsonify(jobs)
+        sort = request.args.get('sort', '').lower()
+        order = request.args.get('order', 'asc').lower()
+        limit = request.args.get('limit', type=int)
+        cursor = request.args.get('cursor', 0, type=int)
+        if sort and sort not in SORT_KEYS:
+            return jsonify({"error": f"Invalid sort key '{sort}', expected one of {list(SORT_KEYS)}"}), 400
+
+        signature, jobs, views = get_cached_jobs(request.args.get('date_from', '').strip(), request.args.get('date_to', '').strip())
+        etag = hashlib.sha1(repr((signature, sorted(request.args.items()))).encode()).hexdigest()
+        if request.if_none_match.contains(etag):
+            return '', 304, {'ETag': f'"{etag}"'}
+
+        jobs = query_jobs(jobs, views, request.args.get('company', '').strip().lower(), request.args.get('title', '').strip().lower(),
+                          request.args.get('date_from', '').strip(), request.args.get('date_to', '').strip(), sort, order)
+        if limit is None:
+            response = jsonify(jobs)
+        else:
+            limit = min(max(limit, 1), MAX_LIMIT)
+            cursor = max(cursor, 0)
+            nextCursor = cursor + limit
+            response = jsonify({"jobs": jobs[cursor:nextCursor], "total": len(jobs), "next_cursor": str(nextCursor) if nextCursor < len(jobs) else None})
+        response.set_etag(etag)
+        return response
     except FileNotFoundError:
         return jsonify({"error": "No applications history found"}), 404
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.route('/stats', methods=['GET'])
+def get_stats():
+    '''
+    Retrieves run statistics kept up to date by the bot as it applies.
+
+    Returns a JSON response with totals, easy apply vs external counts and ratio, applied, skipped,
+    failed counts and apply rate per search term, skip reasons, and failure reasons per company.
+    Counters are read as saved, so this costs the same whatever the history size.
+    '''
+    try:
+        return jsonify(summarize_stats(load_stats()))
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/search', methods=['GET'])
+def search_history():
+    '''
+    Full-text searches descriptions, titles and companies of applied jobs and the questions answered in them.
+
+    Query parameters:
+        q: Words to search for, all must match. A word ending with * matches as a prefix (Eg: kube*).
+        limit: Maximum results, 20 by default (max 100).
+
+    Returns {"query": str, "results": [...]} ranked best first, each result with job_id, kind
+    ("job" or "question"), title, company, a snippet with matches in [brackets] and its score.
+    Returns 400 if q is missing, 404 if the history ledger (`use_history_ledger`) is not in use
+    or SQLite lacks FTS5, and 500 with the exception message for any other error.
+    '''
+    try:
+        query = request.args.get('q', '').strip()
+        if not query:
+            return jsonify({"error": "Missing search query 'q'"}), 400
+        if not uses_ledger():
+            return jsonify({"error": "Search needs the history ledger, set use_history_ledger = True and run the bot once"}), 404
+        connection = get_ledger()
+        if not has_search_index(connection):
+            return jsonify({"error": "Search is unavailable, this SQLite build has no FTS5"}), 404
+        rebuild_search_index(connection)
+        limit = min(max(request.args.get('limit', 20, type=int), 1), MAX_SEARCH_RESULTS)
+        return jsonify({"query": query, "results": search(query, limit, connection)})
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
 @app.route('/applied-jobs/<job_id>', methods=['PUT'])
 def update_applied_date(job_id):
     """
     Updates the 'Date Applied' field of a job in the applications history CSV file.
 
+    The CSV is not rewritten, the change is appended to its update log (and applied to
+    the ledger if enabled). Once the log has `COMPACT_UPDATES_AFTER` entries it is merged
+    back into the CSV, under the same lock the bot takes to append rows.
+
     Args:
         job_id (str): The Job ID of the job to be updated.
 
@@ -62,30 +233,27 @@ def update_applied_date(job_id):
         exception message.
     """
     try:
-        data = []
         csvPath = PATH + 'all_applied_applications_history.csv'
-        
-        if not os.path.exists(csvPath):
+        dateApplied = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+        if uses_ledger():
+            found = update_date_applied(job_id, dateApplied, get_ledger()) > 0
+        elif not os.path.exists(csvPath):
             return jsonify({"error": f"CSV file not found at {csvPath}"}), 404
-            
-        # Read current CSV content
-        with open(csvPath, 'r', encoding='utf-8') as file:
-            reader = csv.DictReader(file)
-            fieldNames = reader.fieldnames
-            found = False
-            for row in reader:
-                if row['Job ID'] == job_id:
-                    row['Date Applied'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                    found = True
-                data.append(row)
+        elif is_index_current(csvPath):
+            with JobIdIndex(get_index_path(csvPath)) as jobIds:
+                found = job_id in jobIds
+        else:
+            found = job_id in iter_job_ids(csvPath)    # Index is stale, stream the CSV instead of rebuilding it in the request
         
         if not found:
             return jsonify({"error": f"Job ID {job_id} not found"}), 404
 
-        with open(csvPath, 'w', encoding='utf-8', newline='') as file:
-            writer = csv.DictWriter(file, fieldnames=fieldNames)
-            writer.writeheader()
-            writer.writerows(data)
+        if os.path.exists(csvPath):
+            append_update(csvPath, job_id, 'Date Applied', dateApplied)
+            if count_updates(csvPath) >= COMPACT_UPDATES_AFTER:
+                try: compact_updates(csvPath, timeout=1)
+                except Exception as e: print(f"Postponed merging Date Applied updates into CSV: {str(e)}")
         
         return jsonify({"message": "Date Applied updated successfully"}), 200
     except Exception as e:
@@ -50,6 +50,15 @@ def _get_int(key: str, fallback: int = 0) -> int:
         return fallback
 
 
+def _get_list(key: str, fallback: list[str]) -> list[str]:
+    value = _settings_overrides.get(key, fallback)
+    if isinstance(value, str):
+        value = value.split(",")
+    if isinstance(value, list):
+        return [str(item).strip() for item in value if str(item).strip()]
+    return fallback
+
+
 # >>>>>>>>>>> LinkedIn Settings <<<<<<<<<<<
 
 close_tabs = _get_bool("close_tabs", False)
@@ -77,15 +86,71 @@ generated_resume_path = _get_str("generated_resume_path", "all resumes/")
 
 file_name = _get_str("file_name", "all excels/all_applied_applications_history.csv")
 failed_file_name = _get_str("failed_file_name", "all excels/all_failed_applications_history.csv")
+
+# Keep applied and failed history in an indexed SQLite ledger as well (CSVs are still written for compatibility)
+use_history_ledger = _get_bool("use_history_ledger", True)
+ledger_file_name = _get_str("ledger_file_name", "all excels/applications_ledger.db")
+# Save job descriptions once, compressed, in "descriptions" folder next to history files and keep only a reference in history rows
+store_descriptions_separately = _get_bool("store_descriptions_separately", True)
+# History rows are journaled immediately and saved in batches, every history_flush_interval seconds or history_batch_size rows
+history_flush_interval = _get_int("history_flush_interval", 5)
+history_batch_size = _get_int("history_batch_size", 10)
+# At startup, rows older than the current and past history_archive_after_months months are moved into monthly compressed files in "archive" folder next to history files (0 = never)
+# This rewrites the history CSVs, keep it 0 if you open them in Excel and want all rows there. The dashboard reads both
+history_archive_after_months = _get_int("history_archive_after_months", 0)
 logs_folder_path = _get_str("logs_folder_path", "logs/")
 
+# Log file is rotated once it grows past log_max_size_mb, keeping log_backup_count old files. (0 = never rotate)
+log_max_size_mb = _get_int("log_max_size_mb", 20)
+log_backup_count = _get_int("log_backup_count", 3)
+# Write logs as JSON lines with timestamp and run ID to "log.jsonl" instead of plain text "log.txt"
+log_json_lines = _get_bool("log_json_lines", False)
+
+# Screenshots of failed applications are saved in "screenshots" folder inside logs_folder_path, in the background
+screenshot_modal_only = _get_bool("screenshot_modal_only", False)       # Capture only the Easy Apply form when it's open
+screenshot_quality = _get_int("screenshot_quality", 70)                 # JPEG quality 1 to 100, 0 = lossless PNG (larger)
+screenshot_dedupe = _get_bool("screenshot_dedupe", True)                # Link byte-identical screenshots instead of saving copies
+screenshot_perceptual_dedupe = _get_bool("screenshot_perceptual_dedupe", False)  # Also link screenshots that only look alike (needs Pillow), may hide a different job's screen
+screenshot_quota_mb = _get_int("screenshot_quota_mb", 200)              # Oldest screenshots are deleted past this size (0 = unlimited)
+# Page sources of failed job listings are saved gzipped in "page sources" folder inside logs_folder_path, at most one every page_dump_interval seconds
+page_dump_interval = _get_int("page_dump_interval", 60)
+
 click_gap = _get_int("click_gap", 0)
+# Waits for the page (job list loaded, details shown, autocomplete suggestions, ...) end as soon as it's ready, or after readiness_timeout seconds at most
+readiness_timeout = _get_int("readiness_timeout", 5)
+# Number of Chrome windows applying in parallel, each in its own process taking search terms from a shared queue (1 = single browser, needs use_history_ledger)
+# Each window uses its own Chrome profile in worker_profiles_folder, log in once in each. Application pacing and budget above are shared by all of them
+parallel_workers = _get_int("parallel_workers", 1)
+worker_profiles_folder = _get_str("worker_profiles_folder", "all profiles/")
+# Chrome is restarted (logged in again, on the same search results) between result pages once the LinkedIn tab's JS heap passes recycle_browser_heap_mb (0 = never)
+recycle_browser_heap_mb = _get_int("recycle_browser_heap_mb", 1024)
+# Tabs other than the bot's are closed once more than max_open_tabs are open, Eg: external applications when close_tabs is False (0 = never)
+max_open_tabs = _get_int("max_open_tabs", 10)
+# Chromedriver is kept in driver_cache_folder per version, instead of being looked up or downloaded (stealth_mode) every run (empty = don't cache)
+driver_cache_folder = _get_str("driver_cache_folder", "all profiles/drivers/")
+# Guest sessions (safe_mode) and new worker profiles start from a Chrome profile template in warm_profile_folder that keeps only
+# Chrome's HTTP, code and GPU caches, never cookies, history or logins (empty = start from an empty profile)
+warm_profile_folder = _get_str("warm_profile_folder", "all profiles/template/")
+# Save LinkedIn cookies and local storage encrypted in session_state_file after logging in, and reuse them in new browsers instead of logging in again
+# Encrypted with Windows DPAPI, or on other OS with the "cryptography" package (pip install cryptography)
+persist_login_session = _get_bool("persist_login_session", True)
+session_state_file = _get_str("session_state_file", "all profiles/linkedin_session.bin")
+# Chrome launch profile, "default" or "lean" (small fixed window, no GPU or background services, fewer renderer processes, capped JS heap)
+# Lean uses less memory and CPU per browser, to run more parallel_workers. Compare both with "python -m modules.launch_benchmark"
+launch_profile = _get_str("launch_profile", "default")
+# When opening a page returns: "normal" (after every image and script loaded) or "eager" (once the HTML is parsed)
+# With "eager" the bot waits only for the elements it needs on each page (job list, login form, job details)
+page_load_strategy = _get_str("page_load_strategy", "eager")
+# Load the next job's page in a second tab while applying to the current one, and check it for blacklisted words ahead of time
+prefetch_job_details = _get_bool("prefetch_job_details", True)
 run_in_background = _get_bool("run_in_background", False)
 disable_extensions = _get_bool("disable_extensions", False)
 safe_mode = _get_bool("safe_mode", True)
 smooth_scroll = _get_bool("smooth_scroll", False)
 keep_screen_awake = _get_bool("keep_screen_awake", True)
 stealth_mode = _get_bool("stealth_mode", False)
+# Requests Chrome shouldn't download, to make pages lighter. Any of "images", "media", "fonts", "trackers" ([] = block nothing)
+blocked_resources = _get_list("blocked_resources", ["images", "media", "fonts", "trackers"])
 showAiErrorAlerts = _get_bool("showAiErrorAlerts", True)
 
 
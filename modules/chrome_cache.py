@@ -0,0 +1,153 @@
+'''
+Author:     Sai Vignesh Golla
+LinkedIn:   https://www.linkedin.com/in/saivigneshgolla/
+
+Copyright (C) 2024 Sai Vignesh Golla
+
+License:    GNU Affero General Public License
+            https://www.gnu.org/licenses/agpl-3.0.en.html
+            
+GitHub:     https://github.com/GodsScion/Auto_job_applier_linkedIn
+
+version:    24.12.29.12.30
+'''
+
+# Imports
+import os
+import json
+import shutil
+import subprocess
+
+from tempfile import mkdtemp
+
+from config.settings import driver_cache_folder, warm_profile_folder
+from modules.helpers import print_lg
+from modules.storage.locks import file_lock
+
+
+#< Chromedriver cache
+# Chromedriver binaries are kept as "<driver_cache_folder>/<version>/chromedriver". Which one to use is remembered in "driver.json" with
+# the Chrome binary's modified time, so until Chrome updates, launching doesn't look up or download anything.
+# In stealth_mode undetected-chromedriver patches its own copy ("undetected_chromedriver") once, instead of downloading one every run.
+driver_manifest_name = "driver.json"
+
+
+def get_driver_version(driver_path: str) -> str:
+    output = subprocess.run([driver_path, "--version"], capture_output=True, text=True, timeout=30).stdout
+    return output.split()[1]     # "ChromeDriver 131.0.6778.85 (...)"
+
+
+def resolve_driver() -> tuple[str, str]:
+    '''
+    Function to find a chromedriver matching the installed Chrome with Selenium Manager (downloads it if needed). Returns (driver path, Chrome path).
+    '''
+    from selenium.webdriver.common.selenium_manager import SeleniumManager
+    paths = SeleniumManager().binary_paths(["--browser", "chrome"])
+    return paths["driver_path"], paths["browser_path"]
+
+
+def get_cached_driver(stealth: bool = False, folder: str = driver_cache_folder) -> str | None:
+    '''
+    Function to get the path of a cached chromedriver for the installed Chrome, caching one first if there's none for it.
+    * With `stealth`, returns the copy for undetected-chromedriver to patch
+    * Returns `None` if no driver could be found, then Selenium or undetected-chromedriver look for one themselves
+    '''
+    if not folder: return None
+    manifest_path = os.path.join(folder, driver_manifest_name)
+    try:
+        os.makedirs(folder, exist_ok=True)
+        with file_lock(manifest_path, timeout=120):
+            manifest = {}
+            if os.path.exists(manifest_path):
+                with open(manifest_path, 'r', encoding='utf-8') as file: manifest = json.load(file)
+            browser = manifest.get("browser")
+            current = (manifest.get("driver") and os.path.exists(manifest["driver"]) and browser and os.path.exists(browser)
+                       and os.path.getmtime(browser) == manifest.get("browser_mtime"))
+            if not current:
+                driver_path, browser = resolve_driver()
+                version = get_driver_version(driver_path)
+                cached_path = os.path.join(folder, version, os.path.basename(driver_path))
+                if not os.path.exists(cached_path):
+                    os.makedirs(os.path.dirname(cached_path), exist_ok=True)
+                    shutil.copy2(driver_path, cached_path)
+                    print_lg(f'Cached chromedriver {version} in "{os.path.dirname(cached_path)}"')
+                manifest = {"version": version, "driver": cached_path, "browser": browser, "browser_mtime": os.path.getmtime(browser)}
+                with open(manifest_path, 'w', encoding='utf-8') as file: json.dump(manifest, file)
+            driver_path = manifest["driver"]
+            if not stealth: return driver_path
+            stealth_path = os.path.join(os.path.dirname(driver_path), "undetected_" + os.path.basename(driver_path))
+            if not os.path.exists(stealth_path): shutil.copy2(driver_path, stealth_path)
+            return stealth_path
+    except Exception as e:
+        print_lg("Couldn't use the chromedriver cache, Chrome will look for a driver itself!", e)
+        return None
+#>
+
+
+#< Warm profile template
+# A Chrome profile that keeps only caches (HTTP, compiled code, GPU shaders), no cookies, history, logins or settings.
+# Guest (safe_mode) sessions start from a copy of it and update it when they quit, workers of the worker pool start their profile from it.
+cache_folders = [
+    os.path.join("Default", "Cache"), os.path.join("Default", "Code Cache"), os.path.join("Default", "GPUCache"),
+    "GrShaderCache", "GraphiteDawnCache", "ShaderCache",
+]
+
+
+def copy_profile_tree(source: str, destination: str) -> None:
+    '''
+    Function to copy folder `source` to `destination`, as a copy-on-write clone where the file system supports it.
+    '''
+    os.makedirs(os.path.dirname(os.path.abspath(destination)), exist_ok=True)
+    if os.name == "posix":
+        # Linux (Btrfs, XFS) clones with --reflink, macOS (APFS) with -c, both fall back to a normal copy
+        flags = ["-c", "-R"] if os.uname().sysname == "Darwin" else ["--reflink=auto", "-R"]
+        if subprocess.run(["cp", *flags, source, destination], capture_output=True).returncode == 0: return
+        shutil.rmtree(destination, ignore_errors=True)
+    shutil.copytree(source, destination, dirs_exist_ok=True)
+
+
+def seed_profile(profile_dir: str, template: str = warm_profile_folder) -> bool:
+    '''
+    Function to create Chrome profile `profile_dir` from the warm template, if the profile doesn't exist yet and there is a template.
+    '''
+    if not template or os.path.exists(profile_dir) or not os.path.isdir(template): return False
+    with file_lock(template.rstrip("/\\"), timeout=120):
+        copy_profile_tree(template, profile_dir)
+    return True
+
+
+def create_session_profile(template: str = warm_profile_folder) -> str | None:
+    '''
+    Function to create a temporary profile for a guest session from the warm template. Returns its path, `None` if there's no template setting.
+    '''
+    if not template: return None
+    profile_dir = mkdtemp(prefix="session-", dir=os.path.dirname(os.path.abspath(template)))
+    os.rmdir(profile_dir)
+    if not seed_profile(profile_dir, template): os.makedirs(profile_dir)
+    return profile_dir
+
+
+def save_warm_caches(profile_dir: str, template: str = warm_profile_folder) -> None:
+    '''
+    Function to replace the template's caches with the caches of `profile_dir`, after its Chrome quit.
+    '''
+    if not template: return
+    with file_lock(template.rstrip("/\\"), timeout=120):
+        for folder in cache_folders:
+            source = os.path.join(profile_dir, folder)
+            if not os.path.isdir(source): continue
+            destination = os.path.join(template, folder)
+            shutil.rmtree(destination, ignore_errors=True)
+            copy_profile_tree(source, destination)
+
+
+def discard_session_profile(profile_dir: str, template: str = warm_profile_folder) -> None:
+    '''
+    Function to keep the caches of temporary guest profile `profile_dir` in the warm template and delete the rest of it.
+    '''
+    try:
+        save_warm_caches(profile_dir, template)
+    except Exception as e:
+        print_lg("Failed to update the warm Chrome profile!", e)
+    shutil.rmtree(profile_dir, ignore_errors=True)
+#>
@@ -17,14 +17,17 @@ version:    24.12.29.12.30
 
 import os
 import json
+import atexit
+import threading
 
-from time import sleep
+from time import sleep, monotonic
+from queue import Queue, Empty
 from random import randint
 from datetime import datetime, timedelta
 from pyautogui import alert
 from pprint import pprint
 
-from config.settings import logs_folder_path
+from config.settings import logs_folder_path, log_json_lines, log_max_size_mb, log_backup_count
 
 
 
@@ -81,32 +84,189 @@ def critical_error_log(possible_reason: str, stack_trace: Exception) -> None:
 def get_log_path():
     '''
     Function to replace '//' with '/' for logs path
+    * Returns path of `log.jsonl` if `log_json_lines = True`, else `log.txt`
     '''
+    log_file = "log.jsonl" if log_json_lines else "log.txt"
     try:
-        path = logs_folder_path+"/log.txt"
+        path = logs_folder_path+"/"+log_file
         return path.replace("//","/")
     except Exception as e:
-        critical_error_log("Failed getting log path! So assigning default logs path: './logs/log.txt'", e)
-        return "logs/log.txt"
+        critical_error_log(f"Failed getting log path! So assigning default logs path: './logs/{log_file}'", e)
+        return "logs/"+log_file
 
 
 __logs_file_path = get_log_path()
+log_run_id = datetime.now().strftime("%Y%m%d-%H%M%S-") + os.urandom(3).hex()
+
+
+class LogWriter(threading.Thread):
+    '''
+    Background thread that owns the log file and writes messages queued by `print_lg()`.
+    * Keeps the file open and writes in batches, flushing every `flush_interval` seconds or once `flush_size` bytes are pending
+    * Rotates the file once it grows past `max_bytes`, keeping `backup_count` old files (`log.txt.1`, `log.txt.2`, ...)
+    * Writes JSON lines with timestamp and run ID instead of plain text if `json_lines = True`
+    * While the file can't be written (Eg: locked on Windows), keeps at most `max_pending` bytes, dropping the oldest and noting how many
+    '''
+    def __init__(self, path: str, max_bytes: int, backup_count: int, json_lines: bool = False, flush_interval: float = 1.0, flush_size: int = 64 * 1024,
+                 queue_size: int = 10000, max_pending: int = 4 * 1024 * 1024) -> None:
+        super().__init__(name="LogWriter", daemon=True)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.json_lines = json_lines
+        self.flush_interval = flush_interval
+        self.flush_size = flush_size
+        self.queue = Queue(maxsize=queue_size)
+        self.file = None
+        self.partial = ""
+        self.partial_time = None
+        self.reported_failure = False
+        self.max_pending = max_pending
+        self.dropped = 0
+
+    def write(self, text: str) -> None:
+        '''
+        Queues `text` to be written, blocks only if the queue is full.
+        '''
+        self.queue.put((datetime.now(), text))
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        '''
+        Waits for everything queued so far to be written to disk. Returns `False` if it timed out.
+        '''
+        if not self.is_alive(): return False
+        done = threading.Event()
+        self.queue.put(done)
+        return done.wait(timeout)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        '''
+        Flushes pending messages and stops the writer thread.
+        '''
+        if not self.is_alive(): return
+        self.queue.put(None)
+        self.join(timeout)
+
+    def format(self, when: datetime, text: str) -> str:
+        if not self.json_lines: return text
+        if self.partial_time is None: self.partial_time = when
+        self.partial += text
+        if not text.endswith("\n"): return ""
+        line = json.dumps({"time": self.partial_time.isoformat(), "run_id": log_run_id, "message": self.partial[:-1]}, ensure_ascii=False) + "\n"
+        self.partial = ""
+        self.partial_time = None
+        return line
+
+    def rotate(self) -> None:
+        self.file.close()
+        self.file = None
+        for number in range(self.backup_count - 1, 0, -1):
+            if os.path.exists(f"{self.path}.{number}"): os.replace(f"{self.path}.{number}", f"{self.path}.{number + 1}")
+        if self.backup_count > 0: os.replace(self.path, f"{self.path}.1")
+        else: os.remove(self.path)
+
+    def write_batch(self, batch: list[str]) -> bool:
+        try:
+            if self.file is None:
+                make_directories([self.path])
+                self.file = open(self.path, 'a', encoding="utf-8")
+            if self.dropped:
+                note = f"[{self.dropped} older log messages were dropped while {self.path} couldn't be written]"
+                if self.json_lines: note = json.dumps({"time": datetime.now().isoformat(), "run_id": log_run_id, "message": note})
+                self.file.write(note + "\n")
+                self.dropped = 0
+            self.file.write("".join(batch))
+            self.file.flush()
+        except Exception as e:
+            if self.file:
+                try: self.file.close()
+                except Exception: pass
+                self.file = None
+            if not self.reported_failure:
+                print(f"{self.path} is open or is occupied by another program! Please close it! Will keep retrying to log...", e)
+                self.reported_failure = True
+            return False
+        self.reported_failure = False
+        # Batch is written, a failed rotation (Eg: another worker or an editor has the file open on Windows) is retried on a later write
+        if self.max_bytes > 0 and self.file.tell() >= self.max_bytes:
+            try: self.rotate()
+            except Exception: pass
+        return True
+
+    def run(self) -> None:
+        batch = []
+        batch_size = 0
+        last_flush = monotonic()
+        while True:
+            try: item = self.queue.get(timeout=max(0.0, self.flush_interval - (monotonic() - last_flush)))
+            except Empty: item = False
+            stopping = item is None
+            if stopping and self.partial: item = (datetime.now(), "\n")
+            if isinstance(item, tuple):
+                text = self.format(*item)
+                if text:
+                    batch.append(text)
+                    batch_size += len(text)
+            if batch and (stopping or isinstance(item, threading.Event) or batch_size >= self.flush_size or monotonic() - last_flush >= self.flush_interval):
+                if self.write_batch(batch):
+                    batch = []
+                    batch_size = 0
+                while batch_size > self.max_pending and len(batch) > 1:
+                    batch_size -= len(batch.pop(0))
+                    self.dropped += 1
+                last_flush = monotonic()
+            elif not batch:
+                last_flush = monotonic()
+            if isinstance(item, threading.Event): item.set()
+            if stopping:
+                if self.file: self.file.close()
+                return
+
+
+__log_writer = None
+__log_writer_lock = threading.Lock()
+
+
+def get_log_writer() -> LogWriter:
+    '''
+    Function to get the background `LogWriter`, starts it on first use.
+    '''
+    global __log_writer
+    if __log_writer is None or not __log_writer.is_alive():
+        with __log_writer_lock:
+            if __log_writer is None or not __log_writer.is_alive():
+                __log_writer = LogWriter(__logs_file_path, log_max_size_mb * 1024 * 1024, log_backup_count, log_json_lines)
+                __log_writer.start()
+    return __log_writer
+
+
+def flush_logs(stop: bool = False) -> None:
+    '''
+    Function to wait until all queued log messages are written to the log file.
+    * Also stops the background writer if `stop = True`
+    '''
+    if __log_writer is None: return
+    __log_writer.stop() if stop else __log_writer.flush()
+
+
+atexit.register(flush_logs, True)
 
 
 def print_lg(*msgs: str | dict, end: str = "\n", pretty: bool = False, flush: bool = False, from_critical: bool = False) -> None:
     '''
     Function to log and print. **Note that, `end` and `flush` parameters are ignored if `pretty = True`**
+    * Messages are written to the log file by a background `LogWriter`, call `flush_logs()` to wait for them
     '''
     try:
+        writer = get_log_writer()
         for message in msgs:
             pprint(message) if pretty else print(message, end=end, flush=flush)
-            with open(__logs_file_path, 'a+', encoding="utf-8") as file:
-                file.write(str(message) + end)
+            writer.write(str(message) + end)
     except Exception as e:
-        trail = f'Skipped saving this message: "{message}" to log.txt!' if from_critical else "We'll try one more time to log..."
-        alert(f"log.txt in {logs_folder_path} is open or is occupied by another program! Please close it! {trail}", "Failed Logging")
+        trail = f'Skipped saving this message: "{message}" to log!' if from_critical else "We'll try one more time to log..."
+        alert(f"Failed to log in {logs_folder_path}! {trail}", "Failed Logging")
         if not from_critical:
-            critical_error_log("Log.txt is open or is occupied by another program!", e)
+            critical_error_log("Failed to queue message for logging!", e)
 #>
 
 
@@ -0,0 +1,105 @@
+'''
+Author:     Sai Vignesh Golla
+LinkedIn:   https://www.linkedin.com/in/saivigneshgolla/
+
+Copyright (C) 2024 Sai Vignesh Golla
+
+License:    GNU Affero General Public License
+            https://www.gnu.org/licenses/agpl-3.0.en.html
+            
+GitHub:     https://github.com/GodsScion/Auto_job_applier_linkedIn
+
+version:    24.12.29.12.30
+'''
+
+# Imports
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from modules.helpers import print_lg
+
+
+#< Job cards snapshot
+# All job cards of a results page are read by one script call, instead of finding and reading each card's elements (6 to 8 calls a card).
+# LinkedIn only renders cards near the view ("occludable"). Cards not rendered yet are returned with `title` set to `null`,
+# and read again one at a time when their turn comes, with a `hydrate_timeout` to scroll to the card and wait for it to render.
+# Arguments: hydrate timeout ms (0 = don't scroll or wait), Job IDs to read (null = all cards)
+job_cards_script = r"""
+const done = arguments[arguments.length - 1];
+const [hydrateMs, jobIds] = arguments;
+const text = element => element ? element.innerText.trim() : '';
+const read = card => {
+  const anchor = card.querySelector('a');
+  const title = text(anchor).split('\n')[0];
+  if (!title) return null;
+  let subtitle = text(card.querySelector('.artdeco-entity-lockup__subtitle'));
+  let location = '';
+  const separator = subtitle.indexOf(' · ');
+  if (separator >= 0) [subtitle, location] = [subtitle.slice(0, separator), subtitle.slice(separator + 3)];
+  else location = text(card.querySelector('.artdeco-entity-lockup__caption, .job-card-container__metadata-item'));
+  const style = location.match(/\(([^)]*)\)\s*$/);
+  const posted = card.querySelector('time');
+  return {
+    title: title,
+    company: subtitle,
+    location: style ? location.slice(0, style.index).trim() : location,
+    work_style: style ? style[1] : '',
+    applied_state: text(card.querySelector('.job-card-container__footer-job-state')),
+    posted_time: posted ? (text(posted) || posted.getAttribute('datetime')) : null,
+  };
+};
+const hydrate = card => new Promise(resolve => {
+  card.scrollIntoView({block: 'center'});
+  const deadline = Date.now() + hydrateMs;
+  const poll = () => {
+    const details = read(card);
+    if (details || Date.now() >= deadline) return resolve(details);
+    setTimeout(poll, 50);
+  };
+  poll();
+});
+(async () => {
+  const cards = [];
+  for (const card of document.querySelectorAll('li[data-occludable-job-id]')) {
+    const jobId = card.getAttribute('data-occludable-job-id');
+    if (!jobId || (jobIds && !jobIds.includes(jobId))) continue;
+    const details = read(card) || (hydrateMs ? await hydrate(card) : null);
+    cards.push(Object.assign({job_id: jobId, title: null, company: null, location: null, work_style: null, applied_state: null, posted_time: null}, details));
+  }
+  return cards;
+})().then(done, error => done({error: String(error)}));
+"""
+
+
+def get_job_cards(driver: WebDriver, job_ids: list[str] | None = None, hydrate_timeout: float = 0) -> list[dict]:
+    '''
+    Function to read all job cards of the results page, or only those of `job_ids`, in page order.
+    * Returns [{"job_id", "title", "company", "location", "work_style", "applied_state", "posted_time"}, ...]
+    * `title` and the rest are `None` for cards not rendered yet, unless `hydrate_timeout` seconds are given
+      to scroll to each of them and wait for it to render (meant for a few cards, Eg: the one about to be opened)
+    '''
+    cards = driver.execute_async_script(job_cards_script, int(hydrate_timeout * 1000), job_ids)
+    if isinstance(cards, dict): raise RuntimeError(f"Failed to read job cards: {cards['error']}")
+    return cards
+
+
+def get_skip_reason(card: dict, blacklisted_companies: set, rejected_jobs: set, applied_jobs: set) -> str | None:
+    '''
+    Function to get why the job of `card` shouldn't be opened, `None` if it should.
+    '''
+    if card["company"] in blacklisted_companies: return "Blacklisted Company"
+    if card["job_id"] in rejected_jobs: return "Previously rejected"
+    if card["applied_state"] == "Applied" or card["job_id"] in applied_jobs: return "Already applied"
+    return None
+
+
+def filter_job_cards(cards: list[dict], blacklisted_companies: set, rejected_jobs: set, applied_jobs: set) -> list[dict]:
+    '''
+    Function to get the `cards` whose jobs should be opened, logging why the others are skipped.
+    '''
+    kept = []
+    for card in cards:
+        reason = get_skip_reason(card, blacklisted_companies, rejected_jobs, applied_jobs)
+        if reason: print_lg(f'Skipping "{card["title"]} | {card["company"]}" job ({reason}). Job ID: {card["job_id"]}!')
+        else: kept.append(card)
+    return kept
+#>
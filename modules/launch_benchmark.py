@@ -0,0 +1,102 @@
+'''
+Author:     Sai Vignesh Golla
+LinkedIn:   https://www.linkedin.com/in/saivigneshgolla/
+
+Copyright (C) 2024 Sai Vignesh Golla
+
+License:    GNU Affero General Public License
+            https://www.gnu.org/licenses/agpl-3.0.en.html
+            
+GitHub:     https://github.com/GodsScion/Auto_job_applier_linkedIn
+
+version:    24.12.29.12.30
+'''
+
+# Imports
+from time import sleep, perf_counter
+
+from modules.open_chrome import DriverSession
+
+
+#< Launch profile benchmark
+# Opens LinkedIn's public job search with each launch profile, then opens its jobs one by one like the bot does,
+# and samples memory (RSS) and CPU time of the whole Chrome process tree after each job. Needs the optional `psutil` package.
+default_search_url = "https://www.linkedin.com/jobs/search/?keywords=Software%20Engineer"
+
+
+def get_chrome_processes(driver) -> list:
+    import psutil
+    service = psutil.Process(driver.service.process.pid)
+    return [service] + service.children(recursive=True)
+
+
+def measure_processes(processes: list) -> tuple[float, float]:
+    '''
+    Function to get (total RSS in MB, total CPU seconds) of `processes`, skipping ones that exited.
+    * RSS counts memory shared between Chrome processes once per process, compare profiles with each other, not with other tools
+    '''
+    import psutil
+    rss, cpu = 0, 0.0
+    for process in processes:
+        try:
+            rss += process.memory_info().rss
+            times = process.cpu_times()
+            cpu += times.user + times.system
+        except psutil.Error:
+            pass
+    return rss / 1024 / 1024, cpu
+
+
+def benchmark_profile(profile: str, jobs: int = 10, url: str = default_search_url, settle: float = 2.0, headless: bool = True) -> dict:
+    '''
+    Function to open `jobs` jobs from search results `url` with launch `profile` and measure memory and CPU per job.
+    * Returns {"profile", "jobs", "startup_seconds", "mean_rss_mb", "peak_rss_mb", "cpu_seconds_per_job", "seconds_per_job"}
+    '''
+    started = perf_counter()
+    with DriverSession(profile=profile, headless=headless, user_data_dir=False, blocked_resources=[]) as session:
+        driver = session.driver
+        driver.get(url)
+        startup = perf_counter() - started
+        links = driver.execute_script("return Array.from(new Set(Array.from(document.querySelectorAll('a[href*=\"/jobs/view/\"]')).map(a => a.href.split('?')[0])));")[:jobs]
+        if not links: raise RuntimeError(f'No job links found on "{url}", is it a job search page?')
+        _, cpu_before = measure_processes(get_chrome_processes(driver))
+        samples = []
+        jobs_started = perf_counter()
+        for link in links:
+            driver.get(link)
+            sleep(settle)
+            samples.append(measure_processes(get_chrome_processes(driver))[0])
+        _, cpu_after = measure_processes(get_chrome_processes(driver))
+        elapsed = perf_counter() - jobs_started
+    return {
+        "profile": profile, "jobs": len(links), "startup_seconds": round(startup, 2),
+        "mean_rss_mb": round(sum(samples) / len(samples)), "peak_rss_mb": round(max(samples)),
+        "cpu_seconds_per_job": round((cpu_after - cpu_before) / len(links), 3), "seconds_per_job": round(elapsed / len(links), 2),
+    }
+
+
+def compare_profiles(profiles: list[str] = ["default", "lean"], **kwargs) -> list[dict]:
+    '''
+    Function to benchmark each launch profile of `profiles` and print a comparison.
+    '''
+    try:
+        import psutil   # noqa: F401
+    except ImportError:
+        raise RuntimeError('The launch benchmark needs "psutil", install it with "pip install psutil"')
+    results = [benchmark_profile(profile, **kwargs) for profile in profiles]
+    print(f"{'Profile':<10}{'Jobs':>6}{'Startup s':>11}{'Mean RSS MB':>13}{'Peak RSS MB':>13}{'CPU s/job':>11}{'s/job':>8}")
+    for result in results:
+        print(f"{result['profile']:<10}{result['jobs']:>6}{result['startup_seconds']:>11}{result['mean_rss_mb']:>13}{result['peak_rss_mb']:>13}{result['cpu_seconds_per_job']:>11}{result['seconds_per_job']:>8}")
+    return results
+#>
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(prog="python -m modules.launch_benchmark", description="Compare memory and CPU per job of Chrome launch profiles.")
+    parser.add_argument("--jobs", type=int, default=10, help="Jobs to open per profile")
+    parser.add_argument("--url", default=default_search_url, help="Job search results page to take jobs from")
+    parser.add_argument("--profiles", nargs="+", default=["default", "lean"], choices=["default", "lean"])
+    parser.add_argument("--headed", action="store_true", help="Show the browser instead of running headless")
+    args = parser.parse_args()
+    compare_profiles(args.profiles, jobs=args.jobs, url=args.url, headless=not args.headed)
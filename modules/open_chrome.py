@@ -12,52 +12,201 @@ GitHub:     https://github.com/GodsScion/Auto_job_applier_linkedIn
 version:    24.12.29.12.30
 '''
 
-from modules.helpers import make_directories
-from config.settings import run_in_background, stealth_mode, disable_extensions, safe_mode, file_name, failed_file_name, logs_folder_path, generated_resume_path
-from config.questions import default_resume_path
-if stealth_mode:
-    import undetected_chromedriver as uc
-else: 
-    from selenium import webdriver
-    from selenium.webdriver.chrome.options import Options
-    # from selenium.webdriver.chrome.service import Service
+from config.settings import run_in_background, stealth_mode, disable_extensions, safe_mode, blocked_resources, launch_profile, recycle_browser_heap_mb, page_load_strategy
 from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.support.ui import WebDriverWait
 from modules.helpers import find_default_profile_directory, critical_error_log, print_lg
+from modules.resource_blocking import ResourceBlocker, report_blocked_resources
+from modules.chrome_cache import get_cached_driver, create_session_profile, discard_session_profile
 
-try:
-    make_directories([file_name,failed_file_name,logs_folder_path+"/screenshots",default_resume_path,generated_resume_path+"/temp"])
 
-    # Set up WebDriver with Chrome Profile
-    options = uc.ChromeOptions() if stealth_mode else Options()
-    if run_in_background:   options.add_argument("--headless")
-    if disable_extensions:  options.add_argument("--disable-extensions")
+#< Launch profiles
+# "lean" trades nothing the bot uses for less memory and CPU per browser, to fit more workers on one machine:
+# a fixed small window instead of a maximized one, no GPU, no background services, fewer renderer processes and a capped JS heap.
+lean_window_size = (1280, 900)
 
-    print_lg("IF YOU HAVE MORE THAN 10 TABS OPENED, PLEASE CLOSE OR BOOKMARK THEM! Or it's highly likely that application will just open browser and not do anything!")
-    if safe_mode: 
-        print_lg("SAFE MODE: Will login with a guest profile, browsing history will not be saved in the browser!")
-    else:
-        profile_dir = find_default_profile_directory()
+
+def get_lean_arguments(heap_mb: int | None = None) -> list[str]:
+    '''
+    Function to get Chrome arguments of the "lean" launch profile.
+    * The JS heap is capped above `recycle_browser_heap_mb` (default), so the watchdog restarts Chrome before a tab runs out of memory
+    '''
+    heap_mb = heap_mb or (recycle_browser_heap_mb + 256 if recycle_browser_heap_mb else 1024)
+    return [
+        f"--window-size={lean_window_size[0]},{lean_window_size[1]}",
+        "--disable-gpu",
+        "--disable-background-networking",
+        "--disable-component-update",
+        "--disable-default-apps",
+        "--disable-sync",
+        "--disable-client-side-phishing-detection",
+        "--disable-domain-reliability",
+        "--disable-breakpad",
+        "--metrics-recording-only",
+        "--no-first-run",
+        "--no-default-browser-check",
+        "--mute-audio",
+        "--disable-dev-shm-usage",
+        "--disable-features=Translate,OptimizationHints,MediaRouter,BackForwardCache,AutofillServerCommunication,CalculateNativeWinOcclusion,InterestFeedContentSuggestions",
+        "--renderer-process-limit=2",
+        f"--js-flags=--max-old-space-size={heap_mb}",
+    ]
+#>
+
+
+#< Driver sessions
+# Nothing is launched when this module is imported. A `DriverSession` starts Chrome on first use of `driver`, `wait` or `actions`
+# (or on `start()`), and quits it on `quit()` or when leaving a `with` block. Several sessions can be open in one process,
+# as long as they don't share a `user_data_dir` (Chrome locks profiles).
+class DriverSession:
+    '''
+    Lazily started Chrome session.
+    * `arguments` are added to the default Chrome arguments, `options` replaces them entirely (Eg: for tests or benchmarks)
+    * `user_data_dir` defaults to the default Chrome profile, unless in `safe_mode`, use `False` for a guest profile
+    * In `safe_mode` each start gets a temporary profile copied from the warm profile template (caches only), deleted on `quit()`
+    * `blocked_resources` are categories of requests Chrome won't download, see `modules.resource_blocking`, counted by `blocker`
+    * `profile` is the launch profile, "default" (maximized window) or "lean", see `get_lean_arguments()`
+    * `load_strategy` is when `driver.get()` returns: "normal" (page loaded) or "eager" (HTML parsed)
+    '''
+    def __init__(self, options=None, arguments: list[str] | None = None, stealth: bool = stealth_mode, headless: bool = run_in_background,
+                 user_data_dir: str | bool | None = None, maximize: bool = True, wait_timeout: float = 5, blocked_resources: list[str] = blocked_resources,
+                 profile: str = launch_profile, load_strategy: str = page_load_strategy) -> None:
+        self.options = options
+        self.arguments = list(arguments or [])
+        self.stealth = stealth
+        self.headless = headless
+        self.user_data_dir = user_data_dir
+        self.profile = profile
+        self.load_strategy = load_strategy
+        self.maximize = maximize and profile != "lean"
+        self.wait_timeout = wait_timeout
+        self.blocker = ResourceBlocker(blocked_resources) if blocked_resources else None
+        self._temporary_profile = None
+        self._driver = None
+        self._wait = None
+        self._actions = None
+
+    def build_options(self):
+        '''
+        Function to build Chrome options from settings and this session's arguments.
+        '''
+        if self.stealth:
+            import undetected_chromedriver as uc
+            options = uc.ChromeOptions()
+        else:
+            from selenium.webdriver.chrome.options import Options
+            options = Options()
+        if self.headless:       options.add_argument("--headless")
+        if disable_extensions:  options.add_argument("--disable-extensions")
+        if self.profile == "lean":
+            for argument in get_lean_arguments(): options.add_argument(argument)
+
+        print_lg("IF YOU HAVE MORE THAN 10 TABS OPENED, PLEASE CLOSE OR BOOKMARK THEM! Or it's highly likely that application will just open browser and not do anything!")
+        profile_dir = self.user_data_dir
+        if profile_dir is None:
+            if safe_mode:
+                print_lg("SAFE MODE: Will login with a guest profile, browsing history will not be saved in the browser!")
+                profile_dir = self._temporary_profile = create_session_profile()
+                if profile_dir: options.add_argument("--disk-cache-size=104857600")    # Keeps the warm template small
+            else:
+                profile_dir = find_default_profile_directory()
+                if not profile_dir: print_lg("Default profile directory not found. Logging in with a guest profile, Web history will not be saved!")
         if profile_dir: options.add_argument(f"--user-data-dir={profile_dir}")
-        else: print_lg("Default profile directory not found. Logging in with a guest profile, Web history will not be saved!")
-    if stealth_mode:
-        # try: 
-        #     driver = uc.Chrome(driver_executable_path="C:\\Program Files\\Google\\Chrome\\chromedriver-win64\\chromedriver.exe", options=options)
-        # except (FileNotFoundError, PermissionError) as e: 
-        #     print_lg("(Undetected Mode) Got '{}' when using pre-installed ChromeDriver.".format(type(e).__name__)) 
-            print_lg("Downloading Chrome Driver... This may take some time. Undetected mode requires download every run!")
-            driver = uc.Chrome(options=options)
-    else: driver = webdriver.Chrome(options=options) #, service=Service(executable_path="C:\\Program Files\\Google\\Chrome\\chromedriver-win64\\chromedriver.exe"))
-    driver.maximize_window()
-    wait = WebDriverWait(driver, 5)
-    actions = ActionChains(driver)
-except Exception as e:
+        for argument in self.arguments: options.add_argument(argument)
+        options.page_load_strategy = self.load_strategy
+        if self.blocker: self.blocker.configure_options(options)
+        return options
+
+    def start(self):
+        '''
+        Function to launch Chrome if it isn't running yet. Returns the driver.
+        * Raises whatever launching raised, see `explain_launch_error()`
+        '''
+        if self._driver is not None: return self._driver
+        options = self.options if self.options is not None else self.build_options()
+        driver_path = get_cached_driver(self.stealth)
+        try:
+            if self.stealth:
+                import undetected_chromedriver as uc
+                if driver_path:
+                    driver = uc.Chrome(options=options, driver_executable_path=driver_path)
+                else:
+                    print_lg("Downloading Chrome Driver... This may take some time. Undetected mode requires download every run!")
+                    driver = uc.Chrome(options=options)
+            else:
+                from selenium import webdriver
+                from selenium.webdriver.chrome.service import Service
+                driver = webdriver.Chrome(options=options, service=Service(executable_path=driver_path) if driver_path else None)
+        except Exception:
+            self.__discard_profile()
+            raise
+        try:
+            if self.maximize: driver.maximize_window()
+            driver.set_script_timeout(120)    # Readiness waits run as async scripts, they end by their own timeouts
+        except Exception:
+            driver.quit()
+            self.__discard_profile()
+            raise
+        if self.blocker:
+            try:
+                self.blocker.apply(driver)
+                print_lg(f"Blocking {', '.join(self.blocker.categories)} requests.")
+            except Exception as e:
+                print_lg("Failed to block resources, pages will load fully!", e)
+                self.blocker = None
+        self._driver = driver
+        return driver
+
+    @property
+    def started(self) -> bool:
+        return self._driver is not None
+
+    @property
+    def driver(self):
+        return self.start()
+
+    @property
+    def wait(self) -> WebDriverWait:
+        if self._wait is None: self._wait = WebDriverWait(self.driver, self.wait_timeout)
+        return self._wait
+
+    @property
+    def actions(self) -> ActionChains:
+        if self._actions is None: self._actions = ActionChains(self.driver)
+        return self._actions
+
+    def quit(self) -> None:
+        '''
+        Function to quit Chrome if it was started. The session can be started again afterwards.
+        '''
+        driver, self._driver, self._wait, self._actions = self._driver, None, None, None
+        if driver is None: return
+        report_blocked_resources(self.blocker, driver)
+        try: driver.quit()
+        finally: self.__discard_profile()
+
+    def __discard_profile(self) -> None:
+        if self._temporary_profile: discard_session_profile(self._temporary_profile)
+        self._temporary_profile = None
+
+    close = quit
+
+    def __enter__(self) -> "DriverSession":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.quit()
+
+
+def explain_launch_error(e: Exception) -> None:
+    '''
+    Function to log and show the user likely causes of Chrome failing to launch with error `e`.
+    '''
     msg = 'Seems like either... \n\n1. Chrome is already running. \nA. Close all Chrome windows and try again. \n\n2. Google Chrome or Chromedriver is out dated. \nA. Update browser and Chromedriver (You can run "windows-setup.bat" in /setup folder for Windows PC to update Chromedriver)! \n\n3. If error occurred when using "stealth_mode", try reinstalling undetected-chromedriver. \nA. Open a terminal and use commands "pip uninstall undetected-chromedriver" and "pip install undetected-chromedriver". \n\n\nIf issue persists, try Safe Mode. Set, safe_mode = True in config.py \n\nPlease check GitHub discussions/support for solutions https://github.com/GodsScion/Auto_job_applier_linkedIn \n                                   OR \nReach out in discord ( https://discord.gg/fFp7uUzWCY )'
     if isinstance(e,TimeoutError): msg = "Couldn't download Chrome-driver. Set stealth_mode = False in config!"
     print_lg(msg)
     critical_error_log("In Opening Chrome", e)
     from pyautogui import alert
     alert(msg, "Error in opening chrome")
-    try: driver.quit()
-    except NameError: exit()
-    
+#>
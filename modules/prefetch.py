@@ -0,0 +1,150 @@
+'''
+Author:     Sai Vignesh Golla
+LinkedIn:   https://www.linkedin.com/in/saivigneshgolla/
+
+Copyright (C) 2024 Sai Vignesh Golla
+
+License:    GNU Affero General Public License
+            https://www.gnu.org/licenses/agpl-3.0.en.html
+            
+GitHub:     https://github.com/GodsScion/Auto_job_applier_linkedIn
+
+version:    24.12.29.12.30
+'''
+
+# Imports
+from time import sleep, monotonic
+
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from modules.helpers import print_lg
+
+
+#< Job details prefetching
+# While the Easy Apply form of one job is filled in the LinkedIn tab, the next job's page ("/jobs/view/<id>") loads in a second tab.
+# Chrome loads it in parallel, Selenium only switches to that tab once when the job's turn comes, to read it and start loading the next.
+# Jobs are checked (blacklist, experience, description) on what was read, the LinkedIn tab only opens the jobs that are kept.
+# Chrome arguments that keep the background tab loading at full speed.
+prefetch_chrome_arguments = ["--disable-background-timer-throttling", "--disable-renderer-backgrounding", "--disable-backgrounding-occluded-windows"]
+
+# Returns null until the job description is rendered
+extract_job_details_script = r"""
+const text = (selectors, root = document) => {
+  for (const selector of selectors) {
+    const element = root.querySelector(selector);
+    if (element && element.innerText.trim()) return element.innerText.trim();
+  }
+  return null;
+};
+const description = text(['.jobs-box__html-content', '.jobs-description__content', '.jobs-description-content__text']);
+if (!description) return null;
+const topCard = document.querySelector('.job-details-jobs-unified-top-card__primary-description-container, .job-details-jobs-unified-top-card__primary-description, .jobs-unified-top-card__primary-description');
+const posted = topCard ? Array.from(topCard.querySelectorAll('span')).map(span => span.innerText.trim()).find(value => value.includes(' ago')) : null;
+const hirer = document.querySelector('.hirer-card__hirer-information');
+const hirerLink = hirer ? hirer.querySelector('a') : null;
+const hirerName = hirer ? hirer.querySelector('span') : null;
+return {
+  title: text(['.job-details-jobs-unified-top-card__job-title', '.jobs-unified-top-card__job-title']),
+  company: text(['.job-details-jobs-unified-top-card__company-name', '.jobs-unified-top-card__company-name']),
+  description: description,
+  about_company: text(['.jobs-company__box']),
+  hr_link: hirerLink ? hirerLink.href : null,
+  hr_name: hirerName ? hirerName.innerText.trim() : null,
+  time_posted: posted || null,
+  applied: !!document.querySelector('.jobs-s-apply__application-link'),
+};
+"""
+
+
+class JobPrefetcher:
+    '''
+    Loads job pages ahead of time in a second tab of `driver` and reads their details when they're needed.
+    * `prefetch(job_id)` starts loading a job and returns immediately
+    * `take(job_id, next_job_id)` returns {"title", "company", "description", "about_company", "hr_link", "hr_name", "time_posted", "applied"}
+      of a prefetched job, or `None` if it wasn't prefetched or didn't render within `wait_timeout` seconds, and starts loading `next_job_id`
+    * The tab it works in is `handle`, the driver is always left on the tab it was on
+    * If a resource `blocker` is given, it's applied to that tab too
+    '''
+    def __init__(self, driver: WebDriver, wait_timeout: float = 3.0, blocker=None) -> None:
+        self.driver = driver
+        self.wait_timeout = wait_timeout
+        self.blocker = blocker
+        self.handle = None
+        self.job_id = None
+        self.hits = 0
+        self.misses = 0
+
+    def __open_tab(self) -> None:
+        current = self.driver.current_window_handle
+        self.driver.switch_to.new_window('tab')
+        self.handle = self.driver.current_window_handle
+        if self.blocker:
+            try: self.blocker.apply(self.driver)
+            except Exception as e: print_lg("Failed to block resources in the prefetch tab!", e)
+        self.driver.switch_to.window(current)
+
+    def __load(self, job_id: str) -> None:
+        '''
+        Starts loading `job_id` in the prefetch tab, which must be the current one.
+        '''
+        try:
+            # Assigning location doesn't wait for the page to load, unlike `driver.get()`
+            self.driver.execute_script("window.location.href = arguments[0];", f"https://www.linkedin.com/jobs/view/{job_id}/")
+            self.job_id = job_id
+        except Exception as e:
+            print_lg(f"Failed to prefetch job {job_id}!", e)
+            self.job_id = None
+
+    def prefetch(self, job_id: str) -> None:
+        if not job_id or job_id == self.job_id: return
+        current = self.driver.current_window_handle
+        try:
+            if self.handle not in self.driver.window_handles: self.__open_tab()
+            self.driver.switch_to.window(self.handle)
+            self.__load(job_id)
+        except Exception as e:
+            print_lg(f"Failed to prefetch job {job_id}!", e)
+            self.job_id = None
+        finally:
+            self.driver.switch_to.window(current)
+
+    def take(self, job_id: str, next_job_id: str | None = None) -> dict | None:
+        if not job_id or job_id != self.job_id:
+            self.misses += 1
+            self.prefetch(next_job_id)
+            return None
+        self.job_id = None
+        current = self.driver.current_window_handle
+        try:
+            self.driver.switch_to.window(self.handle)
+            deadline = monotonic() + self.wait_timeout
+            while True:
+                details = self.driver.execute_script(extract_job_details_script)
+                if details or monotonic() >= deadline: break
+                sleep(0.2)
+        except Exception as e:
+            print_lg(f"Failed to read prefetched job {job_id}!", e)
+            details = None
+        try:
+            if next_job_id and self.driver.current_window_handle == self.handle: self.__load(next_job_id)
+        finally:
+            self.driver.switch_to.window(current)
+        if details: self.hits += 1
+        else: self.misses += 1
+        return details
+
+    def close(self) -> None:
+        '''
+        Function to close the prefetch tab, if it's open.
+        '''
+        self.job_id = None
+        if self.handle is None: return
+        current = self.driver.current_window_handle
+        try:
+            if self.handle in self.driver.window_handles:
+                self.driver.switch_to.window(self.handle)
+                self.driver.close()
+        finally:
+            self.handle = None
+            self.driver.switch_to.window(current)
+#>
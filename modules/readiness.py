@@ -0,0 +1,180 @@
+'''
+Author:     Sai Vignesh Golla
+LinkedIn:   https://www.linkedin.com/in/saivigneshgolla/
+
+Copyright (C) 2024 Sai Vignesh Golla
+
+License:    GNU Affero General Public License
+            https://www.gnu.org/licenses/agpl-3.0.en.html
+            
+GitHub:     https://github.com/GodsScion/Auto_job_applier_linkedIn
+
+version:    24.12.29.12.30
+'''
+
+# Imports
+from config.settings import readiness_timeout
+
+from selenium.webdriver.remote.webdriver import WebDriver
+from selenium.webdriver.remote.webelement import WebElement
+
+
+#< Readiness waits
+# Instead of sleeping a fixed time, these wait in the page for a DOM condition with a MutationObserver and return as soon as it holds,
+# or after `readiness_timeout` seconds at most.
+
+# Arguments: condition function body (gets `args`, returns a value, truthy when ready, or null to only wait for quiet),
+# args, timeout ms, quiet ms (value must stay the same this long), root to observe: a CSS selector, or an element (observes the dialog
+# it's in, or its parent), null = whole document
+wait_script = r"""
+const done = arguments[arguments.length - 1];
+const [body, args, timeoutMs, quietMs, rootSelector] = arguments;
+const condition = body ? new Function('args', body) : null;
+const root = (rootSelector instanceof Element ? rootSelector.closest('[role="dialog"], .artdeco-modal') || rootSelector.parentElement || rootSelector
+              : rootSelector && document.querySelector(rootSelector)) || document.documentElement;
+let finished = false, quietTimer = null, last;
+const evaluate = () => {
+  if (!condition) return true;
+  try { return condition(args); } catch (e) { return null; }
+};
+const finish = value => {
+  if (finished) return;
+  finished = true;
+  observer.disconnect();
+  clearTimeout(capTimer);
+  clearTimeout(quietTimer);
+  done(value === undefined ? null : value);
+};
+const check = () => {
+  const value = evaluate();
+  if (!value) { clearTimeout(quietTimer); quietTimer = null; last = undefined; return; }
+  if (!quietMs) return finish(value);
+  const key = condition ? JSON.stringify(value) : undefined;
+  if (quietTimer && condition && key === last) return;
+  last = key;
+  clearTimeout(quietTimer);
+  quietTimer = setTimeout(() => finish(evaluate()), quietMs);
+};
+const observer = new MutationObserver(check);
+observer.observe(root, {childList: true, subtree: true, attributes: true, characterData: true});
+const capTimer = setTimeout(() => finish(null), timeoutMs);
+check();
+"""
+
+
+# LinkedIn pages never stop changing as a whole (feed, toasts, presence), so waits for quiet watch a dialog or element
+# and end after `settle_timeout` seconds at most. Typeaheads that show no suggestions are given up on after `typeahead_timeout`.
+settle_timeout = min(readiness_timeout, 2)
+typeahead_timeout = min(readiness_timeout, 1.5)
+
+
+def get_driver(driver: WebDriver | WebElement) -> WebDriver:
+    return driver.parent if isinstance(driver, WebElement) else driver
+
+
+def wait_for(driver: WebDriver | WebElement, condition: str | None, args=None, timeout: float = readiness_timeout, quiet: float = 0, root: str | WebElement | None = None):
+    '''
+    Function to wait until JS `condition` (a function body getting `args`) returns something truthy, and returns it.
+    * If `quiet` seconds is given, the value must also stay the same that long (Eg: a list stopped growing)
+    * If `condition` is `None`, waits for the page (or `root`) to have no changes for `quiet` seconds
+    * `root` is a CSS selector or an element, changes are only watched in it (an element's dialog, or its parent)
+    * Returns `None` if it didn't happen within `timeout` seconds, or the page couldn't be checked
+    '''
+    try:
+        return get_driver(driver).execute_async_script(wait_script, condition, args, int(timeout * 1000), int(quiet * 1000), root)
+    except Exception:
+        return None
+
+
+def wait_for_stable_count(driver: WebDriver, css: str, quiet: float = 0.4, timeout: float = readiness_timeout) -> int:
+    '''
+    Function to wait until there are elements matching `css` and their count stopped changing for `quiet` seconds. Returns the count.
+    '''
+    return wait_for(driver, "return document.querySelectorAll(args).length;", css, timeout, quiet) or 0
+
+
+def wait_for_job_details(driver: WebDriver, job_id: str, timeout: float = readiness_timeout) -> bool:
+    '''
+    Function to wait until the job details panel of search results shows job `job_id`, after its card was clicked.
+    '''
+    condition = r"""
+const panel = document.querySelector('.jobs-search__job-details--wrapper, .jobs-search__job-details, .jobs-details');
+if (!panel) return false;
+const shown = panel.querySelector(`a[href*="/jobs/view/${args}"], [data-job-id="${args}"]`);
+return !!shown && !!panel.querySelector('.jobs-box__html-content, .jobs-description__content');
+"""
+    return bool(wait_for(driver, condition, job_id, timeout))
+
+
+
+def wait_for_job_top_card(driver: WebDriver, job_id: str, timeout: float = readiness_timeout) -> bool:
+    '''
+    Function to wait until the job details panel shows job `job_id` with its apply button, without waiting for the description
+    (Eg: it was already read from the prefetch tab).
+    '''
+    condition = r"""
+const panel = document.querySelector('.jobs-search__job-details--wrapper, .jobs-search__job-details, .jobs-details');
+if (!panel) return false;
+const shown = panel.querySelector(`a[href*="/jobs/view/${args}"], [data-job-id="${args}"]`);
+return !!shown && !!panel.querySelector('.jobs-apply-button, .jobs-s-apply');
+"""
+    return bool(wait_for(driver, condition, job_id, timeout))
+
+def wait_for_typeahead(driver: WebDriver | WebElement, timeout: float = typeahead_timeout) -> bool:
+    '''
+    Function to wait until a typeahead (Eg: location or company autocomplete) shows suggestions.
+    '''
+    condition = r"""
+const options = document.querySelectorAll('[role="listbox"] [role="option"], .basic-typeahead__selectable, .search-typeahead-v2__hit, .jobs-search-box__typeahead-suggestion');
+return Array.from(options).some(option => option.offsetParent !== null);
+"""
+    return bool(wait_for(driver, condition, None, timeout))
+
+
+def wait_until_settled(driver: WebDriver | WebElement, quiet: float = 0.15, timeout: float = settle_timeout, root: str | WebElement | None = None) -> bool:
+    '''
+    Function to wait until `root` (CSS selector or element, see `wait_for()`) or the page had no changes for `quiet` seconds (Eg: after a click that changes a dialog).
+    '''
+    return bool(wait_for(driver, None, None, timeout, quiet, root))
+#>
+
+
+#< Navigation probes
+# With `page_load_strategy` "eager", `driver.get()` returns once the HTML is parsed, before the page finished loading,
+# so after navigating, the bot waits for the elements it needs instead. ("none" isn't allowed, `driver.get()` would return
+# before navigating and the probes could pass on the previous page.) Pages get 4 times `readiness_timeout` to show up.
+navigation_timeout = readiness_timeout * 4
+
+
+def wait_for_job_list(driver: WebDriver, timeout: float = navigation_timeout) -> bool:
+    '''
+    Function to wait until search results show job cards, or say there are none.
+    '''
+    condition = "return !!document.querySelector('li[data-occludable-job-id], .jobs-search-no-results-banner, .jobs-search-two-pane__no-results-banner');"
+    return bool(wait_for(driver, condition, None, timeout))
+
+
+def wait_for_search_results(driver: WebDriver, timeout: float = navigation_timeout) -> bool:
+    '''
+    Function to wait until a job search page has its results and its search box and filters button, after opening it.
+    '''
+    condition = r"""
+const results = document.querySelector('li[data-occludable-job-id], .jobs-search-no-results-banner, .jobs-search-two-pane__no-results-banner');
+const controls = document.querySelector('input[aria-label="City, state, or zip code"], .jobs-search-box__text-input, .search-reusables__all-filters-pill-button');
+return !!(results && controls);
+"""
+    return bool(wait_for(driver, condition, None, timeout))
+
+
+def wait_for_login_page(driver: WebDriver, timeout: float = navigation_timeout) -> bool:
+    '''
+    Function to wait until the login page's form can be typed in, or LinkedIn redirected a logged in user away from it.
+    '''
+    condition = r"""
+if (location.pathname.startsWith('/feed') || document.querySelector('#global-nav, .global-nav')) return true;
+const username = document.querySelector('#username');
+const submit = document.querySelector('button[type="submit"]');
+return !!(username && !username.disabled && username.offsetParent !== null && submit && document.readyState !== 'loading');
+"""
+    return bool(wait_for(driver, condition, None, timeout))
+#>
@@ -0,0 +1,161 @@
+'''
+Author:     Sai Vignesh Golla
+LinkedIn:   https://www.linkedin.com/in/saivigneshgolla/
+
+Copyright (C) 2024 Sai Vignesh Golla
+
+License:    GNU Affero General Public License
+            https://www.gnu.org/licenses/agpl-3.0.en.html
+            
+GitHub:     https://github.com/GodsScion/Auto_job_applier_linkedIn
+
+version:    24.12.29.12.30
+'''
+
+# Imports
+import json
+
+from fnmatch import fnmatchcase
+
+from modules.helpers import print_lg
+
+
+#< Blocked resources
+# URL patterns (Chrome DevTools `Network.setBlockedURLs` wildcards) of each category that can be listed in `blocked_resources`.
+# Requests matching them are failed by Chrome before anything is downloaded.
+# SVGs are not blocked, LinkedIn draws its icons with them.
+resource_patterns = {
+    "images": ["*.jpg*", "*.jpeg*", "*.png*", "*.gif*", "*.webp*", "*.avif*", "*.ico*", "*media.licdn.com/dms/image/*", "*static.licdn.com/aero-v1/sc/h/*.png*"],
+    "media": ["*.mp4*", "*.webm*", "*.m3u8*", "*.m4s*", "*.mp3*", "*dms.licdn.com/playlist/*", "*media.licdn.com/dms/video/*"],
+    "fonts": ["*.woff*", "*.ttf*", "*.otf*", "*.eot*"],
+    "trackers": [
+        "*px.ads.linkedin.com/*", "*linkedin.com/li/track*", "*linkedin.com/collect*", "*snap.licdn.com/*", "*platform.linkedin.com/litms/*",
+        "*doubleclick.net/*", "*google-analytics.com/*", "*googletagmanager.com/*", "*googleadservices.com/*", "*bat.bing.com/*",
+        "*facebook.net/*", "*connect.facebook.com/*", "*hotjar.com/*", "*demdex.net/*", "*omtrdc.net/*", "*adsrvr.org/*",
+    ],
+}
+
+
+class ResourceBlocker:
+    '''
+    Blocks `categories` (keys of `resource_patterns`) of requests in a Chrome session and counts what was blocked.
+    * Counting reads Chrome's performance log, enable it on launch with `configure_options()`
+    * Blocked requests are never downloaded, so their bytes are unknown, `measure_savings()` compares a page load with and without blocking
+    '''
+    def __init__(self, categories: list[str]) -> None:
+        unknown = [category for category in categories if category not in resource_patterns]
+        if unknown: raise ValueError(f"Unknown resource categories {unknown}, expected some of {list(resource_patterns)}")
+        self.categories = list(dict.fromkeys(categories))
+        self.patterns = [pattern for category in self.categories for pattern in resource_patterns[category]]
+        self.blocked = {category: 0 for category in self.categories}
+        self.loaded_requests = 0
+        self.loaded_bytes = 0
+        self.__urls = {}
+
+    def configure_options(self, options) -> None:
+        '''
+        Function to make Chrome `options` keep a network-only performance log, which `collect()` reads.
+        '''
+        options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+        try: options.add_experimental_option("perfLoggingPrefs", {"enableNetwork": True, "enablePage": False})
+        except Exception: pass    # Some ChromeOptions (Eg: undetected-chromedriver) don't take it, the log just has page events too
+
+    def apply(self, driver, enabled: bool = True) -> None:
+        '''
+        Function to start (or stop if not `enabled`) blocking in the current tab of `driver`, for every page opened in it after it.
+        * DevTools network settings are per tab, call it again after switching to a new tab that loads pages (Eg: the prefetch tab)
+        '''
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": self.patterns if enabled else []})
+
+    def get_category(self, url: str) -> str | None:
+        for category in self.categories:
+            if any(fnmatchcase(url, pattern) for pattern in resource_patterns[category]): return category
+        return None
+
+    def collect(self, driver) -> dict:
+        '''
+        Function to count requests blocked and bytes downloaded since it was last called, from `driver`'s performance log.
+        * Call it now and then (Eg: once per results page), Chrome keeps the log in memory until it's read
+        * Returns counts of this call {"blocked": {category: requests}, "loaded_requests", "loaded_bytes"}, totals are kept in the blocker
+        '''
+        counts = {"blocked": {category: 0 for category in self.categories}, "loaded_requests": 0, "loaded_bytes": 0}
+        try:
+            entries = driver.get_log("performance")
+        except Exception:
+            return counts    # Performance log not enabled
+        for entry in entries:
+            try:
+                message = json.loads(entry["message"])["message"]
+            except (KeyError, ValueError):
+                continue
+            method, params = message.get("method"), message.get("params", {})
+            if method == "Network.requestWillBeSent":
+                self.__urls[params.get("requestId")] = params.get("request", {}).get("url", "")
+            elif method == "Network.loadingFinished":
+                self.__urls.pop(params.get("requestId"), None)
+                counts["loaded_requests"] += 1
+                counts["loaded_bytes"] += int(params.get("encodedDataLength") or 0)
+            elif method == "Network.loadingFailed":
+                url = self.__urls.pop(params.get("requestId"), "")
+                if params.get("blockedReason") != "inspector": continue
+                category = self.get_category(url)
+                if category: counts["blocked"][category] += 1
+        for category, requests in counts["blocked"].items(): self.blocked[category] += requests
+        self.loaded_requests += counts["loaded_requests"]
+        self.loaded_bytes += counts["loaded_bytes"]
+        return counts
+
+    def summary(self) -> str:
+        blocked = ", ".join(f"{requests} {category}" for category, requests in self.blocked.items())
+        return f"Blocked {sum(self.blocked.values())} requests ({blocked}), downloaded {self.loaded_requests} requests ({self.loaded_bytes / 1024 / 1024:.1f} MB)"
+
+    def measure_savings(self, driver, url: str, settle: float = 5.0) -> dict:
+        '''
+        Function to load `url` in `driver` without and then with blocking (browser cache disabled) and compare what was downloaded.
+        * Returns {"unblocked_bytes", "blocked_bytes", "saved_bytes", "unblocked_requests", "blocked_requests", "blocked"}
+        '''
+        from time import sleep
+        driver.execute_cdp_cmd("Network.setCacheDisabled", {"cacheDisabled": True})
+        try:
+            result = {}
+            for enabled in (False, True):
+                self.apply(driver, enabled)
+                self.collect(driver)
+                driver.get(url)
+                sleep(settle)
+                counts = self.collect(driver)
+                name = "blocked" if enabled else "unblocked"
+                result[f"{name}_bytes"], result[f"{name}_requests"] = counts["loaded_bytes"], counts["loaded_requests"]
+                if enabled: result["blocked"] = counts["blocked"]
+            result["saved_bytes"] = result["unblocked_bytes"] - result["blocked_bytes"]
+            return result
+        finally:
+            driver.execute_cdp_cmd("Network.setCacheDisabled", {"cacheDisabled": False})
+
+
+def report_blocked_resources(blocker: ResourceBlocker | None, driver) -> None:
+    '''
+    Function to collect and log what `blocker` blocked so far in `driver`, does nothing if blocking is off.
+    '''
+    if blocker is None: return
+    try:
+        blocker.collect(driver)
+        print_lg(blocker.summary())
+    except Exception as e:
+        print_lg("Failed to collect blocked resources!", e)
+#>
+
+
+if __name__ == "__main__":
+    import argparse
+    from modules.open_chrome import DriverSession
+    parser = argparse.ArgumentParser(prog="python -m modules.resource_blocking", description="Measure how much blocking resources saves on a page.")
+    parser.add_argument("url", nargs="?", default="https://www.linkedin.com/jobs/search/?keywords=Software%20Engineer")
+    parser.add_argument("--block", nargs="+", default=list(resource_patterns), choices=list(resource_patterns), help="Categories to block")
+    args = parser.parse_args()
+    with DriverSession(blocked_resources=args.block, user_data_dir=False) as session:
+        savings = session.blocker.measure_savings(session.driver, args.url)
+    print(f"Without blocking: {savings['unblocked_requests']} requests, {savings['unblocked_bytes'] / 1024:.0f} KB")
+    print(f"With blocking:    {savings['blocked_requests']} requests, {savings['blocked_bytes'] / 1024:.0f} KB, blocked {savings['blocked']}")
+    print(f"Saved:            {savings['saved_bytes'] / 1024:.0f} KB ({savings['saved_bytes'] * 100 // max(savings['unblocked_bytes'], 1)}%)")
@@ -0,0 +1,185 @@
+'''
+Author:     Sai Vignesh Golla
+LinkedIn:   https://www.linkedin.com/in/saivigneshgolla/
+
+Copyright (C) 2024 Sai Vignesh Golla
+
+License:    GNU Affero General Public License
+            https://www.gnu.org/licenses/agpl-3.0.en.html
+            
+GitHub:     https://github.com/GodsScion/Auto_job_applier_linkedIn
+
+version:    24.12.29.12.30
+'''
+
+# Imports
+import os
+import json
+
+from time import time
+
+from config.settings import session_state_file
+from modules.helpers import print_lg
+from modules.storage.locks import file_lock
+
+
+#< Encryption
+# Saved sessions are encrypted with Windows DPAPI (tied to the Windows user, nothing to install), or elsewhere with Fernet
+# from the optional `cryptography` package using a key kept in the user's home folder. Without either, sessions aren't saved.
+key_file = os.path.join(os.path.expanduser("~"), ".auto_job_applier", "session.key")
+
+
+def __dpapi(data: bytes, protect: bool) -> bytes:
+    import ctypes
+    from ctypes import wintypes
+
+    class DataBlob(ctypes.Structure):
+        _fields_ = [("cbData", wintypes.DWORD), ("pbData", ctypes.POINTER(ctypes.c_char))]
+
+    buffer = ctypes.create_string_buffer(data, len(data))
+    blob_in, blob_out = DataBlob(len(data), ctypes.cast(buffer, ctypes.POINTER(ctypes.c_char))), DataBlob()
+    crypt32 = ctypes.windll.crypt32
+    if protect: ok = crypt32.CryptProtectData(ctypes.byref(blob_in), "Auto Job Applier session", None, None, None, 0, ctypes.byref(blob_out))
+    else: ok = crypt32.CryptUnprotectData(ctypes.byref(blob_in), None, None, None, None, 0, ctypes.byref(blob_out))
+    if not ok: raise ctypes.WinError()
+    try: return ctypes.string_at(blob_out.pbData, blob_out.cbData)
+    finally: ctypes.windll.kernel32.LocalFree(blob_out.pbData)
+
+
+def __get_fernet():
+    from cryptography.fernet import Fernet
+    if not os.path.exists(key_file):
+        os.makedirs(os.path.dirname(key_file), exist_ok=True)
+        try:
+            descriptor = os.open(key_file, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o600)
+            with os.fdopen(descriptor, 'wb') as file: file.write(Fernet.generate_key())
+        except FileExistsError:
+            pass    # Another worker just created it
+    with open(key_file, 'rb') as file:
+        return Fernet(file.read().strip())
+
+
+def get_cipher() -> str:
+    '''
+    Function to get the encryption available here, "dpapi" or "fernet". Raises `RuntimeError` if there's none.
+    '''
+    if os.name == "nt": return "dpapi"
+    try:
+        import cryptography     # noqa: F401
+        return "fernet"
+    except ImportError:
+        raise RuntimeError('Saving the LinkedIn session needs the "cryptography" package on this OS, install it with "pip install cryptography"')
+
+
+def encrypt(data: bytes) -> bytes:
+    cipher = get_cipher()
+    sealed = __dpapi(data, True) if cipher == "dpapi" else __get_fernet().encrypt(data)
+    return cipher.encode() + b"\n" + sealed
+
+
+def decrypt(blob: bytes) -> bytes:
+    cipher, _, sealed = blob.partition(b"\n")
+    if cipher == b"dpapi": return __dpapi(sealed, False)
+    if cipher == b"fernet": return __get_fernet().decrypt(sealed)
+    raise ValueError("Unknown session file format")
+#>
+
+
+#< Session state
+# After logging in, LinkedIn cookies and local storage are saved to `session_state_file`, encrypted. A new Chrome gets them back
+# before it opens any page, and a quick API call checks they're still valid instead of going through the login page.
+linkedin_origin = "https://www.linkedin.com"
+session_cookie = "li_at"
+
+__restore_scripts = {}     # Driver session ID: ID of its pending local storage restore script
+
+restore_local_storage_script = r"""
+if (location.origin === %s) {
+  const items = %s;
+  for (const [key, value] of Object.entries(items)) { try { localStorage.setItem(key, value); } catch (e) {} }
+}
+"""
+
+probe_script = r"""
+const done = arguments[arguments.length - 1];
+const token = (document.cookie.match(/JSESSIONID="?([^";]+)/) || [])[1] || '';
+fetch('/voyager/api/me', {credentials: 'include', headers: {'csrf-token': token, 'accept': 'application/json'}})
+  .then(response => done(response.status)).catch(() => done(0));
+"""
+
+
+def save_session_state(driver, path: str = session_state_file) -> bool:
+    '''
+    Function to save `driver`'s LinkedIn cookies and (if a LinkedIn page is open) local storage to `path`, encrypted.
+    * Returns `False` if it couldn't, never raises
+    '''
+    try:
+        cookies = [cookie for cookie in driver.execute_cdp_cmd("Network.getAllCookies", {})["cookies"] if "linkedin.com" in cookie.get("domain", "")]
+        if not any(cookie["name"] == session_cookie for cookie in cookies): return False
+        local_storage = {}
+        if driver.current_url.startswith(linkedin_origin):
+            local_storage = driver.execute_script("return Object.assign({}, window.localStorage);") or {}
+        data = encrypt(json.dumps({"saved": time(), "cookies": cookies, "local_storage": local_storage}).encode("utf-8"))
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with file_lock(path):
+            temp_path = f"{path}.{os.getpid()}.tmp"
+            with open(temp_path, 'wb') as file: file.write(data)
+            os.replace(temp_path, path)
+        return True
+    except Exception as e:
+        print_lg("Couldn't save the LinkedIn session, will log in again next time!", e)
+        return False
+
+
+def load_session_state(path: str = session_state_file) -> dict | None:
+    try:
+        with open(path, 'rb') as file:
+            return json.loads(decrypt(file.read()))
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print_lg("Couldn't read the saved LinkedIn session, will log in again!", e)
+        return None
+
+
+def restore_session_state(driver, path: str = session_state_file) -> bool:
+    '''
+    Function to put the saved LinkedIn session into `driver`, call it before it opens any page.
+    * Returns `False` if there is no saved session or its login cookie expired
+    '''
+    state = load_session_state(path)
+    if not state: return False
+    now = time()
+    cookies = [cookie for cookie in state["cookies"] if cookie.get("session") or cookie.get("expires", -1) < 0 or cookie["expires"] > now]
+    if not any(cookie["name"] == session_cookie for cookie in cookies): return False
+    try:
+        keys = ("name", "value", "domain", "path", "secure", "httpOnly", "sameSite")
+        restored = []
+        for cookie in cookies:
+            params = {key: cookie[key] for key in keys if key in cookie}
+            if not cookie.get("session") and cookie.get("expires", -1) > 0: params["expires"] = cookie["expires"]
+            restored.append(params)
+        driver.execute_cdp_cmd("Network.setCookies", {"cookies": restored})
+        if state.get("local_storage"):
+            script = restore_local_storage_script % (json.dumps(linkedin_origin), json.dumps(state["local_storage"]))
+            __restore_scripts[driver.session_id] = driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": script})["identifier"]
+        return True
+    except Exception as e:
+        print_lg("Couldn't restore the saved LinkedIn session!", e)
+        return False
+
+
+def probe_session(driver) -> bool:
+    '''
+    Function to check if `driver`'s LinkedIn session is logged in, with one small page and one API call instead of the login page.
+    * Leaves `driver` on a blank LinkedIn page
+    '''
+    try:
+        driver.get(linkedin_origin + "/robots.txt")
+        restore_script = __restore_scripts.pop(driver.session_id, None)
+        if restore_script: driver.execute_cdp_cmd("Page.removeScriptToEvaluateOnNewDocument", {"identifier": restore_script})
+        return driver.execute_async_script(probe_script) == 200
+    except Exception as e:
+        print_lg("Couldn't check the saved LinkedIn session!", e)
+        return False
+#>
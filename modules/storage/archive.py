@@ -0,0 +1,122 @@
+'''
+Author:     Sai Vignesh Golla
+LinkedIn:   https://www.linkedin.com/in/saivigneshgolla/
+
+Copyright (C) 2024 Sai Vignesh Golla
+
+License:    GNU Affero General Public License
+            https://www.gnu.org/licenses/agpl-3.0.en.html
+
+GitHub:     https://github.com/GodsScion/Auto_job_applier_linkedIn
+
+version:    24.12.29.12.30
+'''
+
+# Imports
+import os
+import csv
+import gzip
+
+from datetime import date
+
+from config.settings import file_name, failed_file_name, history_archive_after_months
+from modules.helpers import print_lg
+from modules.storage.locks import file_lock
+from modules.storage.updates import compact_updates
+from modules.storage.id_index import is_index_current, refresh_index
+from modules.storage.partitions import get_partition_path, get_month, open_history_file
+
+csv.field_size_limit(1000000)
+
+
+#< Archiving
+# (history CSV, column its rows are partitioned by)
+archived_histories = [
+    (file_name, "Date Applied"),
+    (failed_file_name, "Date Tried"),
+]
+
+
+def get_cutoff_month(keep_months: int, today: date | None = None) -> str:
+    '''
+    Function to get the first month ("YYYY-MM") that is kept in the CSV when keeping `keep_months` past months besides the current one.
+    '''
+    today = today or date.today()
+    months = today.year * 12 + today.month - 1 - keep_months
+    return f"{months // 12:04d}-{months % 12 + 1:02d}"
+
+
+def write_partition(path: str, fieldnames: list[str], rows: list[dict]) -> None:
+    '''
+    Function to add `rows` to the partition at `path`, rewriting it as a single compressed file.
+    * Rows already in the partition are not added again (Eg: archiving was interrupted before the CSV was rewritten)
+    '''
+    existing = []
+    if os.path.exists(path):
+        with open_history_file(path) as file:
+            existing = list(csv.DictReader(file))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with gzip.open(temp_path, 'wt', newline='', encoding='utf-8', compresslevel=9) as file:
+        writer = csv.DictWriter(file, fieldnames=fieldnames, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(existing)
+        seen = {tuple(row.get(field) for field in fieldnames) for row in existing}
+        writer.writerows(row for row in rows if tuple(row.get(field) for field in fieldnames) not in seen)
+    os.replace(temp_path, path)
+
+
+def archive_csv(csv_path: str, date_column: str, keep_months: int, timeout: float = 30.0) -> dict[str, int]:
+    '''
+    Function to move rows of `csv_path` older than `keep_months` past months into monthly partitions.
+    * Pending field updates are merged into the CSV first
+    * Holds the CSV's `file_lock()`, so rows appended meanwhile by the bot are never lost
+    * Rows without a date in `date_column` (Eg: "Pending") stay in the CSV
+    * Returns number of rows archived per month
+    '''
+    if not os.path.exists(csv_path): return {}
+    compact_updates(csv_path, timeout)
+    cutoff = get_cutoff_month(keep_months)
+    with file_lock(csv_path, timeout):
+        kept = []
+        archived = {}
+        with open(csv_path, 'r', newline='', encoding='utf-8') as file:
+            reader = csv.DictReader(file)
+            fieldnames = reader.fieldnames
+            for row in reader:
+                month = get_month(row.get(date_column))
+                if month and month < cutoff: archived.setdefault(month, []).append(row)
+                else: kept.append(row)
+        if not archived: return {}
+        index_current = is_index_current(csv_path)
+        for month, rows in archived.items():
+            write_partition(get_partition_path(csv_path, month), fieldnames, rows)
+        temp_path = csv_path + ".archive.tmp"
+        with open(temp_path, 'w', newline='', encoding='utf-8') as file:
+            writer = csv.DictWriter(file, fieldnames=fieldnames)
+            writer.writeheader()
+            writer.writerows(kept)
+        os.replace(temp_path, csv_path)
+        if index_current: refresh_index(csv_path)
+    return {month: len(rows) for month, rows in archived.items()}
+
+
+def archive_history(keep_months: int = history_archive_after_months) -> int:
+    '''
+    Function to archive old rows of applied and failed history CSVs, to be called at startup.
+    * Does nothing if `keep_months` is 0
+    * Returns total rows archived, failures are logged and skipped
+    '''
+    if keep_months <= 0: return 0
+    total = 0
+    for csv_path, date_column in archived_histories:
+        try:
+            archived = archive_csv(csv_path, date_column, keep_months)
+        except Exception as e:
+            print_lg(f'Failed to archive old rows of "{csv_path}", will try again next run!', e)
+            continue
+        if archived:
+            print_lg(f'Archived {sum(archived.values())} rows of "{csv_path}" into monthly partitions: {", ".join(sorted(archived))}')
+            total += sum(archived.values())
+    return total
+#>
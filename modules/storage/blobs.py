@@ -0,0 +1,82 @@
+'''
+Author:     Sai Vignesh Golla
+LinkedIn:   https://www.linkedin.com/in/saivigneshgolla/
+
+Copyright (C) 2024 Sai Vignesh Golla
+
+License:    GNU Affero General Public License
+            https://www.gnu.org/licenses/agpl-3.0.en.html
+
+GitHub:     https://github.com/GodsScion/Auto_job_applier_linkedIn
+
+version:    24.12.29.12.30
+'''
+
+# Imports
+import os
+import zlib
+import hashlib
+
+from config.settings import file_name
+
+
+#< Content-addressed description store
+# Job descriptions are stored once per unique text, zlib compressed, at "<history folder>/descriptions/<2 hex>/<sha256>.z".
+# History rows only keep a reference "sha256:<hex>" in place of the text.
+descriptions_folder = os.path.join(os.path.dirname(file_name), "descriptions")
+reference_prefix = "sha256:"
+
+
+def is_description_ref(value: str | None) -> bool:
+    '''
+    Function to check if `value` is a description store reference rather than the description itself.
+    '''
+    return isinstance(value, str) and value.startswith(reference_prefix) and len(value) == len(reference_prefix) + 64
+
+
+def get_blob_path(digest: str, folder: str = descriptions_folder) -> str:
+    '''
+    Function to get the file path of blob with sha256 hex `digest`.
+    '''
+    return os.path.join(folder, digest[:2], digest + ".z")
+
+
+def store_description(description: str, folder: str = descriptions_folder) -> str:
+    '''
+    Function to store `description` once by its content hash.
+    * Returns the reference "sha256:<hex>" to save in history rows
+    * Doesn't write anything if the same description is already stored (reposted job, multiple search terms, etc.)
+    '''
+    data = description.encode("utf-8")
+    digest = hashlib.sha256(data).hexdigest()
+    path = get_blob_path(digest, folder)
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'wb') as file:
+            file.write(zlib.compress(data, 6))
+        os.replace(temp_path, path)
+    return reference_prefix + digest
+
+
+def load_description(value: str | None, folder: str = descriptions_folder) -> str | None:
+    '''
+    Function to get the description text for a history "About Job" `value`.
+    * Returns `value` as is if it isn't a reference (older rows keep the text inline)
+    * Returns `value` as is if the referenced blob is missing
+    '''
+    if not is_description_ref(value): return value
+    try:
+        with open(get_blob_path(value[len(reference_prefix):], folder), 'rb') as file:
+            return zlib.decompress(file.read()).decode("utf-8")
+    except (FileNotFoundError, zlib.error):
+        return value
+
+
+def replace_description(text: str, description: str, folder: str = descriptions_folder) -> str:
+    '''
+    Function to store `description` and replace it inside `text` (Eg: skip messages) with its reference.
+    '''
+    if not description or description not in text: return text
+    return text.replace(description, f"[About Job: {store_description(description, folder)}]")
+#>
@@ -0,0 +1,304 @@
+'''
+Author:     Sai Vignesh Golla
+LinkedIn:   https://www.linkedin.com/in/saivigneshgolla/
+
+Copyright (C) 2024 Sai Vignesh Golla
+
+License:    GNU Affero General Public License
+            https://www.gnu.org/licenses/agpl-3.0.en.html
+
+GitHub:     https://github.com/GodsScion/Auto_job_applier_linkedIn
+
+version:    24.12.29.12.30
+'''
+
+# Imports
+import os
+import csv
+import json
+import threading
+
+from time import monotonic
+
+from config.settings import file_name, failed_file_name, use_history_ledger, history_flush_interval, history_batch_size
+from modules.helpers import print_lg, make_directories
+from modules.storage.ledger import applied_columns, failed_columns, insert_rows, close_ledger
+from modules.storage.id_index import append_job_id
+from modules.storage.locks import file_lock
+from modules.storage.stats import update_stats
+
+csv.field_size_limit(1000000)
+
+
+#< History files
+applied_fieldnames = [header for header, _ in applied_columns]
+failed_fieldnames = [header for header, _ in failed_columns]
+
+# kind: (CSV path, CSV headers, ledger table)
+history_kinds = {
+    "applied": (file_name, applied_fieldnames, "applied_jobs"),
+    "failed": (failed_file_name, failed_fieldnames, "failed_jobs"),
+}
+
+# kind: ledger table, for rows only kept in the ledger (skipped if `use_history_ledger = False`)
+ledger_only_kinds = {
+    "questions": "answered_questions",
+}
+
+# Each worker of the pool keeps its own journal, "history_journal.<worker>.jsonl", a journal is only ever opened by one process
+journal_path = os.path.join(os.path.dirname(file_name), "history_journal.jsonl")
+
+
+def get_journal_path(worker: str | None = None) -> str:
+    '''
+    Function to get the journal path of `worker` (Eg: "Worker 2"), or of the bot when it runs without a pool.
+    '''
+    if not worker: return journal_path
+    return os.path.join(os.path.dirname(journal_path), f"history_journal.{worker.lower().replace(' ', '-')}.jsonl")
+
+
+def list_journals() -> list[str]:
+    '''
+    Function to list the paths of all journals in the history folder, the bot's and every worker's.
+    '''
+    folder = os.path.dirname(journal_path) or "."
+    try: names = os.listdir(folder)
+    except FileNotFoundError: return []
+    return sorted(os.path.join(os.path.dirname(journal_path), name) for name in names if name.startswith("history_journal.") and name.endswith(".jsonl"))
+
+
+def append_csv_rows(csv_path: str, fieldnames: list[str], rows: list[dict], index_job_ids: bool = False) -> None:
+    '''
+    Function to append `rows` to the CSV at `csv_path`, writing the header first if the file is empty.
+    * Holds the CSV's `file_lock()` so it never interleaves with a compaction rewriting the file, or another worker appending
+    * If `index_job_ids`, also adds the rows' Job IDs to the CSV's Job ID index under the same lock
+    * Raises `PermissionError` if the file is locked, e.g. open in Excel
+    '''
+    with file_lock(csv_path):
+        with open(csv_path, 'a', newline='', encoding='utf-8') as file:
+            writer = csv.DictWriter(file, fieldnames=fieldnames)
+            if file.tell() == 0: writer.writeheader()
+            writer.writerows(rows)
+        if index_job_ids:
+            for row in rows: append_job_id(csv_path, row.get("Job ID"))
+#>
+
+
+#< Write-behind journal
+class HistoryWriter(threading.Thread):
+    '''
+    Background thread that commits history rows written by `submitted_jobs()` and `failed_job()`.
+    * Every row is first appended to an fsync'd journal, so a crash or closed browser loses nothing
+    * Rows are committed to the ledger and CSVs in batches, every `flush_interval` seconds or once `batch_size` rows are pending
+    * If a CSV is locked (e.g. open in Excel), backs off and retries without blocking the caller
+    * Rows left in the journal by a previous run are recovered and committed first
+    '''
+    def __init__(self, path: str = journal_path, flush_interval: int = history_flush_interval, batch_size: int = history_batch_size) -> None:
+        super().__init__(name="HistoryWriter", daemon=True)
+        self.path = path
+        self.flush_interval = max(flush_interval, 0.1)
+        self.batch_size = max(batch_size, 1)
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.stopping = False
+        self.backoff = 0
+        self.retry_at = 0.0
+        self.sequence = 0
+        self.pending = []
+        make_directories([self.path])
+        self.recovered = self.recover()
+
+    def recover(self) -> int:
+        '''
+        Loads uncommitted entries from the journal into `pending` and rewrites the journal with only them.
+        '''
+        committed = 0
+        entries = []
+        done = {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as journal:
+                for line in journal:
+                    try: record = json.loads(line)
+                    except json.JSONDecodeError: continue   # Torn last line from a crash
+                    if "committed" in record: committed = max(committed, record["committed"])
+                    elif "done" in record:
+                        for sequence in record["seqs"]: done.setdefault(sequence, set()).add(record["done"])
+                    else: entries.append(record)
+        except FileNotFoundError:
+            pass
+        for entry in entries:
+            if entry["seq"] <= committed: continue
+            flags = {flag: True for flag in done.get(entry["seq"], set()) | {key for key in ("ledger_done", "csv_done", "stats_done") if entry.get(key)}}
+            self.sequence += 1
+            self.pending.append({"seq": self.sequence, "kind": entry["kind"], "row": entry["row"], **flags})
+        self.journal = open(self.path, 'w', encoding='utf-8')
+        for entry in self.pending: self.journal.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self.sync_journal()
+        return len(self.pending)
+
+    def sync_journal(self) -> None:
+        self.journal.flush()
+        os.fsync(self.journal.fileno())
+
+    def append(self, kind: str, row: dict) -> None:
+        '''
+        Journals `row` of `kind` ("applied", "failed", "stats" or "questions") and queues it to be committed.
+        '''
+        self.extend(kind, [row])
+
+    def extend(self, kind: str, rows: list[dict]) -> None:
+        '''
+        Journals all `rows` of `kind` with a single fsync and queues them to be committed.
+        '''
+        if kind in ledger_only_kinds and not use_history_ledger: return
+        rows = [{key: None if value is None else str(value) for key, value in row.items()} for row in rows]
+        with self.lock:
+            for row in rows:
+                self.sequence += 1
+                entry = {"seq": self.sequence, "kind": kind, "row": row}
+                self.journal.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                self.pending.append(entry)
+            self.sync_journal()
+            if len(self.pending) >= self.batch_size: self.wake.set()
+
+    def mark_done(self, entries: list[dict], flag: str) -> None:
+        '''
+        Flags `entries` as written to one target, in memory and in the journal, so a retry or recovery never writes them there twice.
+        '''
+        with self.lock:
+            for entry in entries: entry[flag] = True
+            self.journal.write(json.dumps({"done": flag, "seqs": [entry["seq"] for entry in entries]}) + "\n")
+            self.sync_journal()
+
+    def commit_entries(self, entries: list[dict]) -> None:
+        '''
+        Commits `entries` to the ledger and CSVs, and "stats" events to the run statistics, skipping targets each entry was already written to.
+        * "questions" rows are only kept in the ledger
+        '''
+        for kind, (csv_path, fieldnames, table) in history_kinds.items():
+            if use_history_ledger:
+                rows = [entry for entry in entries if entry["kind"] == kind and not entry.get("ledger_done")]
+                if rows:
+                    insert_rows(table, [entry["row"] for entry in rows])
+                    self.mark_done(rows, "ledger_done")
+            rows = [entry for entry in entries if entry["kind"] == kind and not entry.get("csv_done")]
+            if rows:
+                append_csv_rows(csv_path, fieldnames, [entry["row"] for entry in rows], index_job_ids=kind == "applied")
+                self.mark_done(rows, "csv_done")
+        for kind, table in ledger_only_kinds.items():
+            rows = [entry for entry in entries if entry["kind"] == kind and not entry.get("ledger_done")]
+            if rows and use_history_ledger:
+                insert_rows(table, [entry["row"] for entry in rows])
+                self.mark_done(rows, "ledger_done")
+        rows = [entry for entry in entries if entry["kind"] == "stats" and not entry.get("stats_done")]
+        if rows:
+            update_stats([entry["row"] for entry in rows])
+            self.mark_done(rows, "stats_done")
+
+    def commit(self) -> bool:
+        '''
+        Commits pending entries. Returns `True` if nothing is left pending.
+        '''
+        with self.lock: batch = list(self.pending)
+        if not batch: return True
+        if monotonic() < self.retry_at and not self.stopping: return False
+        try:
+            self.commit_entries(batch)
+        except Exception as e:
+            self.backoff = min(max(self.backoff * 2, 1), 60)
+            self.retry_at = monotonic() + self.backoff
+            print_lg(f"Failed to update history files, will retry in {self.backoff} seconds! Probably because the file is open or in use by another program (Excel?) or permission was denied.", e)
+            return False
+        self.backoff = 0
+        with self.lock:
+            last = batch[-1]["seq"]
+            self.pending = [entry for entry in self.pending if entry["seq"] > last]
+            if self.pending:
+                self.journal.write(json.dumps({"committed": last}) + "\n")
+            else:
+                self.journal.seek(0)
+                self.journal.truncate()
+            self.sync_journal()
+            return not self.pending
+
+    def run(self) -> None:
+        while True:
+            self.wake.wait(self.flush_interval)
+            self.wake.clear()
+            self.commit()
+            if self.stopping:
+                close_ledger()
+                return
+
+    def stop(self, timeout: float = 10.0) -> bool:
+        '''
+        Commits what is pending and stops the writer. Returns `False` if rows were left in the journal for the next run.
+        '''
+        self.stopping = True
+        self.wake.set()
+        if self.is_alive(): self.join(timeout)
+        with self.lock:
+            left = len(self.pending)
+            self.journal.close()
+        if left: print_lg(f"{left} history rows couldn't be saved now, they are kept in '{self.path}' and will be saved on next run.")
+        return left == 0
+
+
+__history_writer = None
+
+
+def get_history_writer(worker: str | None = None) -> HistoryWriter:
+    '''
+    Function to get the background `HistoryWriter`, starts it and recovers the journal on first use.
+    * Pool workers pass their `worker` name, to write their own journal
+    '''
+    global __history_writer
+    if __history_writer is None:
+        __history_writer = HistoryWriter(get_journal_path(worker))
+        if __history_writer.recovered: print_lg(f"Recovered {__history_writer.recovered} unsaved history rows from '{__history_writer.path}'.")
+        __history_writer.start()
+    return __history_writer
+
+
+def recover_journals() -> int:
+    '''
+    Function to commit rows left in every journal by previous runs (Eg: a worker that crashed), and delete the emptied journals.
+    * Must be called while no writer is running, Eg: before starting or after joining the worker pool
+    * Returns number of rows recovered, journals that couldn't be committed are kept for next time
+    '''
+    total = 0
+    for path in list_journals():
+        writer = HistoryWriter(path)
+        writer.stopping = True    # Commit now, without the retry backoff
+        if writer.recovered:
+            print_lg(f"Recovered {writer.recovered} unsaved history rows from '{path}'.")
+            total += writer.recovered
+            writer.commit()
+        if writer.stop() and path != journal_path: os.remove(path)
+    return total
+
+
+def record_history(kind: str, row: dict) -> None:
+    '''
+    Function to save a history `row` of `kind` ("applied", "failed" or "stats" event), returns once it is journaled.
+    '''
+    get_history_writer().append(kind, row)
+
+
+def record_history_rows(kind: str, rows: list[dict]) -> None:
+    '''
+    Function to save many history `rows` of `kind` at once (Eg: all "questions" answered in an application), returns once they are journaled.
+    '''
+    if rows: get_history_writer().extend(kind, rows)
+
+
+def flush_history() -> bool:
+    '''
+    Function to commit all pending history rows and stop the writer, to be called before exit.
+    '''
+    global __history_writer
+    if __history_writer is None: return True
+    saved = __history_writer.stop()
+    __history_writer = None
+    return saved
+#>
@@ -0,0 +1,212 @@
+'''
+Author:     Sai Vignesh Golla
+LinkedIn:   https://www.linkedin.com/in/saivigneshgolla/
+
+Copyright (C) 2024 Sai Vignesh Golla
+
+License:    GNU Affero General Public License
+            https://www.gnu.org/licenses/agpl-3.0.en.html
+
+GitHub:     https://github.com/GodsScion/Auto_job_applier_linkedIn
+
+version:    24.12.29.12.30
+'''
+
+# Imports
+import os
+import csv
+import mmap
+import struct
+
+from bisect import bisect_left
+from array import array
+
+from modules.storage.locks import file_lock
+from modules.storage.partitions import iter_job_ids
+
+csv.field_size_limit(1000000)
+
+
+#< Index file layout
+# Sidecar index of applied Job IDs, stored next to the history CSV as "<csv>.ids":
+# * Header: magic, CSV size and CSV mtime (ns) the index matches, count of sorted IDs
+# * Body: sorted int64 Job IDs, followed by an unsorted tail of IDs appended since the last merge
+_magic = b"AJIDX001"
+_header = struct.Struct("<8sqqq")
+_id_size = 8
+merge_tail_after = 1024
+#>
+
+
+def get_index_path(csv_path: str) -> str:
+    '''
+    Function to get the sidecar index path for history CSV at `csv_path`.
+    '''
+    return csv_path + ".ids"
+
+
+def _csv_signature(csv_path: str) -> tuple[int, int]:
+    try:
+        stat = os.stat(csv_path)
+        return stat.st_size, stat.st_mtime_ns
+    except FileNotFoundError:
+        return 0, 0
+
+
+def _to_int(job_id: str) -> int | None:
+    job_id = str(job_id).strip()
+    return int(job_id) if job_id.isdigit() else None
+
+
+def _read_header(index_path: str) -> tuple[int, int, int, int] | None:
+    '''
+    Returns `(csv_size, csv_mtime_ns, sorted_count, tail_count)` of index at `index_path`, or `None` if missing or corrupt.
+    '''
+    try:
+        with open(index_path, 'rb') as file:
+            raw = file.read(_header.size)
+            body_size = os.fstat(file.fileno()).st_size - _header.size
+    except FileNotFoundError:
+        return None
+    if len(raw) < _header.size: return None
+    magic, csv_size, csv_mtime_ns, sorted_count = _header.unpack(raw)
+    if magic != _magic or body_size % _id_size or sorted_count * _id_size > body_size: return None
+    return csv_size, csv_mtime_ns, sorted_count, body_size // _id_size - sorted_count
+
+
+def _write_index(index_path: str, job_ids: array, csv_path: str) -> None:
+    csv_size, csv_mtime_ns = _csv_signature(csv_path)
+    temp_path = index_path + ".tmp"
+    with open(temp_path, 'wb') as file:
+        file.write(_header.pack(_magic, csv_size, csv_mtime_ns, len(job_ids)))
+        job_ids.tofile(file)
+    os.replace(temp_path, index_path)
+
+
+def _read_ids(index_path: str) -> array:
+    job_ids = array('q')
+    with open(index_path, 'rb') as file:
+        file.seek(_header.size)
+        job_ids.frombytes(file.read())
+    return job_ids
+
+
+def rebuild_index(csv_path: str) -> int:
+    '''
+    Function to rebuild the Job ID index of history CSV at `csv_path` by scanning its first column, and of its monthly partitions.
+    * Returns number of Job IDs indexed
+    '''
+    job_ids = set()
+    for job_id in iter_job_ids(csv_path):
+        job_id = _to_int(job_id)
+        if job_id is not None: job_ids.add(job_id)
+    _write_index(get_index_path(csv_path), array('q', sorted(job_ids)), csv_path)
+    return len(job_ids)
+
+
+def append_job_id(csv_path: str, job_id: str) -> None:
+    '''
+    Function to add `job_id` to the index of `csv_path`, to be called right after its row is appended to the CSV.
+    * Appends to the unsorted tail and records the new CSV size, no rewrite of the index
+    * Does nothing if the index doesn't exist yet, it will be built on next load
+    * Call it holding the CSV's `file_lock()` (see `append_csv_rows()`), so appends of parallel workers don't overwrite each other
+    '''
+    job_id = _to_int(job_id)
+    index_path = get_index_path(csv_path)
+    if job_id is None or _read_header(index_path) is None: return
+    with open(index_path, 'r+b') as file:
+        file.seek(0, os.SEEK_END)
+        file.write(struct.pack("<q", job_id))
+        file.seek(0)
+        sorted_count = _header.unpack(file.read(_header.size))[3]
+        csv_size, csv_mtime_ns = _csv_signature(csv_path)
+        file.seek(0)
+        file.write(_header.pack(_magic, csv_size, csv_mtime_ns, sorted_count))
+
+
+def is_index_current(csv_path: str) -> bool:
+    '''
+    Function to check if the index of `csv_path` exists and matches the CSV's current size and modified time.
+    '''
+    header = _read_header(get_index_path(csv_path))
+    return header is not None and header[:2] == _csv_signature(csv_path)
+
+
+def refresh_index(csv_path: str) -> None:
+    '''
+    Function to record the current size and modified time of `csv_path` in its index, without a rebuild.
+    * Only for when the CSV was rewritten without adding or removing Job IDs, and the index was current before (Eg: archiving, compaction)
+    '''
+    index_path = get_index_path(csv_path)
+    if _read_header(index_path) is None: return
+    with open(index_path, 'r+b') as file:
+        sorted_count = _header.unpack(file.read(_header.size))[3]
+        csv_size, csv_mtime_ns = _csv_signature(csv_path)
+        file.seek(0)
+        file.write(_header.pack(_magic, csv_size, csv_mtime_ns, sorted_count))
+
+
+class JobIdIndex:
+    '''
+    Set-like view of applied Job IDs backed by the memory-mapped sidecar index.
+    * `job_id in ids` is a binary search over the sorted IDs plus a lookup in the small unsorted tail
+    * `ids.add(job_id)` remembers IDs applied in this run, `append_job_id()` persists them
+    '''
+    def __init__(self, index_path: str) -> None:
+        self.file = open(index_path, 'rb')
+        _, _, sorted_count, tail_count = _read_header(index_path)
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if sorted_count + tail_count else None
+        self.body = memoryview(self.map if self.map else b"")[_header.size if self.map else 0:].cast('q')
+        self.sorted_ids = self.body[:sorted_count]
+        self.tail_ids = set(self.body[sorted_count:])
+        self.added = set()
+
+    def __contains__(self, job_id: str) -> bool:
+        if job_id in self.added: return True
+        number = _to_int(job_id)
+        if number is None: return False
+        if number in self.tail_ids: return True
+        position = bisect_left(self.sorted_ids, number)
+        return position < len(self.sorted_ids) and self.sorted_ids[position] == number
+
+    def add(self, job_id: str) -> None:
+        self.added.add(job_id)
+
+    def __len__(self) -> int:
+        return len(self.sorted_ids) + len(self.tail_ids) + len(self.added)
+
+    def close(self) -> None:
+        self.sorted_ids.release()
+        self.body.release()
+        if self.map: self.map.close()
+        self.file.close()
+
+    def __enter__(self) -> "JobIdIndex":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+__open_indexes = {}     # {index path: JobIdIndex last returned by `load_job_id_index()`}
+
+
+def load_job_id_index(csv_path: str) -> JobIdIndex:
+    '''
+    Function to open the Job ID index of history CSV at `csv_path`.
+    * Rebuilds it if missing, corrupt or not matching the CSV's size and modified time
+    * Merges the unsorted tail into the sorted IDs once it grows past `merge_tail_after`
+    * Closes the index it returned before for `csv_path`, so mappings don't pile up across runs and the file can be replaced (Windows)
+    '''
+    index_path = get_index_path(csv_path)
+    previous = __open_indexes.pop(index_path, None)
+    if previous: previous.close()
+    with file_lock(csv_path):    # No worker appends a row (and its Job ID) while the index is rewritten
+        header = _read_header(index_path)
+        if header is None or header[:2] != _csv_signature(csv_path):
+            rebuild_index(csv_path)
+        elif header[3] > merge_tail_after:
+            _write_index(index_path, array('q', sorted(set(_read_ids(index_path)))), csv_path)
+    __open_indexes[index_path] = JobIdIndex(index_path)
+    return __open_indexes[index_path]
+
@@ -0,0 +1,176 @@
+'''
+Author:     Sai Vignesh Golla
+LinkedIn:   https://www.linkedin.com/in/saivigneshgolla/
+
+Copyright (C) 2024 Sai Vignesh Golla
+
+License:    GNU Affero General Public License
+            https://www.gnu.org/licenses/agpl-3.0.en.html
+
+GitHub:     https://github.com/GodsScion/Auto_job_applier_linkedIn
+
+version:    24.12.29.12.30
+'''
+
+# Imports
+import os
+import csv
+import json
+import sqlite3
+
+from time import perf_counter
+
+from modules.storage.ledger import get_ledger, insert_new_rows, tables, history_csvs, get_import_key, is_imported, is_search_index_built, rebuild_search_index
+
+csv.field_size_limit(1000000)
+
+
+#< Streaming CSV records
+def iter_csv_records(file, start: int = 0):
+    '''
+    Function to iterate records of a CSV opened in binary mode, from byte offset `start`, without loading the file.
+    * Yields `(fields, end offset)`, or `(None, end offset)` for a record that can't be parsed (Eg: a runaway quote past `csv.field_size_limit()`)
+    * Records may span lines (quoted fields with newlines), the csv parser pulls lines one at a time so the offset is exact
+    '''
+    file.seek(start)
+    position = start
+
+    def lines():
+        nonlocal position
+        for line in file:
+            position += len(line)
+            yield line.decode('utf-8', errors='replace')
+
+    reader = csv.reader(lines())
+    while True:
+        try:
+            fields = next(reader)
+        except StopIteration:
+            return
+        except csv.Error:
+            yield None, position
+            continue
+        if fields: yield fields, position
+#>
+
+
+#< Importer
+def get_checkpoint_key(csv_path: str, table: str) -> str:
+    return f"import:{table}:{os.path.abspath(csv_path)}"
+
+
+def import_history_csv(csv_path: str, table: str, connection: sqlite3.Connection | None = None, batch_size: int = 5000, restart: bool = False, report_every: float = 2.0, report=print) -> dict:
+    '''
+    Function to stream a (large, legacy) history CSV at `csv_path` into ledger `table`.
+    * Rows are inserted in transactions of `batch_size`, each saving a checkpoint (byte offset) in the same transaction
+    * An interrupted import resumes from its checkpoint, a finished one isn't repeated unless `restart = True`
+    * Malformed rows (unbalanced quotes, wrong number of fields, Eg: truncated by a crash) are skipped and saved to "<csv>.rejected.csv"
+    * Rows already in the ledger (same Job ID and date) are skipped as duplicates, Eg: imported before by `sync_from_csv()`
+    * The bot's own history CSV of `table` is imported once, sharing the `sync_from_csv()` marker, unless `restart = True`
+    * Calls `report` with progress and rows/sec every `report_every` seconds
+    * Returns {"imported", "duplicates", "rejected", "seconds", "rows_per_second", "resumed_at", "done"}
+    '''
+    connection = connection or get_ledger()
+    history_csv = table in history_csvs and os.path.abspath(csv_path) == os.path.abspath(history_csvs[table])
+    if history_csv and not restart and is_imported(table, connection):
+        report(f'"{csv_path}" was already imported into {table}, use restart to import it again.')
+        return {"imported": 0, "duplicates": 0, "rejected": 0, "seconds": 0.0, "rows_per_second": 0.0, "resumed_at": 0, "done": True}
+    key = get_checkpoint_key(csv_path, table)
+    file_size = os.path.getsize(csv_path)
+    saved = connection.execute("SELECT value FROM ledger_meta WHERE key = ?", (key,)).fetchone()
+    checkpoint = json.loads(saved[0]) if saved and not restart else {}
+    if checkpoint.get("offset", 0) > file_size: checkpoint = {}    # File was replaced since
+    imported, rejected = checkpoint.get("imported", 0), checkpoint.get("rejected", 0)
+    result = {"imported": 0, "duplicates": 0, "rejected": 0, "seconds": 0.0, "rows_per_second": 0.0, "resumed_at": checkpoint.get("offset", 0), "done": True}
+    if checkpoint.get("done") and checkpoint.get("offset") == file_size:
+        report(f'"{csv_path}" was already imported into {table} ({imported} rows), use restart to import it again.')
+        return result
+
+    started = last_report = perf_counter()
+    rejects = None
+    with open(csv_path, 'rb') as file:
+        header = next((fields for fields, _ in iter_csv_records(file) if fields), None)
+        if header is None: return result
+        known = {name for name, _ in tables[table]}
+        if not known & set(header): raise ValueError(f'"{csv_path}" has none of the {table} headers, is it the right file?')
+        start = checkpoint.get("offset") or file.tell()
+        search = is_search_index_built(connection)
+        batch = []
+        offset = start
+        try:
+            for fields, offset in iter_csv_records(file, start):
+                if fields is None or len(fields) != len(header):
+                    if rejects is None:
+                        rejects = open(csv_path + ".rejected.csv", 'a', newline='', encoding='utf-8')
+                        if rejects.tell() == 0: csv.writer(rejects).writerow(["Byte Offset", "Fields"])
+                    csv.writer(rejects).writerow([offset, json.dumps(fields, ensure_ascii=False)[:100000]])
+                    rejected += 1
+                    result["rejected"] += 1
+                    continue
+                batch.append(dict(zip(header, fields)))
+                if len(batch) >= batch_size:
+                    inserted = insert_new_rows(table, batch, connection, {key: json.dumps({"offset": offset, "imported": imported + len(batch), "rejected": rejected})}, search)
+                    imported += len(batch)
+                    result["imported"] += inserted
+                    result["duplicates"] += len(batch) - inserted
+                    batch = []
+                    if perf_counter() - last_report >= report_every:
+                        last_report = perf_counter()
+                        report(f"Imported {imported} rows ({offset * 100 // max(file_size, 1)}%), {result['imported'] / (last_report - started):.0f} rows/sec")
+            meta = {key: json.dumps({"offset": offset, "imported": imported + len(batch), "rejected": rejected, "done": True})}
+            if history_csv: meta[get_import_key(table)] = history_csvs[table]
+            inserted = insert_new_rows(table, batch, connection, meta, search)
+            imported += len(batch)
+            result["imported"] += inserted
+            result["duplicates"] += len(batch) - inserted
+            if not search: rebuild_search_index(connection)
+        finally:
+            if rejects: rejects.close()
+    result["seconds"] = round(perf_counter() - started, 3)
+    result["rows_per_second"] = round((result["imported"] + result["duplicates"]) / max(result["seconds"], 1e-9))
+    report(f'Imported {result["imported"]} rows from "{csv_path}" into {table} in {result["seconds"]}s ({result["rows_per_second"]} rows/sec), {result["duplicates"]} already in the ledger and {result["rejected"]} malformed rows skipped')
+    return result
+#>
+
+
+#< Benchmark
+def write_sample_csv(csv_path: str, rows: int, description_size: int = 3000, large_every: int = 1000) -> None:
+    '''
+    Function to write a sample applied history CSV with `rows` rows, every `large_every`th one with a 131 KB description.
+    '''
+    fieldnames = [header for header, _ in tables["applied_jobs"]]
+    description = ("Python, SQL and \"cloud\" experience required.\nRemote friendly team. " * (description_size // 64 + 1))[:description_size]
+    large = description * (131072 // description_size + 1)
+    with open(csv_path, 'w', newline='', encoding='utf-8') as file:
+        writer = csv.DictWriter(file, fieldnames=fieldnames)
+        writer.writeheader()
+        for number in range(rows):
+            writer.writerow({'Job ID': 4000000000 + number, 'Title': f"Software Engineer {number % 97}", 'Company': f"Company {number % 1013}",
+                             'About Job': large[:131072] if number % large_every == 0 else description, 'Date Applied': "2024-12-29 12:30:00",
+                             'Job Link': f"https://www.linkedin.com/jobs/view/{4000000000 + number}", 'Questions Found': "{('Years?', '5', 'text', '')}"})
+        file.write('4999999999,"Truncated row, \"About Job\" cut off by a crash')
+
+
+def benchmark(rows: int = 100000, folder: str | None = None) -> dict:
+    '''
+    Function to time importing a sample CSV of `rows` rows into a scratch ledger.
+    '''
+    import tempfile
+    from modules.storage.ledger import open_ledger
+    with tempfile.TemporaryDirectory(dir=folder) as temp:
+        csv_path = os.path.join(temp, "history.csv")
+        write_sample_csv(csv_path, rows)
+        print(f"Sample CSV: {rows} rows, {os.path.getsize(csv_path) / 1024 / 1024:.1f} MB")
+        connection = open_ledger(os.path.join(temp, "ledger.db"))
+        try:
+            result = import_history_csv(csv_path, "applied_jobs", connection)
+        finally:
+            connection.close()
+    try:
+        import resource
+        print(f"Peak memory: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB")
+    except ImportError:
+        pass
+    return result
+#>
+
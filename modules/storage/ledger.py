@@ -0,0 +1,499 @@
+'''
+Author:     Sai Vignesh Golla
+LinkedIn:   https://www.linkedin.com/in/saivigneshgolla/
+
+Copyright (C) 2024 Sai Vignesh Golla
+
+License:    GNU Affero General Public License
+            https://www.gnu.org/licenses/agpl-3.0.en.html
+
+GitHub:     https://github.com/GodsScion/Auto_job_applier_linkedIn
+
+version:    24.12.29.12.30
+'''
+
+# Imports
+import os
+import re
+import csv
+import sqlite3
+import threading
+
+from config.settings import file_name, failed_file_name, ledger_file_name
+from modules.storage.partitions import get_history_files, open_history_file
+from modules.storage.blobs import load_description
+
+csv.field_size_limit(1000000)
+
+
+#< Ledger schema
+
+# (CSV header, ledger column) pairs. CSV headers are the keys of rows written by `submitted_jobs()` and `failed_job()`.
+applied_columns = [
+    ('Job ID', 'job_id'), ('Title', 'title'), ('Company', 'company'), ('Work Location', 'work_location'), ('Work Style', 'work_style'),
+    ('About Job', 'about_job'), ('Experience required', 'experience_required'), ('Skills required', 'skills_required'),
+    ('HR Name', 'hr_name'), ('HR Link', 'hr_link'), ('Resume', 'resume'), ('Re-posted', 'reposted'), ('Date Posted', 'date_posted'),
+    ('Date Applied', 'date_applied'), ('Job Link', 'job_link'), ('External Job link', 'external_job_link'),
+    ('Questions Found', 'questions_found'), ('Connect Request', 'connect_request')
+]
+
+failed_columns = [
+    ('Job ID', 'job_id'), ('Job Link', 'job_link'), ('Resume Tried', 'resume_tried'), ('Date listed', 'date_listed'),
+    ('Date Tried', 'date_tried'), ('Assumed Reason', 'assumed_reason'), ('Stack Trace', 'stack_trace'),
+    ('External Job link', 'external_job_link'), ('Screenshot Name', 'screenshot_name')
+]
+
+# One row per question answered in an application, written by `submitted_jobs()`.
+# Source is how the answer was chosen: "rule" (settings and keyword rules), "ai", "random" or "previous" (kept what was already filled)
+question_columns = [
+    ('Job ID', 'job_id'), ('Question', 'label'), ('Type', 'question_type'), ('Options', 'options'), ('Answer', 'answer'),
+    ('Previous Answer', 'previous_answer'), ('Source', 'source'), ('Date Answered', 'date_answered')
+]
+
+tables = {
+    "applied_jobs": applied_columns,
+    "failed_jobs": failed_columns,
+    "answered_questions": question_columns,
+}
+
+# table: history CSV the bot writes its rows to
+history_csvs = {
+    "applied_jobs": file_name,
+    "failed_jobs": failed_file_name,
+}
+
+# table: CSV headers that identify a history row, imports skip rows already in the ledger with the same values
+__row_keys = {
+    "applied_jobs": ('Job ID', 'Date Applied'),
+    "failed_jobs": ('Job ID', 'Date Tried'),
+}
+
+__schema = '''
+CREATE TABLE IF NOT EXISTS applied_jobs (
+    id INTEGER PRIMARY KEY,
+    {applied}
+);
+CREATE INDEX IF NOT EXISTS idx_applied_job_id ON applied_jobs (job_id);
+CREATE INDEX IF NOT EXISTS idx_applied_company ON applied_jobs (company);
+CREATE INDEX IF NOT EXISTS idx_applied_date_applied ON applied_jobs (date_applied);
+
+CREATE TABLE IF NOT EXISTS failed_jobs (
+    id INTEGER PRIMARY KEY,
+    {failed}
+);
+CREATE INDEX IF NOT EXISTS idx_failed_job_id ON failed_jobs (job_id);
+CREATE INDEX IF NOT EXISTS idx_failed_date_tried ON failed_jobs (date_tried);
+
+CREATE TABLE IF NOT EXISTS answered_questions (
+    id INTEGER PRIMARY KEY,
+    {questions}
+);
+CREATE INDEX IF NOT EXISTS idx_questions_job_id ON answered_questions (job_id);
+CREATE INDEX IF NOT EXISTS idx_questions_label ON answered_questions (label, question_type);
+
+CREATE TABLE IF NOT EXISTS ledger_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+
+CREATE TABLE IF NOT EXISTS job_claims (
+    job_id TEXT PRIMARY KEY,
+    worker TEXT,
+    claimed_at TEXT
+);
+'''.format(
+    applied = ",\n    ".join(f"{column} TEXT" for _, column in applied_columns),
+    failed = ",\n    ".join(f"{column} TEXT" for _, column in failed_columns),
+    questions = ",\n    ".join(f"{column} TEXT" for _, column in question_columns),
+)
+
+# Full-text index of applied jobs (title, company, description) and answered questions ("question: answer"), needs SQLite with FTS5
+__search_schema = '''
+CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(
+    job_id UNINDEXED, kind UNINDEXED, title, company, content, tokenize = 'porter unicode61'
+);
+'''
+#>
+
+
+#< Connections
+__local = threading.local()
+
+
+def open_ledger(path: str = ledger_file_name) -> sqlite3.Connection:
+    '''
+    Function to open (and create if missing) the SQLite ledger at `path`.
+    * Uses WAL journal mode so the dashboard can read while the bot writes
+    * Returns a new `sqlite3.Connection`, caller owns it
+    '''
+    path = path.replace("//","/")
+    folder = os.path.dirname(path)
+    if folder: os.makedirs(folder, exist_ok=True)
+    connection = sqlite3.connect(path, timeout=10)
+    connection.row_factory = sqlite3.Row
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    connection.execute("PRAGMA busy_timeout=10000")
+    connection.executescript(__schema)
+    try: connection.executescript(__search_schema)
+    except sqlite3.OperationalError: pass   # SQLite built without FTS5, search is unavailable
+    return connection
+
+
+def get_ledger(path: str = ledger_file_name) -> sqlite3.Connection:
+    '''
+    Function to get a connection to the ledger at `path` that is reused within the calling thread.
+    '''
+    connections = getattr(__local, "connections", None)
+    if connections is None:
+        connections = __local.connections = {}
+    if path not in connections:
+        connections[path] = open_ledger(path)
+    return connections[path]
+
+
+def close_ledger() -> None:
+    '''
+    Function to close all ledger connections opened by the calling thread.
+    '''
+    for connection in getattr(__local, "connections", {}).values():
+        try: connection.close()
+        except sqlite3.Error: pass
+    __local.connections = {}
+#>
+
+
+#< Writes
+def __insert_sql(table: str) -> str:
+    columns = [column for _, column in tables[table]]
+    return f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+
+
+def __row_values(table: str, row: dict) -> tuple:
+    return tuple(None if row.get(header) is None else str(row.get(header)) for header, _ in tables[table])
+
+
+def insert_rows(table: str, rows: list[dict], connection: sqlite3.Connection | None = None, meta: dict[str, str] | None = None, search: bool = True) -> int:
+    '''
+    Function to insert `rows` (dicts keyed by CSV headers) into ledger `table` in one transaction.
+    * Applied jobs and answered questions are added to the full-text search index in the same transaction, unless `search = False`
+      (Eg: bulk imports into a ledger whose index isn't built yet, `rebuild_search_index()` indexes them once at the end)
+    * `meta` key values are saved to `ledger_meta` in the same transaction too (Eg: import checkpoints)
+    * Returns number of rows inserted
+    '''
+    connection = connection or get_ledger()
+    with connection:
+        connection.executemany(__insert_sql(table), (__row_values(table, row) for row in rows))
+        if search and table in __search_documents and has_search_index(connection):
+            connection.executemany(__search_insert_sql, (__search_documents[table](row) for row in rows))
+        if meta: connection.executemany("INSERT OR REPLACE INTO ledger_meta (key, value) VALUES (?, ?)", meta.items())
+    return len(rows)
+
+
+def insert_new_rows(table: str, rows: list[dict], connection: sqlite3.Connection | None = None, meta: dict[str, str] | None = None, search: bool = True) -> int:
+    '''
+    Function like `insert_rows()`, but leaves out `rows` already in ledger `table` (same Job ID and date), so imports can be repeated.
+    * Returns number of rows inserted
+    '''
+    connection = connection or get_ledger()
+    keys = __row_keys.get(table)
+    if keys and rows:
+        columns = [dict(tables[table])[header] for header in keys]
+        get_key = lambda row: tuple(None if row.get(header) is None else str(row.get(header)) for header in keys)
+        job_ids = list({get_key(row)[0] for row in rows})
+        existing = set()
+        for start in range(0, len(job_ids), 500):
+            chunk = job_ids[start:start + 500]
+            cursor = connection.execute(f"SELECT {', '.join(columns)} FROM {table} WHERE {columns[0]} IN ({', '.join('?' * len(chunk))})", chunk)
+            existing.update(tuple(record) for record in cursor)
+        rows = [row for row in rows if get_key(row) not in existing]
+    return insert_rows(table, rows, connection, meta, search)
+
+
+def record_applied(row: dict, connection: sqlite3.Connection | None = None) -> None:
+    '''
+    Function to add a successfully applied job `row` (keyed by applied history CSV headers) to the ledger.
+    '''
+    insert_rows("applied_jobs", [row], connection)
+
+
+def record_failed(row: dict, connection: sqlite3.Connection | None = None) -> None:
+    '''
+    Function to add a failed or skipped job `row` (keyed by failed history CSV headers) to the ledger.
+    '''
+    insert_rows("failed_jobs", [row], connection)
+
+
+def update_date_applied(job_id: str, date_applied: str, connection: sqlite3.Connection | None = None) -> int:
+    '''
+    Function to update "Date Applied" of all ledger rows with `job_id`.
+    * Returns number of rows updated
+    '''
+    connection = connection or get_ledger()
+    with connection:
+        cursor = connection.execute("UPDATE applied_jobs SET date_applied = ? WHERE job_id = ?", (date_applied, job_id))
+    return cursor.rowcount
+
+
+def claim_job(job_id: str, worker: str, connection: sqlite3.Connection | None = None) -> bool:
+    '''
+    Function to claim `job_id` for `worker` of the worker pool, so no other worker applies to it.
+    * Returns `True` if `worker` got the claim (or already had it), `False` if another worker has it
+    '''
+    connection = connection or get_ledger()
+    with connection:
+        connection.execute("INSERT OR IGNORE INTO job_claims (job_id, worker, claimed_at) VALUES (?, ?, datetime('now', 'localtime'))", (job_id, worker))
+    claimed = connection.execute("SELECT worker FROM job_claims WHERE job_id = ?", (job_id,)).fetchone()
+    return claimed is not None and claimed[0] == worker
+
+
+def clear_claims(connection: sqlite3.Connection | None = None) -> int:
+    '''
+    Function to drop the job claims of a previous worker pool run. Returns number of claims dropped.
+    '''
+    connection = connection or get_ledger()
+    with connection:
+        cursor = connection.execute("DELETE FROM job_claims")
+    return cursor.rowcount
+#>
+
+
+#< Reads
+def is_applied(job_id: str, connection: sqlite3.Connection | None = None) -> bool:
+    '''
+    Function to check if `job_id` is in the applied jobs ledger, an indexed lookup.
+    '''
+    connection = connection or get_ledger()
+    return connection.execute("SELECT 1 FROM applied_jobs WHERE job_id = ? LIMIT 1", (job_id,)).fetchone() is not None
+
+
+def count_rows(table: str, connection: sqlite3.Connection | None = None) -> int:
+    '''
+    Function to count rows in ledger `table`.
+    '''
+    connection = connection or get_ledger()
+    return connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+def iter_rows(table: str, columns: list[str] | None = None, connection: sqlite3.Connection | None = None):
+    '''
+    Function to iterate rows of ledger `table` in insertion order as dicts keyed by CSV headers.
+    * `columns` limits the CSV headers returned, all by default
+    '''
+    connection = connection or get_ledger()
+    pairs = [pair for pair in tables[table] if columns is None or pair[0] in columns]
+    cursor = connection.execute(f"SELECT {', '.join(column for _, column in pairs)} FROM {table} ORDER BY id")
+    for record in cursor:
+        yield {header: record[column] for header, column in pairs}
+
+
+def get_job_answers(job_id: str, connection: sqlite3.Connection | None = None) -> list[dict]:
+    '''
+    Function to get questions answered in the application of `job_id`, as dicts keyed by `question_columns` headers.
+    '''
+    connection = connection or get_ledger()
+    cursor = connection.execute(f"SELECT {', '.join(column for _, column in question_columns)} FROM answered_questions WHERE job_id = ? ORDER BY id", (job_id,))
+    return [{header: record[column] for header, column in question_columns} for record in cursor]
+
+
+def find_answers(label: str, question_type: str | None = None, limit: int = 10, connection: sqlite3.Connection | None = None) -> list[dict]:
+    '''
+    Function to get the latest answers given to question `label` (optionally only of `question_type`), newest first.
+    * An indexed lookup, to reuse answers across applications
+    '''
+    connection = connection or get_ledger()
+    query = f"SELECT {', '.join(column for _, column in question_columns)} FROM answered_questions WHERE label = ?"
+    parameters = [label]
+    if question_type:
+        query += " AND question_type = ?"
+        parameters.append(question_type)
+    cursor = connection.execute(query + " ORDER BY id DESC LIMIT ?", (*parameters, limit))
+    return [{header: record[column] for header, column in question_columns} for record in cursor]
+
+
+class LedgerJobIds:
+    '''
+    Set-like view of applied Job IDs backed by the ledger.
+    * `job_id in ids` is an indexed query, nothing is loaded at startup
+    * `ids.add(job_id)` remembers IDs applied in this run until the ledger row is written
+    '''
+    def __init__(self, connection: sqlite3.Connection | None = None) -> None:
+        self.connection = connection
+        self.added = set()
+
+    def __contains__(self, job_id: str) -> bool:
+        return job_id in self.added or is_applied(job_id, self.connection)
+
+    def add(self, job_id: str) -> None:
+        self.added.add(job_id)
+
+    def __len__(self) -> int:
+        return count_rows("applied_jobs", self.connection) + len(self.added)
+#>
+
+
+#< Full-text search
+__search_insert_sql = "INSERT INTO search_index (job_id, kind, title, company, content) VALUES (?, ?, ?, ?, ?)"
+
+# table: function to get the search document (job_id, kind, title, company, content) of a row keyed by CSV headers
+__search_documents = {
+    "applied_jobs": lambda row: (row.get('Job ID'), "job", row.get('Title') or "", row.get('Company') or "", load_description(row.get('About Job')) or ""),
+    "answered_questions": lambda row: (row.get('Job ID'), "question", "", "", f"{row.get('Question') or ''}: {row.get('Answer') or ''}"),
+}
+
+
+def has_search_index(connection: sqlite3.Connection | None = None) -> bool:
+    '''
+    Function to check if the ledger has the full-text search index (SQLite has FTS5).
+    '''
+    connection = connection or get_ledger()
+    return connection.execute("SELECT 1 FROM sqlite_master WHERE name = 'search_index'").fetchone() is not None
+
+
+def is_search_index_built(connection: sqlite3.Connection | None = None) -> bool:
+    '''
+    Function to check if the full-text search index holds all rows, so new rows must be indexed as they are inserted.
+    '''
+    connection = connection or get_ledger()
+    return connection.execute("SELECT 1 FROM ledger_meta WHERE key = 'search_index'").fetchone() is not None
+
+
+def rebuild_search_index(connection: sqlite3.Connection | None = None) -> int:
+    '''
+    Function to index all applied jobs and answered questions already in the ledger, once.
+    * Rows inserted later are indexed by `insert_rows()`
+    * Returns number of documents indexed, `0` if already built or FTS5 is unavailable
+    '''
+    connection = connection or get_ledger()
+    if not has_search_index(connection): return 0
+    if is_search_index_built(connection): return 0
+    indexed = 0
+    with connection:
+        connection.execute("DELETE FROM search_index")
+        for table, document in __search_documents.items():
+            before = connection.total_changes
+            connection.executemany(__search_insert_sql, (document(row) for row in iter_rows(table, connection=connection)))
+            indexed += connection.total_changes - before
+        connection.execute("INSERT OR REPLACE INTO ledger_meta (key, value) VALUES ('search_index', 'built')")
+    return indexed
+
+
+def search(query: str, limit: int = 20, connection: sqlite3.Connection | None = None) -> list[dict]:
+    '''
+    Function to full-text search applied jobs and answered questions for all words in `query`, best matches first.
+    * A word ending with "*" matches as a prefix (Eg: "kube*")
+    * Title matches rank above company matches, which rank above description and answer matches
+    * Returns dicts with job_id, kind ("job" or "question"), title, company, snippet and score (higher is better)
+    '''
+    connection = connection or get_ledger()
+    terms = [f'"{word}"' + ("*" if star else "") for word, star in re.findall(r'(\w+)(\*?)', query)]
+    if not terms: return []
+    cursor = connection.execute('''
+        SELECT s.job_id, s.kind,
+               COALESCE(NULLIF(s.title, ''), (SELECT title FROM applied_jobs WHERE job_id = s.job_id LIMIT 1)) AS title,
+               COALESCE(NULLIF(s.company, ''), (SELECT company FROM applied_jobs WHERE job_id = s.job_id LIMIT 1)) AS company,
+               snippet(search_index, 4, '[', ']', '...', 16) AS snippet,
+               bm25(search_index, 0, 0, 10.0, 5.0, 1.0) AS rank
+        FROM search_index s WHERE search_index MATCH ? ORDER BY rank LIMIT ?
+    ''', (" ".join(terms), limit))
+    return [{"job_id": record["job_id"], "kind": record["kind"], "title": record["title"], "company": record["company"],
+             "snippet": record["snippet"], "score": -record["rank"]} for record in cursor]
+#>
+
+
+#< CSV compatibility
+def import_csv(csv_path: str, table: str, connection: sqlite3.Connection | None = None, batch_size: int = 1000) -> int:
+    '''
+    Function to import an existing history CSV (or gzipped partition) at `csv_path` into ledger `table`.
+    * Rows are inserted in batches of `batch_size`, one transaction per batch, rows already in the ledger are skipped
+    * Rows are only added to the search index if it's built, else call `rebuild_search_index()` after importing
+    * Returns number of rows imported, `0` if CSV doesn't exist
+    '''
+    if not os.path.exists(csv_path): return 0
+    connection = connection or get_ledger()
+    imported = 0
+    batch = []
+    search = is_search_index_built(connection)
+    with open_history_file(csv_path) as file:
+        for row in csv.DictReader(file):
+            batch.append(row)
+            if len(batch) >= batch_size:
+                imported += insert_new_rows(table, batch, connection, search=search)
+                batch = []
+    if batch: imported += insert_new_rows(table, batch, connection, search=search)
+    return imported
+
+
+def export_csv(table: str, csv_path: str, connection: sqlite3.Connection | None = None) -> int:
+    '''
+    Function to export ledger `table` to a CSV at `csv_path` with the same headers the bot writes.
+    * Returns number of rows exported
+    '''
+    connection = connection or get_ledger()
+    exported = 0
+    folder = os.path.dirname(csv_path)
+    if folder: os.makedirs(folder, exist_ok=True)
+    with open(csv_path, 'w', newline='', encoding='utf-8') as file:
+        writer = csv.DictWriter(file, fieldnames=[header for header, _ in tables[table]])
+        writer.writeheader()
+        for row in iter_rows(table, connection=connection):
+            writer.writerow(row)
+            exported += 1
+    return exported
+
+
+def get_import_key(table: str) -> str:
+    '''
+    Function to get the `ledger_meta` key set once the history CSV of `table` was imported, by `sync_from_csv()` or the importer.
+    '''
+    return f"imported:{table}"
+
+
+def is_imported(table: str, connection: sqlite3.Connection | None = None) -> bool:
+    connection = connection or get_ledger()
+    return connection.execute("SELECT 1 FROM ledger_meta WHERE key = ?", (get_import_key(table),)).fetchone() is not None
+
+
+def sync_from_csv(connection: sqlite3.Connection | None = None) -> dict[str, int]:
+    '''
+    Function to import history CSVs and their monthly partitions into the ledger once, rows already in the ledger are skipped.
+    * Also builds the full-text search index once, for ledgers created before it existed
+    * Returns a dict of table name to rows imported
+    '''
+    connection = connection or get_ledger()
+    imported = {}
+    for table, csv_path in history_csvs.items():
+        if is_imported(table, connection): continue
+        imported[table] = sum(import_csv(path, table, connection) for path in get_history_files(csv_path))
+        with connection:
+            connection.execute("INSERT OR REPLACE INTO ledger_meta (key, value) VALUES (?, ?)", (get_import_key(table), csv_path))
+    rebuild_search_index(connection)
+    return imported
+#>
+
+
+if __name__ == "__main__":
+    import argparse
+    from modules.storage.importer import import_history_csv, benchmark
+    parser = argparse.ArgumentParser(prog="python -m modules.storage.ledger", description="Import history CSVs into the history ledger, or export the ledger to them.")
+    parser.add_argument("command", choices=["import", "export"])
+    parser.add_argument("csv", nargs="*", help="CSV files to import, default: applied and failed history files from settings, with their monthly partitions")
+    parser.add_argument("--table", choices=["applied_jobs", "failed_jobs"], help="Ledger table, default: guessed from the file name")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Rows per transaction")
+    parser.add_argument("--restart", action="store_true", help="Ignore checkpoints and import from the start")
+    parser.add_argument("--benchmark", type=int, metavar="ROWS", help="Time importing a generated CSV of ROWS rows instead")
+    args = parser.parse_args()
+    if args.command == "export":
+        for table, csv_path in history_csvs.items():
+            print(f'Exported {export_csv(table, csv_path)} rows from {table} to "{csv_path}"')
+    elif args.benchmark:
+        benchmark(args.benchmark)
+    else:
+        files = [(path, args.table or ("failed_jobs" if "failed" in os.path.basename(path) else "applied_jobs")) for path in args.csv]
+        for path, table in files or [(path, table) for table, csv_path in history_csvs.items() for path in get_history_files(csv_path)]:
+            if not os.path.exists(path):
+                print(f'Skipping "{path}", it does not exist.')
+            elif path.endswith(".gz"):
+                print(f'Imported {import_csv(path, table)} rows from "{path}" into {table}')
+            else:
+                import_history_csv(path, table, batch_size=args.batch_size, restart=args.restart)
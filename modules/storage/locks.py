@@ -0,0 +1,50 @@
+'''
+Author:     Sai Vignesh Golla
+LinkedIn:   https://www.linkedin.com/in/saivigneshgolla/
+
+Copyright (C) 2024 Sai Vignesh Golla
+
+License:    GNU Affero General Public License
+            https://www.gnu.org/licenses/agpl-3.0.en.html
+
+GitHub:     https://github.com/GodsScion/Auto_job_applier_linkedIn
+
+version:    24.12.29.12.30
+'''
+
+# Imports
+import os
+
+from time import sleep, time, monotonic
+from contextlib import contextmanager
+
+
+@contextmanager
+def file_lock(path: str, timeout: float = 10.0, stale_after: float = 120.0):
+    '''
+    Context manager to hold an exclusive lock on `path` across processes (bot, dashboard, workers) using a "<path>.lock" file.
+    * Waits up to `timeout` seconds, then raises `TimeoutError`
+    * A lock file older than `stale_after` seconds is treated as left behind by a crashed process and removed
+    '''
+    lock_path = path + ".lock"
+    deadline = monotonic() + timeout
+    while True:
+        try:
+            descriptor = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            os.write(descriptor, str(os.getpid()).encode())
+            os.close(descriptor)
+            break
+        except FileExistsError:
+            try:
+                if time() - os.path.getmtime(lock_path) > stale_after:
+                    os.remove(lock_path)
+                    continue
+            except FileNotFoundError:
+                continue
+            if monotonic() >= deadline: raise TimeoutError(f'Timed out waiting for lock on "{path}"')
+            sleep(0.05)
+    try:
+        yield
+    finally:
+        try: os.remove(lock_path)
+        except FileNotFoundError: pass
@@ -0,0 +1,54 @@
+'''
+Author:     Sai Vignesh Golla
+LinkedIn:   https://www.linkedin.com/in/saivigneshgolla/
+
+Copyright (C) 2024 Sai Vignesh Golla
+
+License:    GNU Affero General Public License
+            https://www.gnu.org/licenses/agpl-3.0.en.html
+
+GitHub:     https://github.com/GodsScion/Auto_job_applier_linkedIn
+
+version:    24.12.29.12.30
+'''
+
+# Imports
+import os
+import gzip
+import hashlib
+
+from time import monotonic
+
+from config.settings import logs_folder_path, page_dump_interval
+from modules.helpers import make_directories
+
+
+#< Page source dumps
+# Page sources are saved gzipped as "<logs folder>/page sources/<sha256 of the HTML>.html.gz" instead of being printed to the log.
+# The same DOM is saved only once, and at most one new dump is saved every `page_dump_interval` seconds.
+page_dumps_folder = os.path.join(logs_folder_path, "page sources")
+
+__last_dump_time = None
+
+
+def dump_page_source(html: str, folder: str = page_dumps_folder, min_interval: int = page_dump_interval) -> str:
+    '''
+    Function to save page source `html` gzipped, keyed by its content hash.
+    * Returns a one line reference to log in its place
+    * Returns a skip note instead of saving if the last dump was less than `min_interval` seconds ago
+    '''
+    global __last_dump_time
+    data = html.encode("utf-8")
+    digest = hashlib.sha256(data).hexdigest()
+    path = os.path.join(folder, digest + ".html.gz")
+    if os.path.exists(path): return f'Page source is same as already saved "{path}"'
+    if __last_dump_time is not None and monotonic() - __last_dump_time < min_interval:
+        return f"Page source (sha256 {digest[:12]}, {len(data)} bytes) not saved, another was saved less than {min_interval} seconds ago"
+    make_directories([path])
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with gzip.open(temp_path, 'wb', compresslevel=6) as file:
+        file.write(data)
+    os.replace(temp_path, path)
+    __last_dump_time = monotonic()
+    return f'Page source saved to "{path}" ({len(data)} bytes, {os.path.getsize(path)} gzipped)'
+#>
@@ -0,0 +1,95 @@
+'''
+Author:     Sai Vignesh Golla
+LinkedIn:   https://www.linkedin.com/in/saivigneshgolla/
+
+Copyright (C) 2024 Sai Vignesh Golla
+
+License:    GNU Affero General Public License
+            https://www.gnu.org/licenses/agpl-3.0.en.html
+
+GitHub:     https://github.com/GodsScion/Auto_job_applier_linkedIn
+
+version:    24.12.29.12.30
+'''
+
+# Imports
+import os
+import re
+import csv
+import gzip
+
+csv.field_size_limit(1000000)
+
+
+#< Monthly partitions
+# Rows of past months are moved out of a history CSV into gzipped monthly partitions by `modules.storage.archive`:
+# "<history folder>/archive/<csv name>.<YYYY-MM>.csv.gz". The CSV itself keeps recent rows (and rows without a date).
+archive_folder_name = "archive"
+__month = re.compile(r"^\d{4}-\d{2}")
+
+
+def get_archive_folder(csv_path: str) -> str:
+    return os.path.join(os.path.dirname(csv_path), archive_folder_name)
+
+
+def get_partition_path(csv_path: str, month: str) -> str:
+    '''
+    Function to get the partition path of `csv_path` for `month` ("YYYY-MM").
+    '''
+    name = os.path.splitext(os.path.basename(csv_path))[0]
+    return os.path.join(get_archive_folder(csv_path), f"{name}.{month}.csv.gz")
+
+
+def list_partitions(csv_path: str) -> list[tuple[str, str]]:
+    '''
+    Function to list `(month, path)` of all partitions of `csv_path`, oldest first.
+    '''
+    folder = get_archive_folder(csv_path)
+    prefix = os.path.splitext(os.path.basename(csv_path))[0] + "."
+    try: names = os.listdir(folder)
+    except FileNotFoundError: return []
+    partitions = []
+    for name in names:
+        month = name[len(prefix):-len(".csv.gz")]
+        if name.startswith(prefix) and name.endswith(".csv.gz") and __month.match(month) and len(month) == 7:
+            partitions.append((month, os.path.join(folder, name)))
+    return sorted(partitions)
+
+
+def get_month(value: str | None) -> str | None:
+    '''
+    Function to get "YYYY-MM" of a history date `value` like "2024-12-29 12:30:00", `None` if it isn't a date (Eg: "Pending").
+    '''
+    return value[:7] if value and __month.match(value) else None
+
+
+def open_history_file(path: str):
+    '''
+    Function to open a history CSV or gzipped partition at `path` for reading as text.
+    '''
+    if path.endswith(".gz"): return gzip.open(path, 'rt', newline='', encoding='utf-8')
+    return open(path, 'r', newline='', encoding='utf-8')
+#>
+
+
+#< History files
+def get_history_files(csv_path: str, date_from: str = "", date_to: str = "") -> list[str]:
+    '''
+    Function to get the files that can hold rows of `csv_path` dated between `date_from` and `date_to`, oldest first.
+    * Dates are prefixes of "YYYY-MM-DD HH:MM:SS" (Eg: "2024-12" or "2024-12-31"), empty for no limit
+    * Partitions outside the range are left out, the CSV itself is always included
+    '''
+    files = [path for month, path in list_partitions(csv_path) if (not date_from or month >= date_from[:7]) and (not date_to or month <= date_to[:7])]
+    if os.path.exists(csv_path): files.append(csv_path)
+    return files
+
+
+def iter_job_ids(csv_path: str):
+    '''
+    Function to iterate the Job ID (first column) of every row of history `csv_path` and its partitions, header included.
+    '''
+    for path in get_history_files(csv_path):
+        with open_history_file(path) as file:
+            for row in csv.reader(file):
+                if row: yield row[0]
+#>
@@ -0,0 +1,205 @@
+'''
+Author:     Sai Vignesh Golla
+LinkedIn:   https://www.linkedin.com/in/saivigneshgolla/
+
+Copyright (C) 2024 Sai Vignesh Golla
+
+License:    GNU Affero General Public License
+            https://www.gnu.org/licenses/agpl-3.0.en.html
+
+GitHub:     https://github.com/GodsScion/Auto_job_applier_linkedIn
+
+version:    24.12.29.12.30
+'''
+
+# Imports
+import io
+import os
+import base64
+import atexit
+import hashlib
+import threading
+
+from queue import Queue, Full
+
+from config.settings import logs_folder_path, screenshot_quota_mb, screenshot_dedupe, screenshot_perceptual_dedupe
+from modules.helpers import print_lg, make_directories
+
+try:
+    from PIL import Image   # Optional, needed for `screenshot_perceptual_dedupe`
+except ImportError:
+    Image = None
+
+
+#< Screenshot store
+screenshots_folder = os.path.join(logs_folder_path, "screenshots")
+screenshot_extensions = (".png", ".jpg")
+similar_distance = 4        # Max differing bits between perceptual hashes of screenshots considered the same
+remembered_hashes = 256     # Recent screenshot hashes kept to deduplicate against
+
+
+def fingerprint(data: bytes, perceptual: bool = False) -> tuple[str, int | bytes]:
+    '''
+    Function to get `("sha256", digest)` of image `data`, or `("dhash", 64 bit int)` if `perceptual` and Pillow is available.
+    * Perceptual hashes of different jobs' Easy Apply forms are often within `similar_distance`, so it's opt-in
+    '''
+    if perceptual and Image is not None:
+        try:
+            with Image.open(io.BytesIO(data)) as image:
+                pixels = list(image.convert("L").resize((9, 8)).getdata())
+            bits = 0
+            for row in range(8):
+                for column in range(8):
+                    bits = (bits << 1) | (pixels[row * 9 + column] > pixels[row * 9 + column + 1])
+            return "dhash", bits
+        except Exception:
+            pass
+    return "sha256", hashlib.sha256(data).digest()
+
+
+def is_similar(first: tuple, second: tuple) -> bool:
+    if first[0] != second[0]: return False
+    if first[0] == "dhash": return bin(first[1] ^ second[1]).count("1") <= similar_distance
+    return first[1] == second[1]
+
+
+class ScreenshotWriter(threading.Thread):
+    '''
+    Background thread that decodes and saves screenshots captured by `runAiBot.screenshot()`, so the apply loop never waits on disk.
+    * A screenshot byte-identical to a recent one is saved as a hard link to it, using no extra space
+    * With `perceptual` dedupe, a screenshot that only looks the same as a recent one is linked too (needs Pillow)
+    * Deletes oldest screenshots once the folder grows past `quota_bytes` (0 = unlimited)
+    * If the queue is full the screenshot is dropped rather than blocking
+    '''
+    def __init__(self, folder: str = screenshots_folder, quota_bytes: int = screenshot_quota_mb * 1024 * 1024, dedupe: bool = screenshot_dedupe,
+                 perceptual: bool = screenshot_perceptual_dedupe, queue_size: int = 32) -> None:
+        super().__init__(name="ScreenshotWriter", daemon=True)
+        self.folder = folder
+        self.quota_bytes = quota_bytes
+        self.dedupe = dedupe
+        self.perceptual = perceptual
+        self.queue = Queue(maxsize=queue_size)
+        self.recent = []        # [(fingerprint, path)], newest last
+        self.files = []         # [(path, inode)], oldest first
+        self.inodes = {}        # {inode: [size, links among self.files]}
+        self.total_bytes = 0
+        make_directories([os.path.join(self.folder, "screenshot.png")])
+        self.scan()
+
+    def scan(self) -> None:
+        '''
+        Loads existing screenshots, oldest first, to enforce the quota across runs.
+        '''
+        entries = []
+        for entry in os.scandir(self.folder):
+            if entry.is_file() and entry.name.endswith(screenshot_extensions):
+                stat = os.stat(entry.path)    # `entry.stat()` has st_ino 0 on Windows, hard links must be told apart by inode
+                entries.append((stat.st_mtime_ns, entry.path, stat.st_ino, stat.st_size))
+        for _, path, inode, size in sorted(entries): self.track(path, inode, size)
+
+    def track(self, path: str, inode: int, size: int) -> None:
+        self.files.append((path, inode))
+        if inode in self.inodes:
+            self.inodes[inode][1] += 1
+        else:
+            self.inodes[inode] = [size, 1]
+            self.total_bytes += size
+
+    def evict(self) -> None:
+        '''
+        Deletes oldest screenshots until the folder fits in `quota_bytes`. The newest one is always kept.
+        '''
+        while self.quota_bytes > 0 and self.total_bytes > self.quota_bytes and len(self.files) > 1:
+            path, inode = self.files.pop(0)
+            try: os.remove(path)
+            except FileNotFoundError: pass
+            except OSError: continue
+            self.inodes[inode][1] -= 1
+            if self.inodes[inode][1] == 0: self.total_bytes -= self.inodes.pop(inode)[0]
+            self.recent = [item for item in self.recent if item[1] != path]
+
+    def save(self, path: str, encoded: str) -> None:
+        data = base64.b64decode(encoded)
+        linked_to = None
+        if self.dedupe:
+            key = fingerprint(data, self.perceptual)
+            for previous, previous_path in reversed(self.recent):
+                if is_similar(key, previous):
+                    try:
+                        os.link(previous_path, path)
+                        linked_to = previous_path
+                    except OSError:
+                        pass
+                    break
+            self.recent = self.recent[-(remembered_hashes - 1):] + [(key, path)]
+        if linked_to is None:
+            with open(path, 'wb') as file: file.write(data)
+        stat = os.stat(path)
+        self.track(path, stat.st_ino, stat.st_size)
+        self.evict()
+
+    def put(self, path: str, encoded: str) -> bool:
+        '''
+        Queues base64 image `encoded` to be saved at `path`. Returns `False` if dropped because the queue is full.
+        '''
+        try:
+            self.queue.put_nowait((path, encoded))
+            return True
+        except Full:
+            return False
+
+    def stop(self, timeout: float = 10.0) -> None:
+        '''
+        Saves queued screenshots and stops the writer thread.
+        '''
+        if not self.is_alive(): return
+        self.queue.put(None)
+        self.join(timeout)
+
+    def run(self) -> None:
+        while True:
+            item = self.queue.get()
+            if item is None: return
+            try:
+                self.save(*item)
+            except Exception as e:
+                print_lg(f'Failed to save screenshot "{item[0]}"!', e)
+
+
+__screenshot_writer = None
+__screenshot_writer_lock = threading.Lock()
+
+
+def get_screenshot_writer() -> ScreenshotWriter:
+    '''
+    Function to get the background `ScreenshotWriter`, starts it on first use.
+    '''
+    global __screenshot_writer
+    with __screenshot_writer_lock:
+        if __screenshot_writer is None:
+            __screenshot_writer = ScreenshotWriter()
+            __screenshot_writer.start()
+        return __screenshot_writer
+
+
+def save_screenshot(file_name: str, encoded: str) -> bool:
+    '''
+    Function to save base64 image `encoded` as `file_name` in the screenshots folder, in the background.
+    '''
+    writer = get_screenshot_writer()
+    return writer.put(os.path.join(writer.folder, file_name), encoded)
+
+
+def flush_screenshots() -> None:
+    '''
+    Function to save all queued screenshots and stop the writer, to be called before exit.
+    '''
+    global __screenshot_writer
+    with __screenshot_writer_lock:
+        if __screenshot_writer is None: return
+        __screenshot_writer.stop()
+        __screenshot_writer = None
+
+
+atexit.register(flush_screenshots)
+#>
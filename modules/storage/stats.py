@@ -0,0 +1,106 @@
+'''
+Author:     Sai Vignesh Golla
+LinkedIn:   https://www.linkedin.com/in/saivigneshgolla/
+
+Copyright (C) 2024 Sai Vignesh Golla
+
+License:    GNU Affero General Public License
+            https://www.gnu.org/licenses/agpl-3.0.en.html
+
+GitHub:     https://github.com/GodsScion/Auto_job_applier_linkedIn
+
+version:    24.12.29.12.30
+'''
+
+# Imports
+import os
+import json
+
+from datetime import datetime
+
+from config.settings import file_name
+from modules.storage.locks import file_lock
+
+
+#< Materialized run statistics
+# Counters are kept up to date as applications are recorded, so reading them never scans the history.
+# Stored as JSON next to the history files:
+# * "totals": {"applied", "skipped", "failed"}
+# * "apply_types": {"easy_apply", "external"}
+# * "search_terms": {term: {"applied", "skipped", "failed"}}
+# * "skip_reasons": {reason: count}
+# * "failure_reasons": {company: {reason: count}}
+stats_file = os.path.join(os.path.dirname(file_name), "run_stats.json")
+events = ("applied", "skipped", "failed")
+
+
+def empty_stats() -> dict:
+    return {
+        "totals": {event: 0 for event in events},
+        "apply_types": {"easy_apply": 0, "external": 0},
+        "search_terms": {},
+        "skip_reasons": {},
+        "failure_reasons": {},
+        "updated": None,
+    }
+
+
+def load_stats(path: str = stats_file) -> dict:
+    '''
+    Function to read the counters saved at `path`, returns empty counters if there are none yet.
+    '''
+    try:
+        with open(path, 'r', encoding='utf-8') as file:
+            return json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return empty_stats()
+
+
+def count_event(stats: dict, event: dict) -> None:
+    '''
+    Adds one `event` {"event", "search_term", "company", "reason", "apply_type"} to `stats`.
+    '''
+    kind = event.get("event")
+    if kind not in events: return
+    stats["totals"][kind] += 1
+    term = stats["search_terms"].setdefault(event.get("search_term") or "Unknown", {name: 0 for name in events})
+    term[kind] += 1
+    reason = event.get("reason") or "Unknown"
+    if kind == "applied":
+        apply_type = "easy_apply" if event.get("apply_type") == "easy_apply" else "external"
+        stats["apply_types"][apply_type] += 1
+    elif kind == "skipped":
+        stats["skip_reasons"][reason] = stats["skip_reasons"].get(reason, 0) + 1
+    else:
+        company = stats["failure_reasons"].setdefault(event.get("company") or "Unknown", {})
+        company[reason] = company.get(reason, 0) + 1
+
+
+def update_stats(new_events: list[dict], path: str = stats_file) -> dict:
+    '''
+    Function to add `new_events` to the counters at `path` and save them atomically. Returns the updated counters.
+    '''
+    with file_lock(path):
+        stats = load_stats(path)
+        for event in new_events: count_event(stats, event)
+        stats["updated"] = datetime.now().isoformat(timespec="seconds")
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            json.dump(stats, file, ensure_ascii=False)
+        os.replace(temp_path, path)
+    return stats
+
+
+def summarize_stats(stats: dict) -> dict:
+    '''
+    Function to add apply rates and the easy apply share to `stats`, as served by the dashboard.
+    '''
+    summary = dict(stats)
+    summary["search_terms"] = {
+        term: {**counts, "apply_rate": round(counts["applied"] / max(sum(counts[event] for event in events), 1), 4)}
+        for term, counts in stats["search_terms"].items()
+    }
+    applied = sum(stats["apply_types"].values())
+    summary["easy_apply_ratio"] = round(stats["apply_types"]["easy_apply"] / applied, 4) if applied else None
+    return summary
+#>
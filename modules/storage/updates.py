@@ -0,0 +1,157 @@
+'''
+Author:     Sai Vignesh Golla
+LinkedIn:   https://www.linkedin.com/in/saivigneshgolla/
+
+Copyright (C) 2024 Sai Vignesh Golla
+
+License:    GNU Affero General Public License
+            https://www.gnu.org/licenses/agpl-3.0.en.html
+
+GitHub:     https://github.com/GodsScion/Auto_job_applier_linkedIn
+
+version:    24.12.29.12.30
+'''
+
+# Imports
+import os
+import csv
+import json
+
+from modules.storage.locks import file_lock
+from modules.storage.id_index import is_index_current, refresh_index
+from modules.storage.partitions import get_history_files, open_history_file
+
+csv.field_size_limit(1000000)
+
+
+#< Append-only update log
+# Field updates to history CSV rows (Eg: "Date Applied" from the dashboard) are appended to "<csv>.updates.jsonl"
+# instead of rewriting the CSV. Readers overlay them, `compact_updates()` merges them back into the CSV.
+
+def get_updates_path(csv_path: str) -> str:
+    '''
+    Function to get the update log path for history CSV at `csv_path`.
+    '''
+    return csv_path + ".updates.jsonl"
+
+
+def append_update(csv_path: str, job_id: str, field: str, value: str) -> None:
+    '''
+    Function to record that `field` of the row with `job_id` in `csv_path` is now `value`, an O(1) fsync'd append.
+    '''
+    updates_path = get_updates_path(csv_path)
+    with file_lock(updates_path), open(updates_path, 'a', encoding='utf-8') as file:
+        file.write(json.dumps({"job_id": job_id, "field": field, "value": value}, ensure_ascii=False) + "\n")
+        file.flush()
+        os.fsync(file.fileno())
+
+
+__updates_cache = {}
+
+
+def load_updates(csv_path: str) -> dict[str, dict[str, str]]:
+    '''
+    Function to get pending updates of `csv_path` as {job_id: {field: value}}, later updates win.
+    * Parsed log is cached until the log file changes
+    '''
+    path = get_updates_path(csv_path)
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return {}
+    signature = (stat.st_mtime_ns, stat.st_size)
+    cached = __updates_cache.get(path)
+    if cached and cached[0] == signature: return cached[1]
+    updates = {}
+    with open(path, 'r', encoding='utf-8') as file:
+        for line in file:
+            try: record = json.loads(line)
+            except json.JSONDecodeError: continue
+            updates.setdefault(record["job_id"], {})[record["field"]] = record["value"]
+    __updates_cache[path] = (signature, updates)
+    return updates
+
+
+def count_updates(csv_path: str) -> int:
+    '''
+    Function to count entries in the update log of `csv_path`.
+    '''
+    try:
+        with open(get_updates_path(csv_path), 'rb') as file:
+            return sum(1 for _ in file)
+    except FileNotFoundError:
+        return 0
+
+
+def apply_updates(rows, updates: dict[str, dict[str, str]]):
+    '''
+    Function to overlay `updates` on `rows` (dicts keyed by CSV headers) as they are read.
+    '''
+    for row in rows:
+        changes = updates.get(row.get('Job ID'))
+        if changes: row.update(changes)
+        yield row
+
+
+def compact_updates(csv_path: str, timeout: float = 10.0) -> int:
+    '''
+    Function to merge the update log of `csv_path` back into the CSV and clear the log.
+    * Holds the CSV's `file_lock()`, the same lock history appends take, so no concurrently appended row is lost
+    * Holds the update log's lock too, so no update arriving meanwhile is lost
+    * Updates of rows not in the CSV (Eg: moved to a monthly partition) are kept in the log, readers still apply them
+    * Returns number of rows changed, raises `TimeoutError` or `PermissionError` if the CSV is busy
+    '''
+    updates_path = get_updates_path(csv_path)
+    with file_lock(csv_path, timeout), file_lock(updates_path, timeout):
+        updates = load_updates(csv_path)
+        if not updates:
+            if os.path.exists(updates_path): os.remove(updates_path)
+            return 0
+        changed = 0
+        applied = set()
+        index_current = is_index_current(csv_path)
+        temp_path = csv_path + ".compact.tmp"
+        with open(csv_path, 'r', newline='', encoding='utf-8') as source, open(temp_path, 'w', newline='', encoding='utf-8') as target:
+            reader = csv.DictReader(source)
+            writer = csv.DictWriter(target, fieldnames=reader.fieldnames)
+            writer.writeheader()
+            for row in reader:
+                changes = updates.get(row.get('Job ID'))
+                if changes:
+                    row.update({field: value for field, value in changes.items() if field in reader.fieldnames})
+                    applied.add(row.get('Job ID'))
+                    changed += 1
+                writer.writerow(row)
+        os.replace(temp_path, csv_path)
+        if index_current: refresh_index(csv_path)
+        remaining = {job_id: changes for job_id, changes in updates.items() if job_id not in applied}
+        if remaining:
+            with open(temp_path, 'w', encoding='utf-8') as file:
+                for job_id, changes in remaining.items():
+                    for field, value in changes.items(): file.write(json.dumps({"job_id": job_id, "field": field, "value": value}, ensure_ascii=False) + "\n")
+            os.replace(temp_path, updates_path)
+        else:
+            os.remove(updates_path)
+        __updates_cache.pop(updates_path, None)
+        return changed
+#>
+
+
+#< Unified reader
+def iter_history(csv_path: str, date_column: str | None = None, date_from: str = "", date_to: str = ""):
+    '''
+    Function to iterate rows of history `csv_path` and its partitions, oldest partition first, as dicts keyed by CSV headers.
+    * If `date_from` or `date_to` is given, only reads partitions of those months and yields rows whose `date_column` is in range
+    * Pending field updates (Eg: "Date Applied" edited from the dashboard) are applied
+    '''
+    updates = load_updates(csv_path)
+    for path in get_history_files(csv_path, date_from, date_to):
+        with open_history_file(path) as file:
+            for row in apply_updates(csv.DictReader(file), updates):
+                if date_column and (date_from or date_to):
+                    value = row.get(date_column) or ""
+                    if not value[:1].isdigit(): continue
+                    if date_from and value[:len(date_from)] < date_from: continue
+                    if date_to and value[:len(date_to)] > date_to: continue
+                yield row
+#>
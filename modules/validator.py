@@ -235,9 +235,40 @@ def validate_settings() -> None | ValueError | TypeError:
 
     check_string(file_name, "file_name", min_length=1)
     check_string(failed_file_name, "failed_file_name", min_length=1)
+    check_boolean(use_history_ledger, "use_history_ledger")
+    check_string(ledger_file_name, "ledger_file_name", min_length=1)
+    check_boolean(store_descriptions_separately, "store_descriptions_separately")
+    check_int(history_flush_interval, "history_flush_interval", 0)
+    check_int(history_batch_size, "history_batch_size", 1)
+    check_int(history_archive_after_months, "history_archive_after_months", 0)
     check_string(logs_folder_path, "logs_folder_path", min_length=1)
+    check_int(log_max_size_mb, "log_max_size_mb", 0)
+    check_int(log_backup_count, "log_backup_count", 0)
+    check_boolean(log_json_lines, "log_json_lines")
+    check_boolean(screenshot_modal_only, "screenshot_modal_only")
+    check_int(screenshot_quality, "screenshot_quality", 0)
+    if screenshot_quality > 100: raise ValueError(f'The variable "screenshot_quality" in "{__validation_file_path}" expects an Integer between 0 and 100! Received `{screenshot_quality}` instead!')
+    check_boolean(screenshot_dedupe, "screenshot_dedupe")
+    check_boolean(screenshot_perceptual_dedupe, "screenshot_perceptual_dedupe")
+    check_int(screenshot_quota_mb, "screenshot_quota_mb", 0)
+    check_int(page_dump_interval, "page_dump_interval", 0)
 
     check_int(click_gap, "click_gap", 0)
+    check_int(readiness_timeout, "readiness_timeout", 1)
+    if readiness_timeout > 25: raise ValueError(f'The variable "readiness_timeout" in "{__validation_file_path}" expects an Integer between 1 and 25! Received `{readiness_timeout}` instead!')
+    check_int(parallel_workers, "parallel_workers", 1)
+    if parallel_workers > 1 and not use_history_ledger:
+        raise ValueError(f'"parallel_workers" in "{__validation_file_path}" needs "use_history_ledger = True", workers claim jobs in the ledger!')
+    check_string(worker_profiles_folder, "worker_profiles_folder", min_length=1)
+    check_int(recycle_browser_heap_mb, "recycle_browser_heap_mb", 0)
+    check_int(max_open_tabs, "max_open_tabs", 0)
+    check_string(driver_cache_folder, "driver_cache_folder")
+    check_string(warm_profile_folder, "warm_profile_folder")
+    check_boolean(persist_login_session, "persist_login_session")
+    check_string(session_state_file, "session_state_file", min_length=1)
+    check_string(launch_profile, "launch_profile", ["default", "lean"])
+    check_string(page_load_strategy, "page_load_strategy", ["normal", "eager"])
+    check_boolean(prefetch_job_details, "prefetch_job_details")
 
     check_boolean(run_in_background, "run_in_background")
     check_boolean(disable_extensions, "disable_extensions")
@@ -245,6 +276,7 @@ def validate_settings() -> None | ValueError | TypeError:
     check_boolean(smooth_scroll, "smooth_scroll")
     check_boolean(keep_screen_awake, "keep_screen_awake")
     check_boolean(stealth_mode, "stealth_mode")
+    check_list(blocked_resources, "blocked_resources", ["images", "media", "fonts", "trackers"])
 
 
 
@@ -0,0 +1,91 @@
+'''
+Author:     Sai Vignesh Golla
+LinkedIn:   https://www.linkedin.com/in/saivigneshgolla/
+
+Copyright (C) 2024 Sai Vignesh Golla
+
+License:    GNU Affero General Public License
+            https://www.gnu.org/licenses/agpl-3.0.en.html
+            
+GitHub:     https://github.com/GodsScion/Auto_job_applier_linkedIn
+
+version:    24.12.29.12.30
+'''
+
+# Imports
+from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
+
+from config.settings import recycle_browser_heap_mb, max_open_tabs
+from modules.helpers import print_lg
+
+
+#< Browser watchdog
+# Long runs leak renderer memory and tabs. The bot asks the watchdog between jobs and between result pages whether to
+# close stray tabs or restart Chrome, see `recycle_browser()` in runAiBot.py.
+class BrowserWatchdog:
+    '''
+    Samples the memory of the LinkedIn tab with Chrome DevTools `Performance.getMetrics` and counts open tabs.
+    * `max_heap_mb`: JS heap size past which Chrome should be restarted (0 = never)
+    * `max_tabs`: number of open tabs past which tabs other than the ones kept are closed (0 = never)
+    '''
+    def __init__(self, max_heap_mb: int = recycle_browser_heap_mb, max_tabs: int = max_open_tabs) -> None:
+        self.max_heap_mb = max_heap_mb
+        self.max_tabs = max_tabs
+        self.recycles = 0
+        self.closed_tabs = 0
+
+    def get_metrics(self, driver) -> dict[str, float]:
+        '''
+        Function to get Chrome's performance metrics of `driver`'s current tab, like "JSHeapUsedSize", "Nodes" and "Documents".
+        '''
+        driver.execute_cdp_cmd("Performance.enable", {})
+        return {metric["name"]: metric["value"] for metric in driver.execute_cdp_cmd("Performance.getMetrics", {})["metrics"]}
+
+    def close_stray_tabs(self, driver, keep: list[str]) -> int:
+        '''
+        Function to close all tabs but `keep` if more than `max_tabs` are open, leaves `driver` on `keep[0]`. Returns number of tabs closed.
+        '''
+        if not self.max_tabs: return 0
+        handles = driver.window_handles
+        if len(handles) <= self.max_tabs: return 0
+        closed = 0
+        for handle in handles:
+            if handle in keep: continue
+            try:
+                driver.switch_to.window(handle)
+                driver.close()
+                closed += 1
+            except Exception as e:
+                print_lg("Failed to close a stray tab!", e)
+        driver.switch_to.window(keep[0])
+        self.closed_tabs += closed
+        print_lg(f"Closed {closed} stray tabs, {len(handles)} were open.")
+        return closed
+
+    def needs_recycle(self, driver) -> str | None:
+        '''
+        Function to check if Chrome should be restarted. Returns the reason, or `None` if not (or if it couldn't be checked).
+        '''
+        if not self.max_heap_mb: return None
+        try:
+            metrics = self.get_metrics(driver)
+        except Exception as e:
+            print_lg("Failed to get browser memory metrics!", e)
+            return None
+        heap_mb = metrics.get("JSHeapUsedSize", 0) / 1024 / 1024
+        print_lg(f"Browser memory: {heap_mb:.0f} MB JS heap, {metrics.get('Nodes', 0):.0f} DOM nodes, {metrics.get('Documents', 0):.0f} documents.")
+        if heap_mb > self.max_heap_mb: return f"JS heap is {heap_mb:.0f} MB, past {self.max_heap_mb} MB"
+        return None
+
+
+def get_results_page_url(url: str, page: int | None, page_size: int = 25) -> str:
+    '''
+    Function to get the URL of search results page number `page` (from 1) given the URL of any page of the same search.
+    '''
+    if not page: return url
+    parts = urlparse(url)
+    query = parse_qs(parts.query)
+    query.pop("currentJobId", None)
+    query["start"] = [str((page - 1) * page_size)]
+    return urlunparse(parts._replace(query=urlencode(query, doseq=True)))
+#>
@@ -0,0 +1,129 @@
+'''
+Author:     Sai Vignesh Golla
+LinkedIn:   https://www.linkedin.com/in/saivigneshgolla/
+
+Copyright (C) 2024 Sai Vignesh Golla
+
+License:    GNU Affero General Public License
+            https://www.gnu.org/licenses/agpl-3.0.en.html
+            
+GitHub:     https://github.com/GodsScion/Auto_job_applier_linkedIn
+
+version:    24.12.29.12.30
+'''
+
+# Imports
+import os
+import multiprocessing
+
+from queue import Empty
+from random import shuffle, uniform
+from time import sleep, time
+
+from config.settings import stealth_mode, worker_profiles_folder, stagger_applications, stagger_min_delay, stagger_max_delay, application_budget_per_run
+from config.search import randomize_search_order
+from modules.helpers import print_lg
+from modules.storage.ledger import clear_claims
+from modules.storage.history import recover_journals
+from modules.chrome_cache import get_cached_driver, seed_profile
+
+
+#< Rate governor
+class RateGovernor:
+    '''
+    Paces applications of all worker processes together, since LinkedIn limits them per account, not per browser.
+    * Applications start at least `min_delay` to `max_delay` (random) seconds apart across all workers
+    * At most `budget` applications are started in total (0 = unlimited)
+    * Any worker can `stop()` all of them (Eg: daily Easy Apply limit reached)
+    '''
+    def __init__(self, min_delay: float = 0, max_delay: float = 0, budget: int = 0, context=multiprocessing) -> None:
+        self.min_delay = min(min_delay, max_delay)
+        self.max_delay = max(min_delay, max_delay)
+        self.budget = budget
+        self.__lock = context.Lock()
+        self.__count = context.Value('i', 0, lock=False)
+        self.__next_time = context.Value('d', 0.0, lock=False)
+        self.__stopped = context.Event()
+
+    @property
+    def count(self) -> int:
+        return self.__count.value
+
+    @property
+    def stopped(self) -> bool:
+        return self.__stopped.is_set()
+
+    def stop(self) -> None:
+        self.__stopped.set()
+
+    def acquire(self) -> bool:
+        '''
+        Function to wait for this worker's turn to start an application.
+        * Returns `False` if the budget is used up or the pool was stopped, the worker should stop applying
+        '''
+        with self.__lock:
+            if self.stopped or (self.budget and self.__count.value >= self.budget): return False
+            start = max(time(), self.__next_time.value)
+            self.__next_time.value = start + uniform(self.min_delay, self.max_delay)
+            self.__count.value += 1
+        if start > time():
+            print_lg(f"Waiting {start - time():.1f} seconds for the application rate limit.")
+            sleep(max(start - time(), 0))
+        return not self.stopped
+#>
+
+
+#< Worker pool
+def get_worker_profile_dir(worker: int, folder: str = worker_profiles_folder) -> str:
+    '''
+    Function to get the Chrome profile folder of `worker`, Chrome can't share a profile between windows.
+    '''
+    return os.path.abspath(os.path.join(folder, f"worker-{worker}"))
+
+
+def iter_search_terms(term_queue):
+    '''
+    Function to take search terms from the shared `term_queue` until it's empty.
+    '''
+    while True:
+        try: yield term_queue.get(timeout=1)
+        except Empty: return
+
+
+def worker_main(worker: int, term_queue, governor: RateGovernor, profile_dir: str) -> None:
+    # Imported here, so only worker processes load the bot
+    import runAiBot
+    runAiBot.run_worker(f"Worker {worker}", iter_search_terms(term_queue), governor, profile_dir)
+
+
+def run_pool(workers: int, search_terms: list[str]) -> int:
+    '''
+    Function to apply with `workers` browsers in parallel, each in its own process with its own Chrome profile.
+    * Workers take search terms from a shared queue, claim jobs in the ledger before applying and share a `RateGovernor`
+    * Returns number of applications started
+    '''
+    context = multiprocessing.get_context("spawn")
+    search_terms = list(search_terms)
+    if randomize_search_order: shuffle(search_terms)
+    dropped = clear_claims()
+    if dropped: print_lg(f"Dropped {dropped} job claims of the previous worker pool run.")
+    term_queue = context.Queue()
+    for term in search_terms: term_queue.put(term)
+    delays = (stagger_min_delay, stagger_max_delay) if stagger_applications else (0, 0)
+    governor = RateGovernor(*delays, application_budget_per_run, context)
+    get_cached_driver(stealth_mode)    # Once here, instead of every worker looking for it at the same time
+    processes = []
+    for worker in range(1, workers + 1):
+        profile_dir = get_worker_profile_dir(worker)
+        if not seed_profile(profile_dir): os.makedirs(profile_dir, exist_ok=True)
+        process = context.Process(target=worker_main, args=(worker, term_queue, governor, profile_dir), name=f"Worker {worker}")
+        process.start()
+        processes.append(process)
+        print_lg(f'Started worker {worker} (pid {process.pid}) with Chrome profile "{profile_dir}"')
+    for process in processes:
+        process.join()
+        if process.exitcode: print_lg(f"{process.name} exited with code {process.exitcode}!")
+    recover_journals()    # Rows a crashed worker couldn't save
+    print_lg(f"Worker pool finished, {governor.count} applications started by {workers} workers.")
+    return governor.count
+#>
@@ -17,6 +17,7 @@ version:    24.12.29.12.30
 import os
 import csv
 import re
+import json
 import pyautogui
 
 # Set CSV field size limit to prevent field size errors
@@ -48,6 +49,21 @@ from modules.ai.openaiConnections import ai_create_openai_client, ai_extract_ski
 from modules.ai.deepseekConnections import deepseek_create_client, deepseek_extract_skills, deepseek_answer_question
 from modules.ai.geminiConnections import gemini_create_client, gemini_extract_skills, gemini_answer_question
 from modules.resume_parser import find_years_for_label
+from modules.storage.ledger import LedgerJobIds, sync_from_csv, close_ledger, claim_job
+from modules.storage.id_index import JobIdIndex, load_job_id_index
+from modules.storage.history import get_history_writer, record_history, record_history_rows, flush_history, recover_journals
+from modules.storage.blobs import store_description, replace_description
+from modules.storage.archive import archive_history
+from modules.storage.partitions import iter_job_ids
+from modules.storage.screenshots import save_screenshot, flush_screenshots
+from modules.storage.page_dumps import dump_page_source
+from modules.resource_blocking import report_blocked_resources
+from modules.prefetch import JobPrefetcher, prefetch_chrome_arguments
+from modules.worker_pool import RateGovernor, run_pool
+from modules.watchdog import BrowserWatchdog, get_results_page_url
+from modules.session_state import save_session_state, restore_session_state, probe_session
+from modules.job_cards import get_job_cards, get_skip_reason, filter_job_cards
+from modules.readiness import wait_for_stable_count, wait_for_job_details, wait_for_job_top_card, wait_for_typeahead, wait_until_settled, wait_for_job_list, wait_for_search_results, wait_for_login_page
 
 from typing import Literal
 
@@ -78,6 +94,17 @@ failed_count = 0
 skip_count = 0
 dailyEasyApplyLimitReached = False
 applications_since_budget_prompt = 0
+current_search_term = "Unknown"
+
+# Chrome is launched by `main()`, importing this module doesn't open a browser
+session = DriverSession(arguments=prefetch_chrome_arguments if prefetch_job_details else None)
+driver = wait = actions = None
+job_prefetcher = None
+watchdog = BrowserWatchdog()
+
+# Set in worker processes of the worker pool (`parallel_workers` > 1)
+worker_name = None
+rate_governor = None
 
 re_experience = re.compile(r'[(]?\s*(\d+)\s*[)]?\s*[-to]*\s*\d*[+]*\s*year[s]?', re.IGNORECASE)
 
@@ -124,6 +151,7 @@ def login_LN() -> None:
     '''
     # Find the username and password fields and fill them with user credentials
     driver.get("https://www.linkedin.com/login")
+    wait_for_login_page(driver)
     try:
         wait.until(EC.presence_of_element_located((By.LINK_TEXT, "Forgot password?")))
         try:
@@ -154,23 +182,46 @@ def login_LN() -> None:
         print_lg("Seems like login attempt failed! Possibly due to wrong credentials or already logged in! Try logging in manually!")
         # print_lg(e)
         manual_login_retry(is_logged_in_LN, 2)
+
+
+def ensure_logged_in() -> None:
+    '''
+    Function to make sure the browser is logged in to LinkedIn
+    * Reuses the saved session if `persist_login_session` and it's still valid, skipping the login page
+    * Else logs in with `login_LN()` and saves the new session
+    '''
+    if persist_login_session and restore_session_state(driver):
+        if probe_session(driver): return print_lg("Reused the saved LinkedIn session.")
+        print_lg("Saved LinkedIn session expired, logging in again.")
+    driver.get("https://www.linkedin.com/login")
+    wait_for_login_page(driver)
+    if not is_logged_in_LN(): login_LN()
+    if persist_login_session: save_session_state(driver)
 #>
 
 
 
-def get_applied_job_ids() -> set:
+def get_applied_job_ids() -> set | LedgerJobIds | JobIdIndex:
     '''
     Function to get a `set` of applied job's Job IDs
-    * Returns a set of Job IDs from existing applied jobs history csv file
+    * Returns a set-like `LedgerJobIds` backed by the history ledger if `use_history_ledger = True`
+    * Else returns a set-like `JobIdIndex` backed by the sorted Job ID index of the applied jobs history csv file
+    * Falls back to a set of Job IDs read from the applied jobs history csv file and its monthly partitions
     '''
-    job_ids = set()
+    if use_history_ledger:
+        try:
+            imported = sync_from_csv()
+            for table, count in imported.items():
+                if count: print_lg(f"Imported {count} rows from history CSV into the {table} ledger.")
+            return LedgerJobIds()
+        except Exception as e:
+            print_lg("Failed to open history ledger, falling back to history CSV!", e)
     try:
-        with open(file_name, 'r', encoding='utf-8') as file:
-            reader = csv.reader(file)
-            for row in reader:
-                job_ids.add(row[0])
-    except FileNotFoundError:
-        print_lg(f"The CSV file '{file_name}' does not exist.")
+        return load_job_id_index(file_name)
+    except Exception as e:
+        print_lg("Failed to load applied Job IDs index, reading history CSV instead!", e)
+    job_ids = set(iter_job_ids(file_name))
+    if not job_ids: print_lg(f"The CSV file '{file_name}' does not exist.")
     return job_ids
 
 
@@ -189,7 +240,7 @@ def set_search_location() -> None:
             actions.send_keys(Keys.TAB, Keys.TAB).perform()
             actions.key_down(Keys.CONTROL).send_keys("a").key_up(Keys.CONTROL).perform()
             actions.send_keys(search_location.strip()).perform()
-            sleep(2)
+            wait_for_typeahead(driver)
             actions.send_keys(Keys.ENTER).perform()
             try_xp(driver, ".//button[@aria-label='Cancel']")
         except Exception as e:
@@ -201,46 +252,45 @@ def apply_filters() -> None:
     '''
     Function to apply job search filters
     '''
+    filters_modal = ".artdeco-modal"    # "All filters" dialog, waits after clicks only watch it
     set_search_location()
 
     try:
-        recommended_wait = 1 if click_gap < 1 else 0
-
         wait.until(EC.presence_of_element_located((By.XPATH, '//button[normalize-space()="All filters"]'))).click()
-        buffer(recommended_wait)
+        wait_until_settled(driver, root=filters_modal)
 
         wait_span_click(driver, sort_by)
         wait_span_click(driver, date_posted)
-        buffer(recommended_wait)
+        wait_until_settled(driver, root=filters_modal)
 
         multi_sel_noWait(driver, experience_level) 
         multi_sel_noWait(driver, companies, actions)
-        if experience_level or companies: buffer(recommended_wait)
+        if experience_level or companies: wait_until_settled(driver, root=filters_modal)
 
         multi_sel_noWait(driver, job_type)
         multi_sel_noWait(driver, on_site)
-        if job_type or on_site: buffer(recommended_wait)
+        if job_type or on_site: wait_until_settled(driver, root=filters_modal)
 
         if easy_apply_only: boolean_button_click(driver, actions, "Easy Apply")
         
         multi_sel_noWait(driver, location)
         multi_sel_noWait(driver, industry)
-        if location or industry: buffer(recommended_wait)
+        if location or industry: wait_until_settled(driver, root=filters_modal)
 
         multi_sel_noWait(driver, job_function)
         multi_sel_noWait(driver, job_titles)
-        if job_function or job_titles: buffer(recommended_wait)
+        if job_function or job_titles: wait_until_settled(driver, root=filters_modal)
 
         if under_10_applicants: boolean_button_click(driver, actions, "Under 10 applicants")
         if in_your_network: boolean_button_click(driver, actions, "In your network")
         if fair_chance_employer: boolean_button_click(driver, actions, "Fair Chance Employer")
 
         wait_span_click(driver, salary)
-        buffer(recommended_wait)
+        wait_until_settled(driver, root=filters_modal)
         
         multi_sel_noWait(driver, benefits)
         multi_sel_noWait(driver, commitments)
-        if benefits or commitments: buffer(recommended_wait)
+        if benefits or commitments: wait_until_settled(driver, root=filters_modal)
 
         show_results_button: WebElement = driver.find_element(By.XPATH, '//button[contains(@aria-label, "Apply current filters to show")]')
         show_results_button.click()
@@ -272,61 +322,45 @@ def get_page_info() -> tuple[WebElement | None, int | None]:
 
 
 
-def get_job_main_details(job: WebElement, blacklisted_companies: set, rejected_jobs: set) -> tuple[str, str, str, str, str, bool]:
+def open_job_card(job_id: str, title: str, company: str, prefetched: bool = False) -> None:
     '''
-    # Function to get job main details.
-    Returns a tuple of (job_id, title, company, work_location, work_style, skip)
-    * job_id: Job ID
-    * title: Job title
-    * company: Company name
-    * work_location: Work location of this job
-    * work_style: Work style of this job (Remote, On-site, Hybrid)
-    * skip: A boolean flag to skip this job
+    Function to click the job card of `job_id` on the results page and wait for its details to load.
+    * If its details were `prefetched`, only waits for the top card with the apply button, not the description
     '''
-    job_details_button = job.find_element(By.TAG_NAME, 'a')  # job.find_element(By.CLASS_NAME, "job-card-list__title")  # Problem in India
+    job_details_button = driver.find_element(By.CSS_SELECTOR, f'li[data-occludable-job-id="{job_id}"] a')
     scroll_to_view(driver, job_details_button, True)
-    job_id = job.get_dom_attribute('data-occludable-job-id')
-    title = job_details_button.text
-    title = title[:title.find("\n")]
-    # company = job.find_element(By.CLASS_NAME, "job-card-container__primary-description").text
-    # work_location = job.find_element(By.CLASS_NAME, "job-card-container__metadata-item").text
-    other_details = job.find_element(By.CLASS_NAME, 'artdeco-entity-lockup__subtitle').text
-    index = other_details.find(' · ')
-    company = other_details[:index]
-    work_location = other_details[index+3:]
-    work_style = work_location[work_location.rfind('(')+1:work_location.rfind(')')]
-    work_location = work_location[:work_location.rfind('(')].strip()
-    
-    # Skip if previously rejected due to blacklist or already applied
-    skip = False
-    if company in blacklisted_companies:
-        print_lg(f'Skipping "{title} | {company}" job (Blacklisted Company). Job ID: {job_id}!')
-        skip = True
-    elif job_id in rejected_jobs: 
-        print_lg(f'Skipping previously rejected "{title} | {company}" job. Job ID: {job_id}!')
-        skip = True
-    try:
-        if job.find_element(By.CLASS_NAME, "job-card-container__footer-job-state").text == "Applied":
-            skip = True
-            print_lg(f'Already applied to "{title} | {company}" job. Job ID: {job_id}!')
-    except: pass
     try: 
-        if not skip: job_details_button.click()
+        job_details_button.click()
     except Exception as e:
         print_lg(f'Failed to click "{title} | {company}" job on details button. Job ID: {job_id}!') 
         # print_lg(e)
         discard_job()
         job_details_button.click() # To pass the error outside
+    if prefetched: wait_for_job_top_card(driver, job_id)
+    else: wait_for_job_details(driver, job_id)
     buffer(click_gap)
-    return (job_id,title,company,work_location,work_style,skip)
+
+
+def get_next_job_id(job_cards: list[dict], index: int, blacklisted_companies: set, rejected_jobs: set, applied_jobs: set) -> str | None:
+    '''
+    Function to get the Job ID of the first job after `job_cards[index]` that won't be skipped for being blacklisted, applied to or rejected already.
+    '''
+    for card in job_cards[index+1:]:
+        if not get_skip_reason(card, blacklisted_companies, rejected_jobs, applied_jobs): return card["job_id"]
+    return None
 
 
 # Function to check for Blacklisted words in About Company
-def check_blacklist(rejected_jobs: set, job_id: str, company: str, blacklisted_companies: set) -> tuple[set, set, WebElement] | ValueError:
-    jobs_top_card = try_find_by_classes(driver, ["job-details-jobs-unified-top-card__primary-description-container","job-details-jobs-unified-top-card__primary-description","jobs-unified-top-card__primary-description","jobs-details__main-content"])
-    about_company_org = find_by_class(driver, "jobs-company__box")
-    scroll_to_view(driver, about_company_org)
-    about_company_org = about_company_org.text
+def check_blacklist(rejected_jobs: set, job_id: str, company: str, blacklisted_companies: set, about_company_org: str | None = None) -> tuple[set, set, WebElement | None] | ValueError:
+    '''
+    * If `about_company_org` is given (Eg: prefetched), it's checked instead of the page and the returned top card is `None`
+    '''
+    jobs_top_card = None
+    if about_company_org is None:
+        jobs_top_card = try_find_by_classes(driver, ["job-details-jobs-unified-top-card__primary-description-container","job-details-jobs-unified-top-card__primary-description","jobs-unified-top-card__primary-description","jobs-details__main-content"])
+        about_company_org = find_by_class(driver, "jobs-company__box")
+        scroll_to_view(driver, about_company_org)
+        about_company_org = about_company_org.text
     about_company = about_company_org.lower()
     skip_checking = False
     for word in about_company_good_words:
@@ -340,6 +374,7 @@ def check_blacklist(rejected_jobs: set, job_id: str, company: str, blacklisted_c
                 rejected_jobs.add(job_id)
                 blacklisted_companies.add(company)
                 raise ValueError(f'\n"{about_company_org}"\n\nContains "{word}".')
+    if jobs_top_card is None: return rejected_jobs, blacklisted_companies, jobs_top_card
     buffer(click_gap)
     scroll_to_view(driver, jobs_top_card)
     return rejected_jobs, blacklisted_companies, jobs_top_card
@@ -362,8 +397,8 @@ def handle_application_pacing(application_link: str) -> bool:
     Returns False if the run should stop, otherwise True.
     '''
     global applications_since_budget_prompt
-    if application_link == "Skipped":
-        return True
+    if application_link == "Skipped" or rate_governor:
+        return True     # Worker pool applications are paced by `rate_governor` before they start
 
     applications_since_budget_prompt += 1
 
@@ -395,6 +430,7 @@ def handle_application_pacing(application_link: str) -> bool:
 
 
 def get_job_description(
+    description: str | None = None
 ) -> tuple[
     str | Literal['Unknown'],
     int | Literal['Unknown'],
@@ -404,7 +440,7 @@ def get_job_description(
     ]:
     '''
     # Job Description
-    Function to extract job description from About the Job.
+    Function to extract job description from About the Job, or check the given `description` (Eg: prefetched) instead.
     ### Returns:
     - `jobDescription: str | 'Unknown'`
     - `experience_required: int | 'Unknown'`
@@ -418,7 +454,7 @@ def get_job_description(
         ##<
         experience_required = "Unknown"
         found_masters = 0
-        jobDescription = find_by_class(driver, "jobs-box__html-content").text
+        jobDescription = description if description else find_by_class(driver, "jobs-box__html-content").text
         jobDescriptionLow = jobDescription.lower()
         skip = False
         skipReason = None
@@ -496,8 +532,14 @@ def answer_questions(
     current_date: str,
     job_description: str | None = None,
     *,
-    phone_country_code_value: str | None = None
+    phone_country_code_value: str | None = None,
+    answer_records: dict | None = None
 ) -> set:
+    '''
+    Function to answer all questions in the current page of Easy Apply form `modal`.
+    * Adds (question, answer, type, previous answer) tuples to `questions_list` and returns it
+    * If `answer_records` is given, also keeps one structured record per question in it, with options and how the answer was chosen
+    '''
     # Get all questions from the page
      
     all_questions = modal.find_elements(By.XPATH, ".//div[@data-test-form-element]")
@@ -506,6 +548,13 @@ def answer_questions(
     # all_single_line_questions = modal.find_elements(By.XPATH, ".//div[@data-test-single-line-text-form-component]")
     # all_questions = all_questions + all_list_questions + all_single_line_questions
 
+    def _record_answer(question: str, question_type: str, options: list[str] | None, answer, prev_answer, source: str) -> None:
+        if answer_records is None: return
+        answer_records[(question, question_type)] = {
+            'Question': question, 'Type': question_type, 'Options': json.dumps(options, ensure_ascii=False) if options else None,
+            'Answer': answer, 'Previous Answer': prev_answer, 'Source': source
+        }
+
     def _extract_label_text(question_block: WebElement, control: WebElement | None = None) -> tuple[str, str]:
         """
         Try to determine a human readable label for the given question.
@@ -586,6 +635,7 @@ def answer_questions(
             optionsText = [option.text for option in select.options]
             options = "".join([f' "{option}",' for option in optionsText])
             prev_answer = selected_option
+            source = "previous"
             desired_override = None
             if 'email' in label:
                 desired_override = preferred_email if preferred_email else prev_answer
@@ -599,6 +649,7 @@ def answer_questions(
                 )
             force_overwrite = desired_override is not None
             if overwrite_previous_answers or selected_option == "Select an option" or force_overwrite:
+                source = "rule"
                 keyword_answer = next((value for key, value in question_keyword_answers.items() if key in label), None)
                 if keyword_answer is not None:
                     answer = keyword_answer
@@ -662,8 +713,10 @@ def answer_questions(
                     print_lg(f'Failed to find an option with text "{answer}" for question labelled "{label_org}", answering randomly!')
                     select.select_by_index(randint(1, len(select.options)-1))
                     randomly_answered_questions.add((f'{label_org} [ {options} ]',"select"))
+                    source = "random"
                 answer = select.first_selected_option.text
             questions_list.add((f'{label_org} [ {options} ]', answer, "select", prev_answer))
+            _record_answer(label_org, "select", optionsText, answer, prev_answer, source)
             continue
         
         # Check if it's a radio Question
@@ -675,6 +728,8 @@ def answer_questions(
             if label == "unknown":
                 label = label_org.lower()
 
+            question = label_org
+            source = "previous"
             label_org += ' [ '
             options = radio.find_elements(By.TAG_NAME, 'input')
             options_labels = []
@@ -687,6 +742,7 @@ def answer_questions(
                 label_org += f' {options_labels[-1]},'
 
             if overwrite_previous_answers or prev_answer is None:
+                source = "rule"
                 keyword_answer = next((value for key, value in question_keyword_answers.items() if key in label), None)
                 if keyword_answer is not None:
                     answer = keyword_answer
@@ -724,9 +780,12 @@ def answer_questions(
                     #             ele = foundOption
                     #             break
                     actions.move_to_element(ele).click().perform()
-                    if not foundOption: randomly_answered_questions.add((f'{label_org} ]',"radio"))
+                    if not foundOption:
+                        randomly_answered_questions.add((f'{label_org} ]',"radio"))
+                        source = "random"
             else: answer = prev_answer
             questions_list.add((label_org+" ]", answer, "radio", prev_answer))
+            _record_answer(question, "radio", options_labels, answer, prev_answer, source)
             continue
         
         # Check if it's a text question
@@ -739,7 +798,9 @@ def answer_questions(
                 label = label_org.lower()
 
             prev_answer = text.get_attribute("value")
+            source = "previous"
             if not prev_answer or overwrite_previous_answers:
+                source = "rule"
                 keyword_answer = next((value for key, value in question_keyword_answers.items() if key in label), None)
                 if keyword_answer is not None:
                     answer = keyword_answer
@@ -791,6 +852,7 @@ def answer_questions(
                 else: answer = answer_common_questions(label,answer)
                 ##> ------ Yang Li : MARKYangL - Feature ------
                 if answer == "":
+                    source = "random"
                     if use_AI and aiClient:
                         try:
                             if ai_provider.lower() == "openai":
@@ -804,6 +866,7 @@ def answer_questions(
                                 answer = years_of_experience
                             if answer and isinstance(answer, str) and len(answer) > 0:
                                 print_lg(f'AI Answered received for question "{label_org}" \nhere is answer: "{answer}"')
+                                source = "ai"
                             else:
                                 randomly_answered_questions.add((label_org, "text"))
                                 answer = years_of_experience
@@ -818,10 +881,11 @@ def answer_questions(
                 text.clear()
                 text.send_keys(answer)
                 if do_actions:
-                    sleep(2)
+                    wait_for_typeahead(driver)
                     actions.send_keys(Keys.ARROW_DOWN)
                     actions.send_keys(Keys.ENTER).perform()
             questions_list.add((label, text.get_attribute("value"), "text", prev_answer))
+            _record_answer(label_org, "text", None, text.get_attribute("value"), prev_answer, source)
             continue
 
         # Check if it's a textarea question
@@ -832,7 +896,9 @@ def answer_questions(
             label = label_org.lower()
             answer = ""
             prev_answer = text_area.get_attribute("value")
+            source = "previous"
             if not prev_answer or overwrite_previous_answers:
+                source = "rule"
                 keyword_answer = next((value for key, value in textarea_keyword_answers.items() if key in label), None)
                 if keyword_answer is not None:
                     answer = keyword_answer
@@ -840,6 +906,7 @@ def answer_questions(
                 elif 'cover' in label: answer = _apply_text_placeholders(cover_letter, job_title, company_name, current_date)
                 if answer == "":
                 ##> ------ Yang Li : MARKYangL - Feature ------
+                    source = "random"
                     if use_AI and aiClient:
                         try:
                             if ai_provider.lower() == "openai":
@@ -853,6 +920,7 @@ def answer_questions(
                                 answer = ""
                             if answer and isinstance(answer, str) and len(answer) > 0:
                                 print_lg(f'AI Answered received for question "{label_org}" \nhere is answer: "{answer}"')
+                                source = "ai"
                             else:
                                 randomly_answered_questions.add((label_org, "textarea"))
                                 answer = ""
@@ -865,10 +933,11 @@ def answer_questions(
             text_area.clear()
             text_area.send_keys(answer)
             if do_actions:
-                    sleep(2)
+                    wait_for_typeahead(driver)
                     actions.send_keys(Keys.ARROW_DOWN)
                     actions.send_keys(Keys.ENTER).perform()
             questions_list.add((label, text_area.get_attribute("value"), "textarea", prev_answer))
+            _record_answer(label_org, "textarea", None, text_area.get_attribute("value"), prev_answer, source)
             ##<
             continue
 
@@ -890,6 +959,7 @@ def answer_questions(
                     print_lg("Checkbox click failed!", e)
                     pass
             questions_list.add((f'{label} ([X] {answer})', checked, "checkbox", prev_answer))
+            _record_answer(label_org, "checkbox", [answer], checked, prev_answer, "previous" if prev_answer else "rule")
             continue
 
 
@@ -921,7 +991,7 @@ def external_apply(pagination_element: WebElement, job_id: str, job_link: str, r
         wait_span_click(driver, "Continue", 1, True, False)
         windows = driver.window_handles
         tabs_count = len(windows)
-        driver.switch_to.window(windows[-1])
+        driver.switch_to.window([window for window in windows if not job_prefetcher or window != job_prefetcher.handle][-1])
         application_link = driver.current_url
         print_lg('Got the external application link "{}"'.format(application_link))
         if close_tabs and driver.current_window_handle != linkedIn_tab: driver.close()
@@ -937,10 +1007,11 @@ def external_apply(pagination_element: WebElement, job_id: str, job_link: str, r
 
 
 
-def follow_company(modal: WebDriver = driver) -> None:
+def follow_company(modal: WebDriver | WebElement | None = None) -> None:
     '''
     Function to follow or un-follow easy applied companies based om `follow_companies`
     '''
+    modal = modal or driver
     try:
         script = r"""
 const container = arguments[0];
@@ -1154,32 +1225,45 @@ return processed;
 
 
 #< Failed attempts logging
-def failed_job(job_id: str, job_link: str, resume: str, date_listed, error: str, exception: Exception, application_link: str, screenshot_name: str) -> None:
+def failed_job(job_id: str, job_link: str, resume: str, date_listed, error: str, exception: Exception, application_link: str, screenshot_name: str, company: str = "Unknown") -> None:
     '''
     Function to update failed jobs list in excel
+    * Row is journaled right away and written to the history files in the background
+    * Counts it as a skip (`application_link = "Skipped"`) or failure of `company` in run statistics
     '''
     try:
-        with open(failed_file_name, 'a', newline='', encoding='utf-8') as file:
-            fieldnames = ['Job ID', 'Job Link', 'Resume Tried', 'Date listed', 'Date Tried', 'Assumed Reason', 'Stack Trace', 'External Job link', 'Screenshot Name']
-            writer = csv.DictWriter(file, fieldnames=fieldnames)
-            if file.tell() == 0: writer.writeheader()
-            writer.writerow({'Job ID':truncate_for_csv(job_id), 'Job Link':truncate_for_csv(job_link), 'Resume Tried':truncate_for_csv(resume), 'Date listed':truncate_for_csv(date_listed), 'Date Tried':datetime.now(), 'Assumed Reason':truncate_for_csv(error), 'Stack Trace':truncate_for_csv(exception), 'External Job link':truncate_for_csv(application_link), 'Screenshot Name':truncate_for_csv(screenshot_name)})
-            file.close()
+        record_history("failed", {'Job ID':truncate_for_csv(job_id), 'Job Link':truncate_for_csv(job_link), 'Resume Tried':truncate_for_csv(resume), 'Date listed':truncate_for_csv(date_listed), 'Date Tried':datetime.now(), 'Assumed Reason':truncate_for_csv(error), 'Stack Trace':truncate_for_csv(exception), 'External Job link':truncate_for_csv(application_link), 'Screenshot Name':truncate_for_csv(screenshot_name)})
+        record_history("stats", {"event": "skipped" if application_link == "Skipped" else "failed", "search_term": current_search_term, "company": company, "reason": error})
     except Exception as e:
         print_lg("Failed to update failed jobs list!", e)
-        pyautogui.alert("Failed to update the excel of failed jobs!\nProbably because of 1 of the following reasons:\n1. The file is currently open or in use by another program\n2. Permission denied to write to the file\n3. Failed to find the file", "Failed Logging")
 
 
 def screenshot(driver: WebDriver, job_id: str, failedAt: str) -> str:
     '''
     Function to to take screenshot for debugging
-    - Returns screenshot name as String
+    - Captures only the Easy Apply form if `screenshot_modal_only` and it's open, else the page
+    - Only grabs the image from browser, decoding and saving happens in background
+    - Returns screenshot name as String, or "Not Available" if capturing failed
     '''
-    screenshot_name = "{} - {} - {}.png".format( job_id, failedAt, str(datetime.now()) )
-    path = logs_folder_path+"/screenshots/"+screenshot_name.replace(":",".")
+    extension = ".jpg" if screenshot_quality > 0 else ".png"
+    screenshot_name = "{} - {} - {}{}".format( job_id, failedAt, str(datetime.now()), extension ).replace(":",".")
     # special_chars = {'*', '"', '\\', '<', '>', ':', '|', '?'}
-    # for char in special_chars:  path = path.replace(char, '-')
-    driver.save_screenshot(path.replace("//","/"))
+    # for char in special_chars:  screenshot_name = screenshot_name.replace(char, '-')
+    try:
+        modal = driver.find_elements(By.CLASS_NAME, "jobs-easy-apply-modal") if screenshot_modal_only else []
+        options = {"format": "jpeg", "quality": screenshot_quality} if screenshot_quality > 0 else {"format": "png"}
+        if modal:
+            x, y, width, height = driver.execute_script("const r = arguments[0].getBoundingClientRect(); return [r.x + window.scrollX, r.y + window.scrollY, r.width, r.height];", modal[0])
+            options["clip"] = {"x": x, "y": y, "width": width, "height": height, "scale": 1}
+        try:
+            encoded = driver.execute_cdp_cmd("Page.captureScreenshot", options)["data"]
+        except Exception:
+            encoded = modal[0].screenshot_as_base64 if modal else driver.get_screenshot_as_base64()
+            screenshot_name = screenshot_name[:-len(extension)] + ".png"
+        if not save_screenshot(screenshot_name, encoded): print_lg(f'Skipped screenshot "{screenshot_name}", too many screenshots waiting to be saved.')
+    except Exception as e:
+        print_lg(f'Failed to take screenshot for "{failedAt}"!', e)
+        return "Not Available"
     return screenshot_name
 #>
 
@@ -1188,24 +1272,27 @@ def screenshot(driver: WebDriver, job_id: str, failedAt: str) -> str:
 def submitted_jobs(job_id: str, title: str, company: str, work_location: str, work_style: str, description: str, experience_required: int | Literal['Unknown', 'Error in extraction'], 
                    skills: list[str] | Literal['In Development'], hr_name: str | Literal['Unknown'], hr_link: str | Literal['Unknown'], resume: str, 
                    reposted: bool, date_listed: datetime | Literal['Unknown'], date_applied:  datetime | Literal['Pending'], job_link: str, application_link: str, 
-                   questions_list: set | None, connect_request: Literal['In Development']) -> None:
+                   questions_list: set | None, connect_request: Literal['In Development'], answer_records: dict | None = None) -> None:
     '''
     Function to create or update the Applied jobs CSV file, once the application is submitted successfully
+    * Row is journaled right away and written to the history files in the background
+    * If `store_descriptions_separately = True`, "About Job" only keeps a reference to the stored `description`
+    * Counts it in run statistics under `current_search_term`
+    * Saves `answer_records` from `answer_questions()` in bulk to the answered questions table of the ledger
     '''
     try:
-        with open(file_name, mode='a', newline='', encoding='utf-8') as csv_file:
-            fieldnames = ['Job ID', 'Title', 'Company', 'Work Location', 'Work Style', 'About Job', 'Experience required', 'Skills required', 'HR Name', 'HR Link', 'Resume', 'Re-posted', 'Date Posted', 'Date Applied', 'Job Link', 'External Job link', 'Questions Found', 'Connect Request']
-            writer = csv.DictWriter(csv_file, fieldnames=fieldnames)
-            if csv_file.tell() == 0: writer.writeheader()
-            writer.writerow({'Job ID':truncate_for_csv(job_id), 'Title':truncate_for_csv(title), 'Company':truncate_for_csv(company), 'Work Location':truncate_for_csv(work_location), 'Work Style':truncate_for_csv(work_style), 
-                            'About Job':truncate_for_csv(description), 'Experience required': truncate_for_csv(experience_required), 'Skills required':truncate_for_csv(skills), 
-                                'HR Name':truncate_for_csv(hr_name), 'HR Link':truncate_for_csv(hr_link), 'Resume':truncate_for_csv(resume), 'Re-posted':truncate_for_csv(reposted), 
-                                'Date Posted':truncate_for_csv(date_listed), 'Date Applied':truncate_for_csv(date_applied), 'Job Link':truncate_for_csv(job_link), 
-                                'External Job link':truncate_for_csv(application_link), 'Questions Found':truncate_for_csv(questions_list), 'Connect Request':truncate_for_csv(connect_request)})
-        csv_file.close()
+        if store_descriptions_separately and description and description != "Unknown":
+            description = store_description(description)
+        record_history("applied", {'Job ID':truncate_for_csv(job_id), 'Title':truncate_for_csv(title), 'Company':truncate_for_csv(company), 'Work Location':truncate_for_csv(work_location), 'Work Style':truncate_for_csv(work_style), 
+                        'About Job':truncate_for_csv(description), 'Experience required': truncate_for_csv(experience_required), 'Skills required':truncate_for_csv(skills), 
+                        'HR Name':truncate_for_csv(hr_name), 'HR Link':truncate_for_csv(hr_link), 'Resume':truncate_for_csv(resume), 'Re-posted':truncate_for_csv(reposted), 
+                        'Date Posted':truncate_for_csv(date_listed), 'Date Applied':truncate_for_csv(date_applied), 'Job Link':truncate_for_csv(job_link), 
+                        'External Job link':truncate_for_csv(application_link), 'Questions Found':truncate_for_csv(questions_list), 'Connect Request':truncate_for_csv(connect_request)})
+        if answer_records:
+            record_history_rows("questions", [{'Job ID': job_id, **record, 'Date Answered': date_applied} for record in answer_records.values()])
+        record_history("stats", {"event": "applied", "search_term": current_search_term, "company": company, "apply_type": "easy_apply" if application_link == "Easy Applied" else "external"})
     except Exception as e:
         print_lg("Failed to update submitted jobs list!", e)
-        pyautogui.alert("Failed to update the excel of applied jobs!\nProbably because of 1 of the following reasons:\n1. The file is currently open or in use by another program\n2. Permission denied to write to the file\n3. Failed to find the file", "Failed Logging")
 
 
 
@@ -1224,13 +1311,15 @@ def apply_to_jobs(search_terms: list[str]) -> None:
     applied_jobs = get_applied_job_ids()
     rejected_jobs = set()
     blacklisted_companies = set()
-    global current_city, failed_count, skip_count, easy_applied_count, external_jobs_count, tabs_count, pause_before_submit, pause_at_failed_question, useNewResume, applications_since_budget_prompt
+    global current_city, failed_count, skip_count, easy_applied_count, external_jobs_count, tabs_count, pause_before_submit, pause_at_failed_question, useNewResume, applications_since_budget_prompt, current_search_term
     current_city = current_city.strip()
     applications_since_budget_prompt = 0
 
-    if randomize_search_order:  shuffle(search_terms)
+    if randomize_search_order and isinstance(search_terms, list):  shuffle(search_terms)
     for searchTerm in search_terms:
+        current_search_term = searchTerm
         driver.get(f"https://www.linkedin.com/jobs/search/?keywords={searchTerm}")
+        wait_for_search_results(driver)
         print_lg("\n________________________________________________________________________________________________________________________\n")
         print_lg(f'\n>>>> Now searching for "{searchTerm}" <<<<\n\n')
 
@@ -1240,30 +1329,50 @@ def apply_to_jobs(search_terms: list[str]) -> None:
         try:
             while current_count < switch_number:
                 # Wait until job listings are loaded
-                wait.until(EC.presence_of_all_elements_located((By.XPATH, "//li[@data-occludable-job-id]")))
+                if not wait_for_job_list(driver): raise TimeoutException("Job listings didn't load")
 
                 pagination_element, current_page = get_page_info()
 
-                # Find all job listings in current page
-                buffer(3)
-                job_listings = driver.find_elements(By.XPATH, "//li[@data-occludable-job-id]")  
+                # Read all job cards in current page at once, and leave out the ones to skip before clicking any
+                wait_for_stable_count(driver, "li[data-occludable-job-id]")
+                job_cards = filter_job_cards(get_job_cards(driver), blacklisted_companies, rejected_jobs, applied_jobs)
 
             
-                for job in job_listings:
+                for index, card in enumerate(job_cards):
                     if keep_screen_awake: pyautogui.press('shiftright')
                     if current_count >= switch_number: break
                     print_lg("\n-@-\n")
+                    watchdog.close_stray_tabs(driver, get_kept_tabs())
 
-                    job_id,title,company,work_location,work_style,skip = get_job_main_details(job, blacklisted_companies, rejected_jobs)
-                    
-                    if skip: continue
-                    # Redundant fail safe check for applied jobs!
-                    try:
-                        if job_id in applied_jobs or find_by_class(driver, "jobs-s-apply__application-link", 2):
+                    # Card wasn't rendered when the page was read (scroll to it now), or its company got blacklisted since
+                    if card["title"] is None: card = next(iter(get_job_cards(driver, [card["job_id"]], 3)), card)
+                    if card["title"] is None:
+                        print_lg(f'Skipping job, its card didn\'t load. Job ID: {card["job_id"]}!')
+                        continue
+                    if not filter_job_cards([card], blacklisted_companies, rejected_jobs, applied_jobs): continue
+                    job_id, title, company, work_location, work_style = card["job_id"], card["title"], card["company"], card["location"], card["work_style"]
+
+                    if worker_name and not claim_job(job_id, worker_name):
+                        print_lg(f'Skipping "{title} | {company}" job, another worker has it. Job ID: {job_id}!')
+                        continue
+
+                    # Details of this job loaded in the prefetch tab while the previous one was applied to, then start loading the next one.
+                    # If they were, the checks below run on them and the card is only clicked if the job is kept
+                    details = None
+                    if job_prefetcher:
+                        details = job_prefetcher.take(job_id, get_next_job_id(job_cards, index, blacklisted_companies, rejected_jobs, applied_jobs))
+                        if details and details["applied"]:
                             print_lg(f'Already applied to "{title} | {company}" job. Job ID: {job_id}!')
                             continue
-                    except Exception as e:
-                        print_lg(f'Trying to Apply to "{title} | {company}" job. Job ID: {job_id}')
+                    if not details:
+                        open_job_card(job_id, title, company)
+                        # Redundant fail safe check for applied jobs!
+                        try:
+                            if job_id in applied_jobs or find_by_class(driver, "jobs-s-apply__application-link", 2):
+                                print_lg(f'Already applied to "{title} | {company}" job. Job ID: {job_id}!')
+                                continue
+                        except Exception as e:
+                            print_lg(f'Trying to Apply to "{title} | {company}" job. Job ID: {job_id}')
 
                     job_link = "https://www.linkedin.com/jobs/view/"+job_id
                     application_link = "Easy Applied"
@@ -1276,13 +1385,14 @@ def apply_to_jobs(search_terms: list[str]) -> None:
                     resume = "Pending"
                     reposted = False
                     questions_list = None
+                    answer_records = {}
                     screenshot_name = "Not Available"
 
                     try:
-                        rejected_jobs, blacklisted_companies, jobs_top_card = check_blacklist(rejected_jobs,job_id,company,blacklisted_companies)
+                        rejected_jobs, blacklisted_companies, jobs_top_card = check_blacklist(rejected_jobs,job_id,company,blacklisted_companies, details["about_company"] if details else None)
                     except ValueError as e:
                         print_lg(e, 'Skipping this job!\n')
-                        failed_job(job_id, job_link, resume, date_listed, "Found Blacklisted words in About Company", e, "Skipped", screenshot_name)
+                        failed_job(job_id, job_link, resume, date_listed, "Found Blacklisted words in About Company", e, "Skipped", screenshot_name, company)
                         skip_count += 1
                         continue
                     except Exception as e:
@@ -1292,36 +1402,41 @@ def apply_to_jobs(search_terms: list[str]) -> None:
 
 
                     # Hiring Manager info
-                    try:
-                        hr_info_card = WebDriverWait(driver,2).until(EC.presence_of_element_located((By.CLASS_NAME, "hirer-card__hirer-information")))
-                        hr_link = hr_info_card.find_element(By.TAG_NAME, "a").get_attribute("href")
-                        hr_name = hr_info_card.find_element(By.TAG_NAME, "span").text
-                        # if connect_hr:
-                        #     driver.switch_to.new_window('tab')
-                        #     driver.get(hr_link)
-                        #     wait_span_click("More")
-                        #     wait_span_click("Connect")
-                        #     wait_span_click("Add a note")
-                        #     message_box = driver.find_element(By.XPATH, "//textarea")
-                        #     message_box.send_keys(connect_request_message)
-                        #     if close_tabs: driver.close()
-                        #     driver.switch_to.window(linkedIn_tab) 
-                        # def message_hr(hr_info_card):
-                        #     if not hr_info_card: return False
-                        #     hr_info_card.find_element(By.XPATH, ".//span[normalize-space()='Message']").click()
-                        #     message_box = driver.find_element(By.XPATH, "//div[@aria-label='Write a message…']")
-                        #     message_box.send_keys()
-                        #     try_xp(driver, "//button[normalize-space()='Send']")        
-                    except Exception as e:
-                        print_lg(f'HR info was not given for "{title}" with Job ID: {job_id}!')
-                        # print_lg(e)
+                    if details:
+                        if details["hr_link"]: hr_link, hr_name = details["hr_link"], details["hr_name"] or "Unknown"
+                        else: print_lg(f'HR info was not given for "{title}" with Job ID: {job_id}!')
+                    else:
+                        try:
+                            hr_info_card = WebDriverWait(driver,2).until(EC.presence_of_element_located((By.CLASS_NAME, "hirer-card__hirer-information")))
+                            hr_link = hr_info_card.find_element(By.TAG_NAME, "a").get_attribute("href")
+                            hr_name = hr_info_card.find_element(By.TAG_NAME, "span").text
+                            # if connect_hr:
+                            #     driver.switch_to.new_window('tab')
+                            #     driver.get(hr_link)
+                            #     wait_span_click("More")
+                            #     wait_span_click("Connect")
+                            #     wait_span_click("Add a note")
+                            #     message_box = driver.find_element(By.XPATH, "//textarea")
+                            #     message_box.send_keys(connect_request_message)
+                            #     if close_tabs: driver.close()
+                            #     driver.switch_to.window(linkedIn_tab) 
+                            # def message_hr(hr_info_card):
+                            #     if not hr_info_card: return False
+                            #     hr_info_card.find_element(By.XPATH, ".//span[normalize-space()='Message']").click()
+                            #     message_box = driver.find_element(By.XPATH, "//div[@aria-label='Write a message…']")
+                            #     message_box.send_keys()
+                            #     try_xp(driver, "//button[normalize-space()='Send']")        
+                        except Exception as e:
+                            print_lg(f'HR info was not given for "{title}" with Job ID: {job_id}!')
+                            # print_lg(e)
 
 
                     # Calculation of date posted
                     try:
                         # try: time_posted_text = find_by_class(driver, "jobs-unified-top-card__posted-date", 2).text
                         # except: 
-                        time_posted_text = jobs_top_card.find_element(By.XPATH, './/span[contains(normalize-space(), " ago")]').text
+                        if details: time_posted_text = details["time_posted"] or ""
+                        else: time_posted_text = jobs_top_card.find_element(By.XPATH, './/span[contains(normalize-space(), " ago")]').text
                         print("Time Posted: " + time_posted_text)
                         if time_posted_text.__contains__("Reposted"):
                             reposted = True
@@ -1331,10 +1446,11 @@ def apply_to_jobs(search_terms: list[str]) -> None:
                         print_lg("Failed to calculate the date posted!",e)
 
 
-                    description, experience_required, skip, reason, message = get_job_description()
+                    description, experience_required, skip, reason, message = get_job_description(details["description"] if details else None)
                     if skip:
                         print_lg(message)
-                        failed_job(job_id, job_link, resume, date_listed, reason, message, "Skipped", screenshot_name)
+                        if store_descriptions_separately: message = replace_description(message, description)
+                        failed_job(job_id, job_link, resume, date_listed, reason, message, "Skipped", screenshot_name, company)
                         rejected_jobs.add(job_id)
                         skip_count += 1
                         continue
@@ -1357,6 +1473,12 @@ def apply_to_jobs(search_terms: list[str]) -> None:
                             skills = "Error extracting skills"
                         ##<
 
+                    if rate_governor and not rate_governor.acquire():
+                        print_lg("Application limit of the worker pool is reached, or another worker stopped it!")
+                        return
+
+                    if details: open_job_card(job_id, title, company, prefetched=True)
+
                     uploaded = False
                     # Case 1: Easy Apply Button
                     if try_xp(driver, ".//button[contains(@class,'jobs-apply-button') and contains(@class, 'artdeco-button--3') and contains(@aria-label, 'Easy')]"):
@@ -1393,12 +1515,14 @@ def apply_to_jobs(search_terms: list[str]) -> None:
                                         current_date=current_date,
                                         job_description=description,
                                         phone_country_code_value=phone_country_code,
+                                        answer_records=answer_records,
                                     )
                                     if useNewResume and not uploaded: uploaded, resume = upload_resume(modal, default_resume_path)
                                     try: next_button = modal.find_element(By.XPATH, './/span[normalize-space(.)="Review"]') 
                                     except NoSuchElementException:  next_button = modal.find_element(By.XPATH, './/button[contains(span, "Next")]')
                                     try: next_button.click()
                                     except ElementClickInterceptedException: break    # Happens when it tries to click Next button in About Company photos section
+                                    wait_until_settled(driver, root=modal)
                                     buffer(click_gap)
 
                             except NoSuchElementException: errored = "nose"
@@ -1432,7 +1556,7 @@ def apply_to_jobs(search_terms: list[str]) -> None:
                             print_lg("Failed to Easy apply!")
                             # print_lg(e)
                             critical_error_log("Somewhere in Easy Apply process",e)
-                            failed_job(job_id, job_link, resume, date_listed, "Problem in Easy Applying", e, application_link, screenshot_name)
+                            failed_job(job_id, job_link, resume, date_listed, "Problem in Easy Applying", e, application_link, screenshot_name, company)
                             failed_count += 1
                             discard_job()
                             continue
@@ -1444,7 +1568,7 @@ def apply_to_jobs(search_terms: list[str]) -> None:
                             return
                         if skip: continue
 
-                    submitted_jobs(job_id, title, company, work_location, work_style, description, experience_required, skills, hr_name, hr_link, resume, reposted, date_listed, date_applied, job_link, application_link, questions_list, connect_request)
+                    submitted_jobs(job_id, title, company, work_location, work_style, description, experience_required, skills, hr_name, hr_link, resume, reposted, date_listed, date_applied, job_link, application_link, questions_list, connect_request, answer_records)
                     if uploaded:   useNewResume = False
 
                     print_lg(f'Successfully saved "{title} | {company}" job. Job ID: {job_id} info')
@@ -1457,6 +1581,16 @@ def apply_to_jobs(search_terms: list[str]) -> None:
 
 
 
+                report_blocked_resources(session.blocker, driver)
+
+                # Restart Chrome if it has grown too big, opening the next results page in the new one
+                if pagination_element != None and current_page and pagination_element.find_elements(By.XPATH, f"//button[@aria-label='Page {current_page+1}']"):
+                    reason = watchdog.needs_recycle(driver)
+                    if reason:
+                        recycle_browser(reason, get_results_page_url(driver.current_url, current_page+1))
+                        print_lg(f"\n>-> Now on Page {current_page+1} \n")
+                        continue
+
                 # Switching to next page
                 if pagination_element == None:
                     print_lg("Couldn't find pagination element, probably at the end page of results!")
@@ -1475,7 +1609,7 @@ def apply_to_jobs(search_terms: list[str]) -> None:
             print_lg("Failed to find Job listings!")
             critical_error_log("In Applier", e)
             try:
-                print_lg(driver.page_source, pretty=True)
+                print_lg(dump_page_source(driver.page_source))
             except Exception as page_source_error:
                 print_lg(f"Failed to get page source, browser might have crashed. {page_source_error}")
             # print_lg(e)
@@ -1499,15 +1633,129 @@ def run(total_runs: int) -> int:
 
 
 
+def get_kept_tabs() -> list[str]:
+    '''
+    Function to get the tabs the bot works in, the LinkedIn tab first. Other tabs (Eg: external applications) are stray.
+    '''
+    return [linkedIn_tab] + ([job_prefetcher.handle] if job_prefetcher and job_prefetcher.handle else [])
+
+
+def recycle_browser(reason: str, url: str | None = None) -> None:
+    '''
+    Function to quit Chrome and start a fresh one, logged in again and back on results page `url` (Eg: the next page of the current search).
+    '''
+    global driver, wait, actions, linkedIn_tab, tabs_count, job_prefetcher
+    print_lg(f"Restarting the browser, {reason}.")
+    if persist_login_session: save_session_state(driver)
+    try: session.quit()
+    except Exception as e: print_lg("Browser was already closed.", e)
+    driver = session.start()
+    wait, actions = session.wait, session.actions
+    ensure_logged_in()
+    linkedIn_tab = driver.current_window_handle
+    tabs_count = len(driver.window_handles)
+    if job_prefetcher: job_prefetcher = JobPrefetcher(driver, blocker=session.blocker)
+    watchdog.recycles += 1
+    if url:
+        driver.get(url)
+        wait_for_job_list(driver)
+
+
+def create_ai_client():
+    '''
+    Function to create the client of the configured `ai_provider`.
+    '''
+    if ai_provider == "openai":
+        return ai_create_openai_client()
+    ##> ------ Yang Li : MARKYangL - Feature ------
+    # Create DeepSeek client
+    elif ai_provider == "deepseek":
+        return deepseek_create_client()
+    elif ai_provider == "gemini":
+        return gemini_create_client()
+    ##<
+    return None
+
+
+def run_worker(name: str, search_terms, governor: RateGovernor, profile_dir: str) -> None:
+    '''
+    Function run by each process of the worker pool (`parallel_workers` > 1), see `modules.worker_pool`.
+    * Opens its own Chrome with `profile_dir`, logs in and applies to jobs of `search_terms` (taken from the shared queue)
+    * Claims jobs in the ledger before applying, and waits for its turn with `governor` before each application
+    '''
+    global session, driver, wait, actions, linkedIn_tab, tabs_count, job_prefetcher, aiClient, worker_name, rate_governor, useNewResume
+    worker_name, rate_governor = name, governor
+    session = DriverSession(arguments=prefetch_chrome_arguments if prefetch_job_details else None, user_data_dir=profile_dir)
+    try:
+        driver = session.start()
+        wait, actions = session.wait, session.actions
+    except Exception as e:
+        print_lg(f"{name} couldn't open Chrome!")
+        critical_error_log(f"In Opening Chrome for {name}", e)
+        return
+    try:
+        get_history_writer(name)
+        if not os.path.exists(default_resume_path): useNewResume = False
+        tabs_count = len(driver.window_handles)
+        ensure_logged_in()
+        linkedIn_tab = driver.current_window_handle
+        if prefetch_job_details: job_prefetcher = JobPrefetcher(driver, blocker=session.blocker)
+        if use_AI: aiClient = create_ai_client()
+        print_lg(f"{name} started applying.")
+        apply_to_jobs(search_terms)
+        if dailyEasyApplyLimitReached: governor.stop()
+    except (NoSuchWindowException, WebDriverException) as e:
+        print_lg(f"{name}'s browser window closed or session is invalid. Exiting.", e)
+    except Exception as e:
+        critical_error_log(f"In {name}", e)
+    finally:
+        print_lg(f"{name} finished. Easy applied: {easy_applied_count}, External links: {external_jobs_count}, Failed: {failed_count}, Skipped: {skip_count}")
+        if use_AI and aiClient and ai_provider.lower() in ("openai", "deepseek"):
+            try: ai_close_openai_client(aiClient)
+            except Exception as e: print_lg("Failed to close AI client:", e)
+        flush_history()
+        flush_screenshots()
+        close_ledger()
+        if persist_login_session and session.started: save_session_state(driver)
+        try:
+            session.quit()
+        except Exception as e:
+            print_lg("Browser already closed.", e)
+
+
+
 chatGPT_tab = False
 linkedIn_tab = False
 
 def main() -> None:
+    global driver, wait, actions
+    make_directories([file_name,failed_file_name,logs_folder_path+"/screenshots",default_resume_path,generated_resume_path+"/temp"])
+    if parallel_workers > 1:
+        try:
+            validate_config()
+            archive_history()
+            recover_journals()
+            run_pool(parallel_workers, search_terms)
+        except Exception as e:
+            critical_error_log("In Worker Pool", e)
+            pyautogui.alert(e, "Error Occurred in Worker Pool!")
+        finally:
+            close_ledger()
+        return
+    try:
+        driver = session.start()
+        wait, actions = session.wait, session.actions
+    except Exception as e:
+        explain_launch_error(e)
+        return
     try:
-        global linkedIn_tab, tabs_count, useNewResume, aiClient
+        global linkedIn_tab, tabs_count, useNewResume, aiClient, job_prefetcher
         alert_title = "Error Occurred. Closing Browser!"
         total_runs = 1        
         validate_config()
+        archive_history()
+        recover_journals()
+        get_history_writer()
         
         if not os.path.exists(default_resume_path):
             pyautogui.alert(text='Your default resume "{}" is missing! Please update it\'s folder path "default_resume_path" in config.py\n\nOR\n\nAdd a resume with exact name and path (check for spelling mistakes including cases).\n\n\nFor now the bot will continue using your previous upload from LinkedIn!'.format(default_resume_path), title="Missing Resume", button="OK")
@@ -1515,10 +1763,10 @@ def main() -> None:
         
         # Login to LinkedIn
         tabs_count = len(driver.window_handles)
-        driver.get("https://www.linkedin.com/login")
-        if not is_logged_in_LN(): login_LN()
+        ensure_logged_in()
         
         linkedIn_tab = driver.current_window_handle
+        if prefetch_job_details: job_prefetcher = JobPrefetcher(driver, blocker=session.blocker)
 
         # # Login to ChatGPT in a new tab for resume customization
         # if use_resume_generator:
@@ -1532,15 +1780,7 @@ def main() -> None:
         #     except Exception as e:
         #         print_lg("Opening OpenAI chatGPT tab failed!")
         if use_AI:
-            if ai_provider == "openai":
-                aiClient = ai_create_openai_client()
-            ##> ------ Yang Li : MARKYangL - Feature ------
-            # Create DeepSeek client
-            elif ai_provider == "deepseek":
-                aiClient = deepseek_create_client()
-            elif ai_provider == "gemini":
-                aiClient = gemini_create_client()
-            ##<
+            aiClient = create_ai_client()
 
             try:
                 about_company_for_ai = " ".join([word for word in (first_name+" "+last_name).split() if len(word) > 3])
@@ -1552,6 +1792,8 @@ def main() -> None:
         driver.switch_to.window(linkedIn_tab)
         total_runs = run(total_runs)
         while(run_non_stop):
+            reason = watchdog.needs_recycle(driver)
+            if reason: recycle_browser(reason)
             if cycle_date_posted:
                 date_options = ["Any time", "Past month", "Past week", "Past 24 hours"]
                 global date_posted
@@ -1614,13 +1856,17 @@ def main() -> None:
             except Exception as e:
                 print_lg("Failed to close AI client:", e)
         ##<
+        flush_history()
+        flush_screenshots()
+        close_ledger()
+        if persist_login_session and session.started: save_session_state(driver)
         try:
-            if driver:
-                driver.quit()
+            session.quit()
         except WebDriverException as e:
             print_lg("Browser already closed.", e)
         except Exception as e: 
             critical_error_log("When quitting...", e)
+        flush_logs(stop=True)
 
 
 if __name__ == "__main__":